@@ -5,13 +5,16 @@
 import { useState } from 'react';
 import Papa from 'papaparse';
 import type { Player, CSVParseResult, StoredData } from '../types/player';
-import { getHeadshotUrl } from '../utils/playerUtils';
+import { getHeadshotUrl, loadHeadshotManifest } from '../utils/playerUtils';
 
 export const useCSVParser = () => {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const parseCSV = (file: File): Promise<CSVParseResult> => {
+  const parseCSV = async (file: File): Promise<CSVParseResult> => {
+    // Headshot URLs pick a size variant from the manifest, so load it first
+    await loadHeadshotManifest();
+
     return new Promise((resolve) => {
       setIsLoading(true);
       setError(null);
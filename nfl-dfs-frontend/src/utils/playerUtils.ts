@@ -21,17 +21,69 @@ export const applyNameMapping = (playerName: string, teamAbbr: string): string =
 };
 
 /**
- * Clean player name for use in URLs (remove special characters, replace spaces with underscores)
+ * Clean player name for use in URLs (remove special characters, replace spaces with underscores).
+ * Mirrors headshot_manifest.clean_player_name, which names the files and manifest keys.
  */
 export const cleanPlayerName = (name: string): string => {
   return name.replace(/[^a-zA-Z0-9\s]/g, '').replace(/\s+/g, '_');
 };
 
+// Where deploy.py uploads the compressed headshots
+const HEADSHOT_BASE_URL = '/nfl-dfs/headshots';
+
+// Largest size headshots are drawn at (chart bubbles, tooltip and table are all <= 48px)
+export const HEADSHOT_DISPLAY_SIZE = 48;
+
+/**
+ * headshots-manifest.json written by compress_headshots.py:
+ * clean player name -> { pixel size: filename } for each variant.
+ * Filenames include a content hash, so the files themselves are cached for good
+ * and only the (revalidated) manifest has to be fetched to see updates.
+ */
+interface HeadshotManifest {
+  sizes: number[];
+  players: { [cleanName: string]: { [size: string]: string } };
+}
+
+let headshotManifest: HeadshotManifest | null = null;
+let headshotManifestRequest: Promise<HeadshotManifest | null> | null = null;
+
+/**
+ * Fetch the headshot variant manifest once; resolves to null if it isn't deployed
+ */
+export const loadHeadshotManifest = (): Promise<HeadshotManifest | null> => {
+  if (!headshotManifestRequest) {
+    headshotManifestRequest = fetch(`${HEADSHOT_BASE_URL}/headshots-manifest.json`)
+      .then((response) => (response.ok ? response.json() : null))
+      .catch(() => null)
+      .then((manifest: HeadshotManifest | null) => {
+        headshotManifest = manifest;
+        return manifest;
+      });
+  }
+  return headshotManifestRequest;
+};
+
+/**
+ * Smallest variant that covers displaySize at the screen's pixel ratio (else the largest)
+ */
+const pickHeadshotVariant = (variants: { [size: string]: string }, displaySize: number): string => {
+  const needed = displaySize * (window.devicePixelRatio || 1);
+  const sizes = Object.keys(variants).map(Number).sort((a, b) => a - b);
+  const size = sizes.find((s) => s >= needed) ?? sizes[sizes.length - 1];
+  return variants[String(size)];
+};
+
 /**
  * Get headshot URL for a player
- * Uses local headshots from /nfl-dfs/headshots/
+ * Uses local headshots from /nfl-dfs/headshots/, picking the smallest adequate
+ * variant listed in headshots-manifest.json (see loadHeadshotManifest). Players missing
+ * from a loaded manifest get the team logo; without one, the legacy {clean}.png is used
  */
-export const getHeadshotUrl = (player: Player): string => {
+export const getHeadshotUrl = (
+  player: Pick<Player, 'player_name' | 'team_abbr' | 'position'>,
+  displaySize: number = HEADSHOT_DISPLAY_SIZE
+): string => {
   // For DST, use team logo
   if (player.position === 'DST') {
     return `https://a.espncdn.com/i/teamlogos/nfl/500/${player.team_abbr.toUpperCase()}.png`;
@@ -40,7 +92,18 @@ export const getHeadshotUrl = (player: Player): string => {
   const nameToUse = applyNameMapping(player.player_name, player.team_abbr);
   const cleanName = cleanPlayerName(nameToUse);
 
-  return `/nfl-dfs/headshots/${cleanName}.png`;
+  // No manifest (not deployed yet, or it failed to load): the legacy unhashed file
+  if (!headshotManifest) {
+    return `${HEADSHOT_BASE_URL}/${cleanName}.png`;
+  }
+
+  const variants = headshotManifest.players[cleanName];
+  if (variants) {
+    return `${HEADSHOT_BASE_URL}/${pickHeadshotVariant(variants, displaySize)}`;
+  }
+
+  // The manifest lists every deployed headshot, so this player has none
+  return getFallbackHeadshotUrl(player.team_abbr);
 };
 
 /**
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Team and game environment aggregates for a loaded slate.
+Projected points, salary, ownership concentration and salary-weighted
+leverage per team and per game. SlateAggregates keeps the last result and
+only recomputes groups whose rows changed when the CSV is refreshed.
+
+Usage:
+  python3 src/aggregates.py --csv slate.csv --output aggregates.parquet
+"""
+
+import argparse
+
+from simulation import game_keys, simulated_columns
+
+# Columns an aggregate depends on; a group is recomputed when any of them changes
+HASHED_COLUMNS = ['Name', 'Position', 'Team', 'Salary', 'Projection', 'Ceiling', 'Own%', 'Leverage']
+GROUPING_COLUMNS = ['Opponent', 'Game Info']
+# Inputs of simulated Boom%/Bust%/Ceiling beyond the hashed Projection and Salary
+SIMULATION_INPUTS = ['Std Dev']
+
+LEVELS = ('team', 'game')
+
+
+def aggregate(df, keys):
+    """
+    One row per key: player count, projection/ceiling/salary/ownership totals,
+    ownership concentration (Herfindahl index of ownership shares, 1 = all on
+    one player), the top ownership and salary-weighted leverage.
+    """
+    import numpy as np
+    import pandas as pd
+
+    own = df['Own%'].fillna(0).to_numpy(dtype='float64')
+    salary = df['Salary'].fillna(0).to_numpy(dtype='float64')
+    leverage = df['Leverage'].to_numpy(dtype='float64')
+    has_leverage = ~np.isnan(leverage)
+
+    parts = pd.DataFrame({
+        'key': pd.Series(keys).to_numpy(),
+        'Projection': df['Projection'].to_numpy(dtype='float64'),
+        'Ceiling': df['Ceiling'].to_numpy(dtype='float64'),
+        'Salary': salary,
+        'Own%': own,
+        'own_squared': own ** 2,
+        'salary_leverage': np.where(has_leverage, salary * leverage, 0),
+        'leverage_salary': np.where(has_leverage, salary, 0),
+    })
+
+    grouped = parts.groupby('key', sort=True)
+    sums = grouped.sum()
+    own_total = sums['Own%'].where(sums['Own%'] > 0)
+
+    result = pd.DataFrame({
+        'Players': grouped.size(),
+        'Projection': sums['Projection'],
+        'Ceiling': sums['Ceiling'],
+        'Salary': sums['Salary'],
+        'Own%': sums['Own%'],
+        'Top Own%': grouped['Own%'].max(),
+        'Own HHI': sums['own_squared'] / own_total ** 2,
+        'Leverage': sums['salary_leverage'] / sums['leverage_salary'].where(sums['leverage_salary'] > 0),
+    })
+    result.index.name = None
+    # Inputs are float32; trim the noise that survives the float64 sums
+    return result.round(4)
+
+
+def hashed_columns(df) -> list:
+    """
+    Columns a group's hash covers. Simulated columns (simulation.simulated_columns)
+    are hashed through their inputs instead, so simulation output can never make an
+    unchanged group look changed.
+    """
+    simulated = set(simulated_columns(df))
+    columns = [c for c in HASHED_COLUMNS if c not in simulated]
+    if simulated & set(HASHED_COLUMNS):
+        columns += SIMULATION_INPUTS
+    return columns + [c for c in GROUPING_COLUMNS if c in df.columns]
+
+
+def _group_hashes(keys, row_hashes) -> dict:
+    """key -> (row count, wrapping sum of row hashes); order-independent"""
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(pd.Series(keys).to_numpy())
+    sums = np.zeros(len(uniques), dtype=np.uint64)
+    np.add.at(sums, codes, row_hashes)
+    counts = np.bincount(codes, minlength=len(uniques))
+    return {key: (int(count), int(total)) for key, count, total in zip(uniques, counts, sums)}
+
+
+class SlateAggregates:
+    """Team and game aggregates, kept across CSV refreshes and updated per changed group"""
+
+    def __init__(self):
+        self.tables = {level: None for level in LEVELS}
+        self.recomputed = {level: 0 for level in LEVELS}
+        self._hashes = {level: {} for level in LEVELS}
+
+    @property
+    def teams(self):
+        return self.tables['team']
+
+    @property
+    def games(self):
+        return self.tables['game']
+
+    def update(self, df) -> dict:
+        """Bring the aggregates up to date with df; returns groups recomputed per level"""
+        import pandas as pd
+
+        row_hashes = pd.util.hash_pandas_object(df[hashed_columns(df)], index=False).to_numpy()
+
+        games = game_keys(df).to_numpy()
+        keys = {'team': df['Team'].astype(str).to_numpy(), 'game': games}
+        for level in LEVELS:
+            self._update_level(level, df, keys[level], row_hashes)
+
+        # Which game each team plays in
+        team_games = pd.Series(games, index=keys['team']).groupby(level=0).first()
+        self.tables['team']['Game'] = team_games.reindex(self.tables['team'].index)
+
+        return dict(self.recomputed)
+
+    def _update_level(self, level, df, keys, row_hashes):
+        import pandas as pd
+
+        hashes = _group_hashes(keys, row_hashes)
+        previous = self._hashes[level]
+        table = self.tables[level]
+
+        changed = [key for key, value in hashes.items() if previous.get(key) != value]
+        kept = [key for key in hashes if key not in changed and table is not None]
+
+        parts = [table.loc[kept].drop(columns='Game', errors='ignore')] if kept else []
+        if changed:
+            mask = pd.Series(keys).isin(changed).to_numpy()
+            parts.append(aggregate(df[mask], keys[mask]))
+
+        self.tables[level] = pd.concat(parts).sort_index() if parts else aggregate(df.iloc[:0], keys[:0])
+        self._hashes[level] = hashes
+        self.recomputed[level] = len(changed)
+
+    def to_frame(self):
+        """Both levels in one frame: Level, Group, then the aggregate columns"""
+        import pandas as pd
+
+        frames = []
+        for level in LEVELS:
+            frame = self.tables[level].rename_axis('Group').reset_index()
+            frame.insert(0, 'Level', level)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    def to_payload(self) -> dict:
+        """Rounded records per level for the HTML (NaN as null)"""
+        payload = {}
+        for level in LEVELS:
+            table = self.tables[level].round(4)
+            table = table.astype(object).where(table.notna(), None)
+            payload[level + 's'] = [
+                {'group': key, **row} for key, row in zip(table.index, table.to_dict('records'))
+            ]
+        return payload
+
+    def export(self, path: str):
+        """Write both levels to .parquet (needs pyarrow) or .csv"""
+        frame = self.to_frame()
+        if str(path).endswith('.parquet'):
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+
+
+def main():
+    from slate_loader import load_slate
+
+    parser = argparse.ArgumentParser(description='Team and game aggregates for a slate')
+    parser.add_argument('--csv', required=True, help='Slate CSV')
+    parser.add_argument('--output', help='Write aggregates to .csv or .parquet')
+    args = parser.parse_args()
+
+    aggregates = SlateAggregates()
+    aggregates.update(load_slate(args.csv))
+
+    teams = aggregates.teams.sort_values('Projection', ascending=False)
+    print(f"{'Team':<6} {'Game':<10} {'Proj':>7} {'Own%':>7} {'Own HHI':>8} {'Lev':>6}")
+    for team, row in teams.iterrows():
+        print(f"{team:<6} {row['Game']:<10} {row['Projection']:>7.1f} {row['Own%']:>7.1f} "
+              f"{row['Own HHI']:>8.2f} {row['Leverage']:>6.2f}")
+
+    if args.output:
+        aggregates.export(args.output)
+        print(f"\nAggregates written to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,984 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the local Python tooling.
+Each subcommand measures one part of the pipeline and prints a small report.
+
+Usage:
+  python3 src/benchmark.py import-time
+  python3 src/benchmark.py load --rows 20000
+  python3 src/benchmark.py memory --slates 17
+  python3 src/benchmark.py history --seasons 3
+  python3 src/benchmark.py delta --rows 10000
+  python3 src/benchmark.py simulate --players 500 --sims 100000
+  python3 src/benchmark.py optimize --sims 400
+  python3 src/benchmark.py payload --rows 600
+  python3 src/benchmark.py export --rows 20000
+  python3 src/benchmark.py compress --images 48
+  python3 src/benchmark.py fetch --players 60
+"""
+
+import argparse
+import csv
+import functools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent
+
+# Cumulative import time budgets in milliseconds, as reported by
+# `python -X importtime -c "import <module>"`
+IMPORT_BUDGETS_MS = {
+    'profiling': 15,
+    'nfl_dfs_visualizer': 30,
+    'nfl_dfs_visualizer_gui': 120,
+}
+
+# Largest size the chart draws a headshot at
+HEADSHOT_DISPLAY_PX = 48
+
+# Measured for reference only: what the entry points used to pay at import
+REFERENCE_IMPORTS = ['pandas', 'PIL.Image', 'requests']
+
+
+def measure_import_time(module: str, runs: int = 5) -> float:
+    """Best-of-N cumulative import time for a module in milliseconds"""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    best = None
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=SRC_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+        # Lines look like: "import time:   self [us] | cumulative | imported package"
+        cumulative = None
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            fields = line[len('import time:'):].split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                cumulative = int(fields[1]) / 1000
+
+        if cumulative is not None and (best is None or cumulative < best):
+            best = cumulative
+
+    return best or 0.0
+
+
+def bench_import_time(args) -> int:
+    """Check entry-point import times against their budgets"""
+    print(f"{'Module':<28} {'ms':>8} {'Budget':>8}  Status")
+    print('-' * 56)
+
+    over_budget = 0
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        elapsed = measure_import_time(module, args.runs)
+        status = 'OK' if elapsed <= budget else 'OVER'
+        over_budget += status == 'OVER'
+        print(f"{module:<28} {elapsed:>8.1f} {budget:>8}  {status}")
+
+    print()
+    print("Reference (deferred until first use):")
+    for module in REFERENCE_IMPORTS:
+        try:
+            elapsed = measure_import_time(module, args.runs)
+            print(f"{module:<28} {elapsed:>8.1f}")
+        except RuntimeError:
+            print(f"{module:<28} {'not installed':>8}")
+
+    return 1 if over_budget else 0
+
+
+TEAMS = ['ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GB',
+         'HOU', 'IND', 'JAX', 'KC', 'LAC', 'LAR', 'LV', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
+         'NYJ', 'PHI', 'PIT', 'SF', 'SEA', 'TB', 'TEN', 'WAS']
+POSITIONS = ['QB', 'RB', 'RB', 'WR', 'WR', 'WR', 'TE', 'DST']
+SLATE_HEADER = ['Name', 'Position', 'Team', 'Salary', 'Projection', 'Std Dev', 'Ceiling',
+                'Bust%', 'Boom%', 'Own%', 'Optimal%', 'Leverage']
+
+
+def write_synthetic_slate(path, rows: int, seed: int = 7):
+    """Write a Stokastic-style slate CSV ("$9,000" salaries) with random stats"""
+    rng = random.Random(seed)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SLATE_HEADER)
+        for i in range(rows):
+            projection = rng.uniform(2, 28)
+            writer.writerow([
+                f"Player {i}", rng.choice(POSITIONS), rng.choice(TEAMS),
+                f"${rng.randrange(3000, 9600, 100):,}", round(projection, 1),
+                round(projection * rng.uniform(0.3, 0.6), 1), round(projection * 1.6, 1),
+                round(rng.uniform(5, 40), 1), round(rng.uniform(1, 40), 1),
+                round(rng.uniform(0, 40), 1), round(rng.uniform(0, 40), 2),
+                round(rng.uniform(-5, 5), 2),
+            ])
+
+
+def legacy_load_slate(csv_path):
+    """The loader NFLDFSVisualizer used before slate_loader, kept for comparison"""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip()
+    df['Salary'] = df['Salary'].str.replace('$', '').str.replace(',', '').astype(float)
+    for col in ['Projection', 'Std Dev', 'Ceiling', 'Bust%', 'Boom%', 'Own%', 'Optimal%', 'Leverage']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def best_time(func, runs: int) -> tuple:
+    """(best seconds, last result) over several runs"""
+    best, result = None, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_load(args) -> int:
+    """Typed slate loader vs. the legacy object-column loader"""
+    from slate_loader import load_slate, pyarrow_available
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'slate.csv'
+        write_synthetic_slate(path, args.rows)
+
+        loaders = [('legacy', lambda: legacy_load_slate(path)),
+                   ('typed (c)', lambda: load_slate(path, engine='c'))]
+        if pyarrow_available():
+            loaders.append(('typed (pyarrow)', lambda: load_slate(path, engine='pyarrow')))
+
+        print(f"Slate: {args.rows:,} rows, {path.stat().st_size / 1024:.0f} KB")
+        print(f"{'Loader':<18} {'ms':>8} {'Frame KB':>10}")
+        print('-' * 38)
+        for label, loader in loaders:
+            elapsed, df = best_time(loader, args.runs)
+            memory = df.memory_usage(deep=True).sum() / 1024
+            print(f"{label:<18} {elapsed * 1000:>8.1f} {memory:>10.0f}")
+
+    return 0
+
+
+def legacy_player_dicts(df, headshot_urls) -> list:
+    """One dict per player, as prepare_data_for_position built before PlayerTable"""
+    players = []
+    for (idx, row), headshot_url in zip(df.iterrows(), headshot_urls):
+        players.append({
+            'player_name': row['Name'],
+            'player_id': f"{row['Name'].replace(' ', '_')}_{idx}",
+            'position': row['Position'],
+            'team_abbr': row['Team'],
+            'salary': float(row['Salary']),
+            'dk_projection': float(row['Projection']),
+            'std_dev': float(row['Std Dev']),
+            'ceiling': float(row['Ceiling']),
+            'bust_pct': float(row['Bust%']),
+            'boom_pct': float(row['Boom%']),
+            'ownership_pct': float(row['Own%']),
+            'optimal_pct': float(row['Optimal%']),
+            'leverage': float(row['Leverage']),
+            'headshot_url': headshot_url,
+        })
+    return players
+
+
+def bench_memory(args) -> int:
+    """Bytes per player: list of dicts vs. PlayerTable, over a season of slates"""
+    import json
+    import tracemalloc
+
+    from player_table import PlayerTable
+    from slate_loader import load_slate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frames = []
+        for week in range(args.slates):
+            path = Path(tmp) / f'week{week + 1}.csv'
+            write_synthetic_slate(path, args.rows, seed=week)
+            frames.append(load_slate(path))
+
+    # Team logos stand in for headshots: same URL shapes, no network
+    urls = [[f"https://a.espncdn.com/i/teamlogos/nfl/500/{team}.png" for team in df['Team']]
+            for df in frames]
+    players = sum(len(df) for df in frames)
+
+    tracemalloc.start()
+    dicts = [legacy_player_dicts(df, u) for df, u in zip(frames, urls)]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    table = PlayerTable.concat(PlayerTable.from_frame(df, u) for df, u in zip(frames, urls))
+    build = time.perf_counter() - start
+    table_bytes = table.memory_bytes()
+
+    dict_json = len(json.dumps([p for slate in dicts for p in slate]))
+    table_json = len(json.dumps(table.to_payload(group_by='position'), separators=(',', ':')))
+
+    print(f"Season: {args.slates} slates x {args.rows} players = {players:,} players")
+    print(f"{'Layout':<14} {'Total KB':>10} {'B/player':>10} {'JSON KB':>10}")
+    print('-' * 47)
+    print(f"{'dicts':<14} {dict_bytes / 1024:>10.0f} {dict_bytes / players:>10.0f} {dict_json / 1024:>10.0f}")
+    print(f"{'PlayerTable':<14} {table_bytes / 1024:>10.0f} {table_bytes / players:>10.0f} {table_json / 1024:>10.0f}")
+    print(f"\nPlayerTable.concat: {build * 1000:.1f} ms")
+
+    return 0
+
+
+def bench_aggregate(args) -> int:
+    """Groups recomputed by SlateAggregates on refreshes of a slate with simulated stats"""
+    import pandas as pd
+
+    from aggregates import SlateAggregates
+    from simulation import fill_simulated_stats
+    from slate_loader import load_slate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'slate.csv'
+        write_synthetic_slate(path, args.rows)
+        # Projection-only export: Boom%/Bust%/Ceiling get simulated on every load
+        pd.read_csv(path).drop(columns=['Ceiling', 'Bust%', 'Boom%']).to_csv(path, index=False)
+
+        def load():
+            df = load_slate(path)
+            fill_simulated_stats(df, sims=args.sims)
+            return df
+
+        aggregates = SlateAggregates()
+        aggregates.update(load())
+        total = len(aggregates.teams) + len(aggregates.games)
+
+        print(f"{args.rows} players, {total} teams + games, {args.sims:,} sims per load")
+        print(f"{'Refresh':<24} {'Recomputed':>11} {'ms':>8}")
+        print('-' * 45)
+
+        df = load()
+        start = time.perf_counter()
+        same = sum(aggregates.update(df).values())
+        print(f"{'same CSV':<24} {same:>11} {(time.perf_counter() - start) * 1000:>8.1f}")
+
+        df = load()
+        df.loc[0, 'Projection'] += 1
+        start = time.perf_counter()
+        changed = sum(aggregates.update(df).values())
+        print(f"{'one projection changed':<24} {changed:>11} {(time.perf_counter() - start) * 1000:>8.1f}")
+
+    # Reloading the same CSV must not look like a change
+    return 1 if same else 0
+
+
+def bench_history(args) -> int:
+    """Slate history: ingest, idempotent re-ingest and per-player query latency"""
+    from slate_loader import load_slate
+    from slate_store import SlateStore, file_hash
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.seasons * 18):
+            path = Path(tmp) / f'slate{i}.csv'
+            write_synthetic_slate(path, args.rows, seed=i)
+            paths.append(path)
+        frames = [load_slate(path) for path in paths]
+
+        with SlateStore(Path(tmp) / 'slates.db') as store:
+            def ingest_all():
+                for i, (path, df) in enumerate(zip(paths, frames)):
+                    store.ingest(df, 2020 + i // 18, i % 18 + 1, content_hash=file_hash(path))
+
+            start = time.perf_counter()
+            ingest_all()
+            first = time.perf_counter() - start
+            again, _ = best_time(ingest_all, 3)
+            query, rows = best_time(lambda: store.player_history('Player 42', weeks=args.weeks), 20)
+
+        print(f"History: {len(paths)} slates x {args.rows} players")
+        print(f"Ingest:      {first * 1000:>8.1f} ms ({first / len(paths) * 1000:.1f} ms per slate)")
+        print(f"Re-ingest:   {again * 1000:>8.1f} ms (all skipped by content hash)")
+        print(f"Query:       {query * 1000:>8.2f} ms (last {args.weeks} weeks, {len(rows)} rows)")
+
+    return 0
+
+
+def bench_delta(args) -> int:
+    """Slate delta (hash join + movers + payload) on two exports of one slate"""
+    from slate_delta import compute_delta, delta_payload
+    from slate_loader import load_slate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path, new_path = Path(tmp) / 'old.csv', Path(tmp) / 'new.csv'
+        # Same seed: same players; the re-export gets new stats and a few extra rows
+        write_synthetic_slate(old_path, args.rows, seed=1)
+        write_synthetic_slate(new_path, args.rows + args.rows // 100, seed=1)
+        old_df, new_df = load_slate(old_path), load_slate(new_path)
+        new_df['Projection'] = new_df['Projection'] * 1.05
+
+    join, delta = best_time(lambda: compute_delta(old_df, new_df), args.runs)
+    payload, _ = best_time(lambda: delta_payload(delta), args.runs)
+
+    print(f"Slates: {len(old_df):,} -> {len(new_df):,} rows")
+    print(f"compute_delta: {join * 1000:>8.1f} ms")
+    print(f"delta_payload: {payload * 1000:>8.1f} ms")
+
+    return 0
+
+
+def bench_simulate(args) -> int:
+    """Monte Carlo Boom%/Bust%/Ceiling throughput"""
+    import numpy as np
+
+    import pandas as pd
+
+    from simulation import simulate_stacks, simulate_stats
+
+    rng = np.random.default_rng(7)
+    projection = rng.uniform(2, 28, args.players).astype(np.float32)
+    std_dev = projection * rng.uniform(0.3, 0.6, args.players).astype(np.float32)
+    salary = rng.integers(30, 96, args.players).astype(np.float32) * 100
+    teams = rng.choice(TEAMS, args.players)
+    slate = pd.DataFrame({
+        'Name': [f"Player {i}" for i in range(args.players)], 'Position': rng.choice(POSITIONS, args.players),
+        'Team': teams, 'Opponent': [TEAMS[TEAMS.index(t) ^ 1] for t in teams],
+        'Salary': salary, 'Projection': projection, 'Std Dev': std_dev,
+    })
+
+    print(f"{args.players} players x {args.sims:,} sims")
+    print(f"{'Workers':<10} {'Seconds':>8} {'M draws/s':>10}")
+    print('-' * 30)
+    for workers in sorted({1, args.workers}):
+        elapsed, _ = best_time(lambda: simulate_stats(projection, std_dev, salary, sims=args.sims,
+                                                      workers=workers, seed=1), args.runs)
+        print(f"{workers:<10} {elapsed:>8.2f} {args.players * args.sims / elapsed / 1e6:>10.1f}")
+
+    elapsed, stacks = best_time(lambda: simulate_stacks(slate, sims=args.sims, seed=1), args.runs)
+    print(f"{'per-game':<10} {elapsed:>8.2f} {args.players * args.sims / elapsed / 1e6:>10.1f}"
+          f"  (correlated, {len(stacks)} QB stacks)")
+
+    return 0
+
+
+def bench_optimize(args) -> int:
+    """Lineup solves per second for Optimal%, single process vs. a pool"""
+    import numpy as np
+
+    from optimizer import LineupModel, optimal_rates
+    from simulation import draw_outcomes
+    from slate_loader import load_slate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'slate.csv'
+        write_synthetic_slate(path, args.players)
+        df = load_slate(path)
+
+    positions, salaries = df['Position'].astype(str).to_numpy(), df['Salary'].to_numpy()
+    outcomes = draw_outcomes(df['Projection'].to_numpy(dtype=np.float32), df['Std Dev'].to_numpy(dtype=np.float32),
+                             args.sims, np.random.default_rng(1))
+    model = LineupModel(positions, salaries)
+    candidates = np.mean([len(model.candidates(outcomes[:, i].astype(np.float64))) for i in range(20)])
+
+    print(f"{args.players} players ({candidates:.0f} candidates per solve after dominance pruning), "
+          f"{args.sims} solves")
+    print(f"{'Workers':<10} {'Seconds':>8} {'Solves/s':>10}")
+    print('-' * 30)
+    for workers in sorted({1, args.workers}):
+        elapsed, _ = best_time(lambda: optimal_rates(positions, salaries, outcomes, workers=workers), 1)
+        print(f"{workers:<10} {elapsed:>8.2f} {args.sims / elapsed:>10.0f}")
+
+    return 0
+
+
+def bench_payload(args) -> int:
+    """HTML payload size of the tooltip outcome curves per encoding"""
+    import json
+
+    import numpy as np
+
+    from player_table import PlayerTable, quantize_curves
+    from simulation import CURVE_PERCENTILES, percentile_curves
+    from slate_loader import load_slate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'slate.csv'
+        write_synthetic_slate(path, args.rows)
+        df = load_slate(path)
+
+    urls = [f"https://a.espncdn.com/i/teamlogos/nfl/500/{team}.png" for team in df['Team']]
+    curves = percentile_curves(df['Projection'].to_numpy(), df['Std Dev'].to_numpy())
+
+    def payload_bytes(table):
+        return len(json.dumps(table.to_payload(group_by='position'), separators=(',', ':')))
+
+    base = payload_bytes(PlayerTable.from_frame(df, urls))
+    as_floats = json.dumps(curves.astype(np.float64).round(1).tolist(), separators=(',', ':'))
+    encodings = [('json floats', len(as_floats), 0.05)]
+    for dtype in (np.uint8, np.uint16):
+        codes, scale = quantize_curves(curves, dtype)
+        table = PlayerTable.from_frame(df, urls)
+        table.curves = (CURVE_PERCENTILES, codes, scale)
+        error = np.abs(codes * scale - curves).max()
+        encodings.append((f"base64 {np.dtype(dtype).name}", payload_bytes(table) - base, error))
+
+    print(f"{args.rows} players x {len(CURVE_PERCENTILES)} percentiles; payload without curves: {base / 1024:.1f} KB")
+    print(f"{'Encoding':<14} {'Added KB':>9} {'Added %':>8} {'Max error':>10}")
+    print('-' * 44)
+    for label, added, error in encodings:
+        print(f"{label:<14} {added / 1024:>9.1f} {added / base * 100:>7.1f}% {error:>10.3f}")
+
+    return 0
+
+
+def bench_export(args) -> int:
+    """Player table export (Parquet / Arrow IPC) vs. the HTML payload, plus mmap reads"""
+    import json
+
+    import pyarrow as pa
+
+    from player_table import PlayerTable
+    from simulation import CURVE_PERCENTILES, percentile_curves
+    from slate_loader import load_slate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'slate.csv'
+        write_synthetic_slate(path, args.rows)
+        df = load_slate(path)
+        urls = [f"https://a.espncdn.com/i/teamlogos/nfl/500/{team}.png" for team in df['Team']]
+        table = PlayerTable.from_frame(df, urls, percentile_curves(df['Projection'].to_numpy(),
+                                                                   df['Std Dev'].to_numpy()), CURVE_PERCENTILES)
+
+        payload, _ = best_time(lambda: json.dumps(table.to_payload(group_by='position')), args.runs)
+        print(f"{args.rows:,} players; HTML payload serialization: {payload * 1000:.1f} ms")
+        print(f"{'Format':<10} {'Write ms':>9} {'KB':>8} {'Read ms':>8}")
+        print('-' * 38)
+
+        for ext in ('parquet', 'arrow'):
+            out = Path(tmp) / f'players.{ext}'
+            elapsed, _ = best_time(lambda: table.write(out), args.runs)
+
+            def read():
+                if ext == 'parquet':
+                    import pyarrow.parquet as pq
+                    return pq.read_table(out, memory_map=True)
+                with pa.memory_map(str(out)) as source:
+                    return pa.ipc.open_file(source).read_all()
+
+            read_time, _ = best_time(read, args.runs)
+            print(f"{ext:<10} {elapsed * 1000:>9.1f} {out.stat().st_size / 1024:>8.0f} {read_time * 1000:>8.1f}")
+
+    return 0
+
+
+def write_synthetic_headshots(directory, count: int, size: int = 1200, seed: int = 7):
+    """RGBA PNGs roughly like the originals: a soft gradient portrait on a transparent background"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / size
+    noise = rng.normal(0, 6, (size, size))
+    for i in range(count):
+        rgba = np.empty((size, size, 4), dtype=np.uint8)
+        base = rng.uniform(60, 200, 3)
+        for channel in range(3):
+            rgba[..., channel] = np.clip(base[channel] + 50 * np.sin(6 * x + channel + i) * y + noise, 0, 255)
+        rgba[..., 3] = np.where((x - 0.5) ** 2 + (y - 0.55) ** 2 < 0.16, 255, 0)
+        Image.fromarray(rgba, 'RGBA').save(Path(directory) / f"Player_{i}.png", compress_level=1)
+
+
+def bench_compress(args) -> int:
+    """Headshot compression time, single process vs. a pool"""
+    import contextlib
+    import io
+
+    from compress_headshots import compress_headshots, load_manifest
+    from headshot_manifest import pick_size
+
+    with tempfile.TemporaryDirectory() as tmp:
+        originals = Path(tmp) / 'originals'
+        originals.mkdir()
+        write_synthetic_headshots(originals, args.images, args.size)
+
+        print(f"{args.images} synthetic {args.size}px headshots -> WebP")
+        print(f"{'Workers':<10} {'Seconds':>8} {'Images/s':>9} {'Speedup':>8}")
+        print('-' * 38)
+        baseline = None
+        for workers in sorted({1, args.workers}):
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    compress_headshots(originals, Path(tmp) / f'out{workers}', workers=workers, force=True)
+
+            elapsed, _ = best_time(run, args.runs)
+            baseline = baseline or elapsed
+            print(f"{workers:<10} {elapsed:>8.2f} {args.images / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
+
+        # Steady state: nothing changed since the last run, so the manifest skips everything
+        with contextlib.redirect_stdout(io.StringIO()):
+            rerun, counts = best_time(lambda: compress_headshots(originals, Path(tmp) / 'out1'), args.runs)
+        print(f"\nUnchanged re-run: {rerun * 1000:.1f} ms ({counts['skipped']} skipped via the manifest)")
+
+        # Bytes a full slate view transfers: every headshot once, drawn at up to 48px
+        entries = load_manifest(Path(tmp) / 'out1').values()
+        full = sum(entry['output_bytes'][str(max(map(int, entry['outputs'])))] for entry in entries)
+        print(f"\nSlate view, {args.images} headshots drawn at {HEADSHOT_DISPLAY_PX}px:")
+        print(f"  {'full size only':<18} {full / 1024:>8.1f} KB")
+        for ratio in (1, 2):
+            sent = sum(entry['output_bytes'][str(pick_size(entry['outputs'], HEADSHOT_DISPLAY_PX * ratio))]
+                       for entry in entries)
+            print(f"  {f'variants @{ratio}x':<18} {sent / 1024:>8.1f} KB ({sent / full * 100:.0f}% of full size)")
+
+    return 0
+
+
+class StubNFLServer:
+    """
+    Local stand-in for NFL.com player pages and headshot images, on a background
+    thread. Every response is delayed by latency seconds; requests are logged.
+    Slugs containing "missing" get a 404; image bytes sent are counted in
+    image_bytes. Images carry an ETag for their
+    version and answer a matching If-None-Match with 304; update() changes one.
+    """
+
+    def __init__(self, latency: float = 0.2):
+        import http.server
+        import threading
+
+        self.log = []
+        self.versions = {}
+        self.image_bytes = 0
+        log, versions, image, stub = self.log, self.versions, self._image, self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                log.append(self.path)
+                time.sleep(latency)
+                if self.path.startswith('/players/') and 'missing' not in self.path:
+                    slug = self.path.split('/')[2].replace('-', '')
+                    body = (f'<img src="https://static.www.nfl.com/image/upload/t_headshot_desktop/league/{slug}">'
+                            .encode())
+                elif self.path.startswith('/images/'):
+                    version = versions.get(self.path, 0)
+                    etag = f'"{version}"'
+                    if self.headers.get('If-None-Match') == etag:
+                        self.send_response(304)
+                        self.send_header('ETag', etag)
+                        self.end_headers()
+                        return
+                    body = image(version)
+                    stub.image_bytes += len(body)
+                    self.send_response(200)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.player_url = self.base + '/players/{slug}/'
+        self.image_url = self.base + '/images/{id}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _image(version: int) -> bytes:
+        import io
+
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new('RGBA', (600, 600), (180, 60 + version * 40 % 190, 60, 255)).save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def update(self, path: str):
+        """Publish a new version of the image at path (e.g. after a team change)"""
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_player_csv(path, players: int, missing: int = 0):
+    """Name/Team CSV with players that exist and some that 404"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Team'])
+        for i in range(players):
+            writer.writerow([f"Player {i}", TEAMS[i % len(TEAMS)]])
+        for i in range(missing):
+            writer.writerow([f"Missing Player {i}", TEAMS[i % len(TEAMS)]])
+
+
+def write_stub_roster(directory, players: int, base_url: str):
+    """Cached-roster CSV (as the visualizer writes it) whose headshot URLs point at the stub"""
+    from nfl_dfs_visualizer import NFLDFSVisualizer
+
+    with open(Path(directory) / f"roster_{NFLDFSVisualizer.current_season()}.csv", 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(NFLDFSVisualizer.ROSTER_COLUMNS)
+        for i in range(players):
+            writer.writerow([f"Player {i}", TEAMS[i % len(TEAMS)], 'WR', f"{base_url}/images/roster{i}"])
+
+
+def bench_fetch(args) -> int:
+    """Headshot backfill time against a local NFL.com stub, one worker vs. a pool, and with the roster"""
+    import contextlib
+    import io
+
+    from update_headshots_from_csv import update_headshots_from_csv
+
+    with tempfile.TemporaryDirectory() as tmp, StubNFLServer(args.latency) as stub:
+        csv_path = Path(tmp) / 'players.csv'
+        write_player_csv(csv_path, args.players, args.missing)
+
+        print(f"{args.players} players + {args.missing} without a page, {args.latency * 1000:.0f} ms per response, "
+              f"{args.rate:g} requests/s limit")
+        print(f"{'Workers':<10} {'Seconds':>8} {'Requests':>9} {'Players/s':>10}")
+        print('-' * 40)
+        roster_players = int(args.players * args.roster_share)
+        write_stub_roster(tmp, roster_players, stub.base)
+
+        runs = [(workers, None, str(workers)) for workers in sorted({1, args.workers})]
+        runs.append((args.workers, tmp, f"{args.workers}+roster"))
+        requests_sent = []
+        for workers, roster_dir, label in runs:
+            stub.log.clear()
+            output = Path(tmp) / f'out-{label}'
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                update_headshots_from_csv(csv_path, output, workers=workers, rate=args.rate,
+                                          player_url=stub.player_url, image_url=stub.image_url,
+                                          roster_dir=roster_dir)
+            elapsed = time.perf_counter() - start
+            requests_sent.append(len(stub.log))
+            print(f"{label:<10} {elapsed:>8.2f} {len(stub.log):>9} {args.players / elapsed:>10.1f}")
+        print(f"(roster covers {roster_players} of the {args.players} players: "
+              f"{1 - requests_sent[-1] / requests_sent[-2]:.0%} fewer requests)")
+
+        # The old loop: page + image request per player, then a fixed 0.5s pause
+        serial = args.players * (2 * args.latency + 0.5) + args.missing * (args.latency + 0.5)
+        print(f"\nPrevious serial loop (0.5s pause per player): ~{serial:.1f}s")
+
+        # Next week: headshots exist and the misses are in the negative cache
+        stub.log.clear()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_headshots_from_csv(csv_path, output, workers=args.workers, rate=args.rate,
+                                      player_url=stub.player_url, image_url=stub.image_url, roster_dir=tmp)
+        print(f"Re-run with cached misses: {time.perf_counter() - start:.2f}s, {len(stub.log)} requests")
+
+    return 0
+
+
+def bench_refresh(args) -> int:
+    """Conditional-GET refresh of downloaded headshots, with a few changed on the server"""
+    import contextlib
+    import io
+
+    from update_headshots_from_csv import refresh_headshots, update_headshots_from_csv
+
+    with tempfile.TemporaryDirectory() as tmp, StubNFLServer(args.latency) as stub:
+        csv_path = Path(tmp) / 'players.csv'
+        output = Path(tmp) / 'headshots'
+        write_player_csv(csv_path, args.players)
+        write_stub_roster(tmp, args.players, stub.base)
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_headshots_from_csv(csv_path, output, workers=args.workers, rate=args.rate,
+                                      player_url=stub.player_url, image_url=stub.image_url, roster_dir=tmp)
+
+        for i in range(args.changed):
+            stub.update(f"/images/roster{i}")
+
+        print(f"{args.players} headshots, {args.changed} changed on the server, "
+              f"{args.latency * 1000:.0f} ms per response, {args.rate:g} requests/s limit")
+        print(f"{'Run':<22} {'Seconds':>8} {'Requests':>9} {'Image KB':>9} {'Updated':>8} {'Unchanged':>10}")
+        print('-' * 71)
+        for label in ('refresh', 'refresh again'):
+            stub.log.clear()
+            stub.image_bytes = 0
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                counts = refresh_headshots(output, workers=args.workers, rate=args.rate)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<22} {elapsed:>8.2f} {len(stub.log):>9} {stub.image_bytes / 1024:>9.1f} "
+                  f"{counts['updated']:>8} {counts['unchanged']:>10}")
+
+        # The only way before: delete the cache and download everything again
+        for path in output.glob('*.png'):
+            path.unlink()
+        stub.log.clear()
+        stub.image_bytes = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_headshots_from_csv(csv_path, output, workers=args.workers, rate=args.rate,
+                                      player_url=stub.player_url, image_url=stub.image_url, roster_dir=tmp)
+        elapsed = time.perf_counter() - start
+        print(f"{'full re-download':<22} {elapsed:>8.2f} {len(stub.log):>9} {stub.image_bytes / 1024:>9.1f} "
+              f"{args.players:>8} {0:>10}")
+
+    return 0
+
+
+def write_embedded_html(path, players: int, embedded_mb: float, base_url: str, logo_share: float = 0.2,
+                        players_per_logo: int = 4) -> int:
+    """
+    index.html-style page: embedded base64 images around a script with ORIGINAL_DATA,
+    where logo_share of the players fall back to their team's logo URL, players_per_logo
+    players to a team. Returns the number of distinct headshot URLs.
+    """
+    import base64
+    import json
+
+    image_tag = f'<img src="data:image/png;base64,{base64.b64encode(os.urandom(48_000)).decode()}">\n'
+    records = []
+    for i in range(players):
+        if i < players * logo_share:
+            team = TEAMS[i // players_per_logo % len(TEAMS)]
+            url = f"{base_url}/images/logo-{team}"
+        else:
+            team = TEAMS[i % len(TEAMS)]
+            url = f"{base_url}/images/p{i}"
+        records.append({'player_name': f"Player {i}", 'team_abbr': team, 'headshot_url': url})
+    data = {'ALL': records, 'QB': records[::9]}
+
+    half = int(embedded_mb * (1 << 20) / len(image_tag) / 2)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><body>\n')
+        f.write(image_tag * half)
+        f.write(f'<script>\nconst ORIGINAL_DATA = {json.dumps(data)};\n</script>\n')
+        f.write(image_tag * half)
+        f.write('</body></html>\n')
+    return len({record['headshot_url'] for record in records})
+
+
+def bench_extract(args) -> int:
+    """Peak memory of finding ORIGINAL_DATA per HTML size, and headshot download time against a stub"""
+    import contextlib
+    import io
+    import json
+    import re
+    import tracemalloc
+
+    from extract_headshots import download_headshots_from_html, iter_original_players
+
+    with tempfile.TemporaryDirectory() as tmp, StubNFLServer(args.latency) as stub:
+        print(f"{'HTML MB':>8} {'Read+regex MB':>14} {'Streaming MB':>13} {'Players':>8}")
+        print('-' * 46)
+        for embedded_mb in args.sizes:
+            html = Path(tmp) / f'index-{embedded_mb:g}.html'
+            urls = write_embedded_html(html, args.players, embedded_mb, stub.base, args.logo_share)
+
+            # Previous extraction: whole file in memory, non-greedy regex over it
+            tracemalloc.start()
+            with open(html, 'r', encoding='utf-8') as f:
+                content = f.read()
+            match = re.search(r'const ORIGINAL_DATA = (\{.*?\});', content, re.DOTALL)
+            count = len(json.loads(match.group(1))['ALL'])
+            del content, match
+            regex_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            names = [player['player_name'] for player in iter_original_players(html)]
+            stream_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert len(names) == count
+
+            print(f"{html.stat().st_size / (1 << 20):>8.1f} {regex_peak / (1 << 20):>14.1f} "
+                  f"{stream_peak / (1 << 20):>13.1f} {count:>8}")
+
+        print(f"\n{args.players} players, {urls} distinct URLs, {args.latency * 1000:.0f} ms per response, "
+              f"{args.rate:g} requests/s limit")
+        print(f"{'Workers':<10} {'Seconds':>8} {'Requests':>9}")
+        print('-' * 29)
+        for workers in sorted({1, args.workers}):
+            stub.log.clear()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                download_headshots_from_html(html, Path(tmp) / f'out-{workers}', workers=workers, rate=args.rate)
+            print(f"{workers:<10} {time.perf_counter() - start:>8.2f} {len(stub.log):>9}")
+        print(f"\nPrevious serial loop (one request per player): ~{args.players * args.latency:.1f}s, "
+              f"{args.players} requests")
+
+    return 0
+
+
+def bench_background(args) -> int:
+    """rembg session start-up vs. per-image cost, images/s per worker count and the cached re-run"""
+    import contextlib
+    import io
+
+    try:
+        from rembg import new_session
+    except ImportError:
+        print("rembg is not installed (pip install rembg)")
+        return 1
+    from remove_backgrounds import remove_backgrounds
+
+    with tempfile.TemporaryDirectory() as tmp:
+        originals = Path(tmp) / 'originals'
+        originals.mkdir()
+        write_synthetic_headshots(originals, args.images, args.size)
+
+        start = time.perf_counter()
+        new_session(args.model)
+        print(f"Session start-up ({args.model}): {time.perf_counter() - start:.2f}s, paid once per worker\n")
+
+        print(f"{args.images} synthetic {args.size}px headshots, batches of {args.batch_size}")
+        print(f"{'Workers':<10} {'Seconds':>8} {'Images/s':>9} {'Speedup':>8}")
+        print('-' * 38)
+        baseline = None
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                remove_backgrounds(originals, Path(tmp) / f'out{workers}', args.model, workers=workers,
+                                   batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:<10} {elapsed:>8.2f} {args.images / elapsed:>9.2f} {baseline / elapsed:>7.2f}x")
+
+        # Nothing changed: every source hash is in the cache
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = remove_backgrounds(originals, Path(tmp) / 'out1', args.model, batch_size=args.batch_size)
+        print(f"\nCached re-run: {(time.perf_counter() - start) * 1000:.1f} ms ({counts['skipped']} cached)")
+
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the NFL DFS visualizer tooling')
+    subparsers = parser.add_subparsers(dest='suite', required=True)
+
+    import_parser = subparsers.add_parser('import-time', help='Entry-point import times vs. budget')
+    import_parser.add_argument('--runs', type=int, default=5, help='Runs per module (best is reported)')
+    import_parser.set_defaults(func=bench_import_time)
+
+    load_parser = subparsers.add_parser('load', help='CSV load time and frame memory')
+    load_parser.add_argument('--rows', type=int, default=20000, help='Synthetic slate size')
+    load_parser.add_argument('--runs', type=int, default=5, help='Runs per loader (best is reported)')
+    load_parser.set_defaults(func=bench_load)
+
+    memory_parser = subparsers.add_parser('memory', help='Prepared-player memory per layout')
+    memory_parser.add_argument('--slates', type=int, default=17, help='Slates in the synthetic season')
+    memory_parser.add_argument('--rows', type=int, default=600, help='Players per slate')
+    memory_parser.set_defaults(func=bench_memory)
+
+    aggregate_parser = subparsers.add_parser('aggregate', help='Team/game groups recomputed per slate refresh')
+    aggregate_parser.add_argument('--rows', type=int, default=600, help='Players in the synthetic slate')
+    aggregate_parser.add_argument('--sims', type=int, default=10_000, help='Simulations per load')
+    aggregate_parser.set_defaults(func=bench_aggregate)
+
+    history_parser = subparsers.add_parser('history', help='Slate history ingest and query latency')
+    history_parser.add_argument('--seasons', type=int, default=3, help='Seasons of 18 weekly slates')
+    history_parser.add_argument('--rows', type=int, default=600, help='Players per slate')
+    history_parser.add_argument('--weeks', type=int, default=8, help='Weeks covered by the player query')
+    history_parser.set_defaults(func=bench_history)
+
+    delta_parser = subparsers.add_parser('delta', help='Slate-to-slate delta time')
+    delta_parser.add_argument('--rows', type=int, default=10000, help='Players per slate')
+    delta_parser.add_argument('--runs', type=int, default=5, help='Runs (best is reported)')
+    delta_parser.set_defaults(func=bench_delta)
+
+    simulate_parser = subparsers.add_parser('simulate', help='Monte Carlo simulation throughput (independent and per-game correlated)')
+    simulate_parser.add_argument('--players', type=int, default=500, help='Players in the synthetic slate')
+    simulate_parser.add_argument('--sims', type=int, default=100_000, help='Simulations per player')
+    simulate_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                 help='Also time this many worker processes')
+    simulate_parser.add_argument('--runs', type=int, default=1, help='Runs (best is reported)')
+    simulate_parser.set_defaults(func=bench_simulate)
+
+    optimize_parser = subparsers.add_parser('optimize', help='Lineup optimizer solves per second')
+    optimize_parser.add_argument('--players', type=int, default=500, help='Players in the synthetic slate')
+    optimize_parser.add_argument('--sims', type=int, default=400, help='Simulated outcomes to solve')
+    optimize_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                 help='Also time this many worker processes')
+    optimize_parser.set_defaults(func=bench_optimize)
+
+    payload_parser = subparsers.add_parser('payload', help='HTML payload size of the outcome curves')
+    payload_parser.add_argument('--rows', type=int, default=600, help='Players in the synthetic slate')
+    payload_parser.set_defaults(func=bench_payload)
+
+    export_parser = subparsers.add_parser('export', help='Player table Parquet/Arrow export and read times')
+    export_parser.add_argument('--rows', type=int, default=20000, help='Players in the synthetic slate')
+    export_parser.add_argument('--runs', type=int, default=5, help='Runs (best is reported)')
+    export_parser.set_defaults(func=bench_export)
+
+    compress_parser = subparsers.add_parser('compress', help='Headshot compression throughput per worker count and unchanged re-run time')
+    compress_parser.add_argument('--images', type=int, default=48, help='Synthetic headshots to compress')
+    compress_parser.add_argument('--size', type=int, default=1200, help='Original width/height in pixels')
+    compress_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                 help='Also time this many worker processes')
+    compress_parser.add_argument('--runs', type=int, default=1, help='Runs (best is reported)')
+    compress_parser.set_defaults(func=bench_compress)
+
+    fetch_parser = subparsers.add_parser('fetch', help='Headshot backfill against a local NFL.com stub')
+    fetch_parser.add_argument('--players', type=int, default=60, help='Players without a headshot')
+    fetch_parser.add_argument('--missing', type=int, default=10, help='Players NFL.com has no page for')
+    fetch_parser.add_argument('--roster-share', type=float, default=0.8,
+                              help='Share of players the cached roster has a headshot URL for')
+    fetch_parser.add_argument('--latency', type=float, default=0.5, help='Stub response delay in seconds')
+    fetch_parser.add_argument('--rate', type=float, default=4.0, help='Requests per second limit')
+    fetch_parser.add_argument('--workers', type=int, default=8, help='Also time this many fetch workers')
+    fetch_parser.set_defaults(func=bench_fetch)
+
+    refresh_parser = subparsers.add_parser('refresh', help='Conditional-GET headshot refresh against a local NFL.com stub')
+    refresh_parser.add_argument('--players', type=int, default=60, help='Downloaded headshots to revalidate')
+    refresh_parser.add_argument('--changed', type=int, default=3, help='Headshots changed on the server')
+    refresh_parser.add_argument('--latency', type=float, default=0.2, help='Stub response delay in seconds')
+    refresh_parser.add_argument('--rate', type=float, default=20.0, help='Requests per second limit')
+    refresh_parser.add_argument('--workers', type=int, default=8, help='Fetch workers')
+    refresh_parser.set_defaults(func=bench_refresh)
+
+    extract_parser = subparsers.add_parser('extract', help='extract_headshots memory per HTML size and download time')
+    extract_parser.add_argument('--players', type=int, default=200, help='Players in ORIGINAL_DATA')
+    extract_parser.add_argument('--sizes', type=float, nargs='+', default=[8, 64],
+                                help='Embedded image MB in the synthetic HTML')
+    extract_parser.add_argument('--logo-share', type=float, default=0.2,
+                                help='Share of players using a team logo URL (4 players per logo)')
+    extract_parser.add_argument('--latency', type=float, default=0.05, help='Stub response delay in seconds')
+    extract_parser.add_argument('--rate', type=float, default=0, help='Requests per second limit (0: unlimited)')
+    extract_parser.add_argument('--workers', type=int, default=8, help='Also time this many fetch workers')
+    extract_parser.set_defaults(func=bench_extract)
+
+    background_parser = subparsers.add_parser('background', help='rembg background removal images/s per worker count (needs rembg)')
+    background_parser.add_argument('--images', type=int, default=32, help='Synthetic headshots to process')
+    background_parser.add_argument('--size', type=int, default=600, help='Original width/height in pixels')
+    background_parser.add_argument('--model', default='u2net_human_seg', help='rembg model')
+    background_parser.add_argument('--batch-size', type=int, default=8, help='Images per worker task')
+    background_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                   help='Also time this many worker processes')
+    background_parser.set_defaults(func=bench_background)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,195 @@
 """
 Compress headshot images for web use.
 Reduces file sizes from ~5MB to ~50-100KB while maintaining quality.
+Images are compressed in parallel across a process pool (--workers).
+A manifest in the output directory records each source and its encoding,
+so re-runs only compress new or changed images and drop deleted ones.
+Each image is written at several sizes (48/96/400px by default) from one
+decode. Filenames carry a hash of their content (Brock_Purdy@48.3f9a1c0d2b7e.webp),
+so a URL never changes meaning and can be cached forever; headshots-manifest.json
+maps each player to their current files.
+
+Usage:
+  python3 src/compress_headshots.py
+  python3 src/compress_headshots.py --force
+  python3 src/compress_headshots.py --variants 64,128
+  python3 src/compress_headshots.py --input headshot_cache --output headshot_cache_compressed --workers 8
 """
 
+import argparse
+import hashlib
+import json
+import multiprocessing
 import os
+from functools import partial
+from io import BytesIO
 from pathlib import Path
 from PIL import Image
 
-def compress_headshots(input_dir, output_dir, max_size=400, quality=85, use_webp=True):
+from headshot_manifest import write_web_manifest
+
+MANIFEST_NAME = 'compression-manifest.json'
+MANIFEST_VERSION = 3
+
+# Hex digits of the output's SHA-256 kept in its filename
+FILENAME_HASH_LENGTH = 12
+
+# Smaller variants written next to the max_size image: the chart draws
+# headshots at 24-48px, so 48 covers it at 1x and 96 on high-DPI screens
+VARIANT_SIZES = (48, 96)
+
+
+def flatten(img):
+    """Image as RGB, with any transparency composited onto white (for JPEG)"""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = background
+    return img
+
+
+def _encoded(img, format, **params) -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, format, **params)
+    return buffer.getvalue()
+
+
+def variant_ladder(max_size, variant_sizes=VARIANT_SIZES) -> list:
+    """Pixel sizes to write, largest (max_size) first"""
+    return sorted({size for size in variant_sizes if size < max_size} | {max_size}, reverse=True)
+
+
+def variant_stem(stem, size, max_size) -> str:
+    """Output name for a variant; the max_size image keeps the plain name"""
+    return stem if size == max_size else f"{stem}@{size}"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hashed_filename(filename, data: bytes) -> str:
+    """Brock_Purdy.webp -> Brock_Purdy.<content hash>.webp"""
+    path = Path(filename)
+    return f"{path.stem}.{content_hash(data)[:FILENAME_HASH_LENGTH]}{path.suffix}"
+
+
+def encode(img, stem, quality=85, use_webp=True) -> tuple:
+    """
+    Encode an already resized image; returns (filename, bytes).
+    WebP falls back to JPEG when that is smaller for large images; without
+    WebP it's an optimized PNG, or JPEG bytes under the .png name if that's too big.
+    """
+    if use_webp:
+        # WebP is 25-35% smaller than JPEG
+        data = _encoded(img, 'WEBP', quality=quality, method=6)
+        filename = f"{stem}.webp"
+
+        # Fallback to JPEG if WebP is large (rare); use whichever is smaller
+        if len(data) > 150_000:
+            jpeg = _encoded(img, 'JPEG', quality=quality, optimize=True)
+            if len(jpeg) < len(data):
+                data, filename = jpeg, f"{stem}.jpg"
+        return filename, data
+
+    data = _encoded(img, 'PNG', optimize=True)
+    if len(data) > 200_000:  # If larger than 200KB
+        # Keep .png extension for compatibility
+        data = _encoded(img, 'JPEG', quality=quality, optimize=True)
+    return f"{stem}.png", data
+
+
+def _compress_one(img_file, output_path, sizes, quality, use_webp) -> tuple:
+    """
+    Compress one image into output_path at each size in sizes (largest first).
+    The source is decoded once; each variant is resized from the previous one.
+    Returns (original_size, {size: (filename, bytes written)}, source hash); runs in
+    pool workers, so failures come back as (original_size, None, error message)
+    instead of raising.
+    """
+    original_size = 0
+    try:
+        raw = img_file.read_bytes()
+        original_size = len(raw)
+
+        encoded = {}
+        with Image.open(BytesIO(raw)) as source:
+            img = flatten(source)
+
+            for size in sizes:
+                # Resize if needed (maintain aspect ratio)
+                if img.width > size or img.height > size:
+                    img = img.copy() if encoded else img
+                    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+                encoded[size] = encode(img, variant_stem(img_file.stem, size, sizes[0]), quality, use_webp)
+
+        outputs = {}
+        for size, (filename, data) in encoded.items():
+            filename = hashed_filename(filename, data)
+            (output_path / filename).write_bytes(data)
+            outputs[size] = (filename, len(data))
+        return original_size, outputs, content_hash(raw)
+
+    except Exception as e:
+        return original_size, None, str(e)
+
+
+def load_manifest(output_path) -> dict:
+    """Source filename -> manifest entry ({} when missing, unreadable or from another version)"""
+    try:
+        with open(Path(output_path) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get('images', {})
+
+
+def save_manifest(output_path, images: dict):
+    """Write the manifest atomically, so an interrupted run leaves the previous one intact"""
+    path = Path(output_path) / MANIFEST_NAME
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'images': dict(sorted(images.items()))}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _is_current(entry, stat, img_file, params, output_path) -> bool:
+    """
+    True when entry still describes img_file compressed with params.
+    Size and mtime are checked first; the content hash is only read when they differ
+    (e.g. a re-download of the same image), and the entry is refreshed if it matches.
+    """
+    if not entry or entry.get('params') != params:
+        return False
+    if not all((output_path / filename).exists() for filename in entry['outputs'].values()):
+        return False
+    if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if entry['size'] != stat.st_size or entry['hash'] != content_hash(img_file.read_bytes()):
+        return False
+    entry['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _remove_output(output_path, filename):
+    try:
+        (output_path / filename).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def compress_headshots(input_dir, output_dir, max_size=400, quality=85, use_webp=True, workers=1,
+                       force=False, variant_sizes=VARIANT_SIZES):
     """
     Compress headshot images for web use with WebP support.
+    Images whose source and settings match the output manifest are skipped,
+    and outputs of sources that no longer exist are removed.
+    headshots-manifest.json (clean name -> file per size) is rewritten every run,
+    listing only images compressed with the current settings.
 
     Args:
         input_dir: Directory containing original headshots
@@ -18,6 +198,12 @@ def compress_headshots(input_dir, output_dir, max_size=400, quality=85, use_webp
         max_size: Maximum width/height in pixels (default 400)
         quality: JPEG/WebP quality 1-100 (default 85, higher = better quality)
         use_webp: Use WebP format for better compression (default True)
+        workers: Processes to compress with (default 1: in this process)
+        force: Recompress every image, ignoring the manifest
+        variant_sizes: Smaller sizes written alongside max_size (default 48 and 96)
+
+    Returns:
+        Counts of processed, skipped, removed and failed images (None if no PNGs were found)
     """
 
     input_path = Path(input_dir)
@@ -25,112 +211,125 @@ def compress_headshots(input_dir, output_dir, max_size=400, quality=85, use_webp
     output_path.mkdir(parents=True, exist_ok=True)
 
     # Get all PNG files
-    png_files = list(input_path.glob('*.png'))
+    png_files = sorted(input_path.glob('*.png'))
 
     if not png_files:
         print(f"ERROR: No PNG files found in {input_dir}")
         return
 
-    print(f"Found {len(png_files)} images to compress")
-    print(f"Settings: max_size={max_size}px, quality={quality}, format={'WebP' if use_webp else 'JPEG/PNG'}")
+    sizes = variant_ladder(max_size, variant_sizes)
+    params = {'max_size': max_size, 'quality': quality, 'webp': use_webp, 'variants': sizes}
+    manifest = load_manifest(output_path)
+
+    # Outputs whose source was deleted
+    sources = {img_file.name for img_file in png_files}
+    removed = 0
+    for name in [name for name in manifest if name not in sources]:
+        for filename in manifest.pop(name)['outputs'].values():
+            _remove_output(output_path, filename)
+        removed += 1
+
+    stale = []
+    for img_file in png_files:
+        stat = img_file.stat()
+        if force or not _is_current(manifest.get(img_file.name), stat, img_file, params, output_path):
+            stale.append((img_file, stat))
+    skipped = len(png_files) - len(stale)
+
+    print(f"Found {len(png_files)} images, {len(stale)} to compress ({skipped} unchanged, {removed} removed)")
+    print(f"Settings: sizes={'/'.join(map(str, sizes))}px, quality={quality}, "
+          f"format={'WebP' if use_webp else 'JPEG/PNG'}, workers={workers}")
     print(f"Output: {output_path.absolute()}\n")
 
+    pending = [img_file for img_file, _ in stale]
+    compress_one = partial(_compress_one, output_path=output_path, sizes=sizes,
+                           quality=quality, use_webp=use_webp)
+
     total_original_size = 0
     total_compressed_size = 0
+    variant_bytes = dict.fromkeys(sizes, 0)
     processed = 0
     failed = 0
 
-    for img_file in png_files:
-        try:
-            # Get original file size
-            original_size = img_file.stat().st_size
+    # Daemonic processes (the GUI's job worker) can't start a pool of their own
+    if workers > 1 and not multiprocessing.current_process().daemon and len(stale) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # A few chunks per worker keeps IPC low while balancing uneven images
+        chunksize = max(1, len(pending) // (workers * 4))
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(compress_one, pending, chunksize=chunksize)
+    else:
+        pool = None
+        results = map(compress_one, pending)
+
+    try:
+        for (img_file, stat), (original_size, outputs, detail) in zip(stale, results):
             total_original_size += original_size
 
-            # Open image
-            img = Image.open(img_file)
-
-            # Convert RGBA to RGB if necessary (for JPEG)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Create white background
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-
-            # Resize if needed (maintain aspect ratio)
-            if img.width > max_size or img.height > max_size:
-                img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-
-            # Choose output format
-            if use_webp:
-                # Save as WebP (25-35% smaller than JPEG)
-                output_file = output_path / img_file.stem
-                output_file = output_file.with_suffix('.webp')
-                img.save(output_file, 'WEBP', quality=quality, method=6)
-
-                compressed_size = output_file.stat().st_size
-
-                # Fallback to JPEG if WebP fails or is larger (rare)
-                if compressed_size > 150_000:
-                    jpeg_file = output_path / img_file.stem
-                    jpeg_file = jpeg_file.with_suffix('.jpg')
-                    img.save(jpeg_file, 'JPEG', quality=quality, optimize=True)
-
-                    # Use whichever is smaller
-                    jpeg_size = jpeg_file.stat().st_size
-                    if jpeg_size < compressed_size:
-                        output_file.unlink()
-                        output_file = jpeg_file
-                        compressed_size = jpeg_size
-                    else:
-                        jpeg_file.unlink()
-            else:
-                # Original PNG/JPEG logic
-                output_file = output_path / img_file.name
-
-                # Try PNG first with optimization
-                img.save(output_file, 'PNG', optimize=True)
-
-                # If still too large, convert to JPEG
-                compressed_size = output_file.stat().st_size
-                if compressed_size > 200_000:  # If larger than 200KB
-                    # Save as JPEG instead
-                    output_file = output_path / img_file.stem
-                    output_file = output_file.with_suffix('.png')  # Keep .png extension for compatibility
-                    img.save(output_file, 'JPEG', quality=quality, optimize=True)
-                    compressed_size = output_file.stat().st_size
-
-            total_compressed_size += compressed_size
-
-            # Calculate savings
-            reduction = ((original_size - compressed_size) / original_size) * 100
+            if outputs is None:
+                print(f"  ❌ Failed to process {img_file.name}: {detail}")
+                failed += 1
+                # Its old variants no longer match the source (or the ladder); drop them
+                previous = manifest.pop(img_file.name, None)
+                for filename in previous['outputs'].values() if previous else ():
+                    _remove_output(output_path, filename)
+                continue
 
+            # The format (WebP <-> JPEG fallback) or the ladder can change; drop old files
+            filenames = {str(size): filename for size, (filename, _) in outputs.items()}
+            previous = manifest.get(img_file.name)
+            for filename in set(previous['outputs'].values()) - set(filenames.values()) if previous else ():
+                _remove_output(output_path, filename)
+
+            manifest[img_file.name] = {
+                'source': str(img_file), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                'hash': detail, 'params': params, 'outputs': filenames,
+                'output_bytes': {str(size): nbytes for size, (_, nbytes) in outputs.items()},
+            }
+            for size, (_, nbytes) in outputs.items():
+                variant_bytes[size] += nbytes
+            total_compressed_size += outputs[max_size][1]
             processed += 1
             if processed % 25 == 0:
-                print(f"  Processed {processed}/{len(png_files)}...")
-
-        except Exception as e:
-            print(f"  ❌ Failed to process {img_file.name}: {e}")
-            failed += 1
+                print(f"  Processed {processed}/{len(pending)}...")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        save_manifest(output_path, manifest)
+        # Only entries written with these settings (an interrupted run leaves stale ones)
+        write_web_manifest(output_path, {Path(name).stem: entry['outputs'] for name, entry in manifest.items()
+                                         if entry.get('params') == params}, sizes)
 
     # Summary
     print(f"\n✅ Compression complete!")
     print(f"   Processed: {processed} images")
+    print(f"   Skipped: {skipped} unchanged")
+    print(f"   Removed: {removed} deleted sources")
     print(f"   Failed: {failed} images")
     print(f"   Original size: {total_original_size / 1_000_000:.1f} MB")
     print(f"   Compressed size: {total_compressed_size / 1_000_000:.1f} MB")
-    print(f"   Savings: {((total_original_size - total_compressed_size) / total_original_size * 100):.1f}%")
-    print(f"   Average per image: {total_compressed_size / processed / 1000:.1f} KB")
+    if processed:
+        print(f"   Savings: {((total_original_size - total_compressed_size) / total_original_size * 100):.1f}%")
+        print(f"   Average per image: {total_compressed_size / processed / 1000:.1f} KB")
+        print("   Average per variant: " + ', '.join(
+            f"{size}px {variant_bytes[size] / processed / 1000:.1f} KB" for size in sizes))
     print(f"\nCompressed images saved to: {output_path.absolute()}")
+    return {'processed': processed, 'skipped': skipped, 'removed': removed, 'failed': failed}
+
 
 if __name__ == '__main__':
-    # Configuration
-    input_dir = 'headshot_cache'
-    output_dir = 'headshot_cache_compressed'
-    max_size = 400     # 400x400 pixels max
-    quality = 85       # Image quality (85 is good balance)
-    use_webp = True    # Use WebP format for better compression
+    parser = argparse.ArgumentParser(description='Compress headshot images for web use')
+    parser.add_argument('--input', default='headshot_cache', help='Directory of original PNG headshots')
+    parser.add_argument('--output', default='headshot_cache_compressed', help='Directory for compressed headshots')
+    parser.add_argument('--max-size', type=int, default=400, help='Maximum width/height in pixels')
+    parser.add_argument('--quality', type=int, default=85, help='JPEG/WebP quality 1-100 (85 is a good balance)')
+    parser.add_argument('--no-webp', action='store_true', help='Write PNG (JPEG when large) instead of WebP')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Compression processes')
+    parser.add_argument('--force', action='store_true', help='Recompress every image, ignoring the manifest')
+    parser.add_argument('--variants', default=','.join(map(str, VARIANT_SIZES)),
+                        help='Comma-separated smaller sizes to write alongside --max-size ("" for none)')
+    args = parser.parse_args()
 
     print("=" * 60)
     print("Headshot Image Compression Tool")
@@ -138,12 +337,14 @@ if __name__ == '__main__':
     print()
 
     # Check if input directory exists
-    if not os.path.exists(input_dir):
-        print(f"ERROR: {input_dir} not found")
+    if not os.path.exists(args.input):
+        print(f"ERROR: {args.input} not found")
         print(f"Current directory: {os.getcwd()}")
         exit(1)
 
     # Run compression
-    compress_headshots(input_dir, output_dir, max_size, quality, use_webp)
+    variant_sizes = [int(size) for size in args.variants.split(',') if size.strip()]
+    compress_headshots(args.input, args.output, args.max_size, args.quality, not args.no_webp, args.workers,
+                       args.force, variant_sizes)
 
     print("\nNext step: Upload compressed images to GoDaddy at /nfl-dfs/headshots/")
@@ -6,6 +6,7 @@ Uploads files to GoDaddy via FTP.
 
 import os
 import sys
+from io import BytesIO
 from pathlib import Path
 from ftplib import FTP
 from dotenv import load_dotenv
@@ -42,6 +43,19 @@ if not all([FTP_HOST, FTP_USER, FTP_PASS]):
     print("   Required: FTP_HOST, FTP_USER, FTP_PASS")
     sys.exit(1)
 
+# Headshots written by compress_headshots.py carry a content hash in their name
+# (Brock_Purdy@48.3f9a1c0d2b7e.webp), so they can be cached forever; the manifest
+# mapping players to them changes with every update and must be revalidated
+HEADSHOTS_HTACCESS = """<IfModule mod_headers.c>
+<FilesMatch "\\.[0-9a-f]{12}\\.(webp|jpg|png)$">
+Header set Cache-Control "public, max-age=31536000, immutable"
+</FilesMatch>
+<Files "headshots-manifest.json">
+Header set Cache-Control "no-cache"
+</Files>
+</IfModule>
+"""
+
 class DeploymentManager:
     def __init__(self):
         self.ftp = None
@@ -82,6 +96,16 @@ class DeploymentManager:
             print(f"   ❌ Failed to upload {local_path.name}: {e}")
             return False
 
+    def upload_headshot_cache_rules(self):
+        """Upload the .htaccess that sets Cache-Control for the headshots directory."""
+        try:
+            self.ftp.storbinary(f'STOR {REMOTE_HEADSHOTS_PATH}/.htaccess', BytesIO(HEADSHOTS_HTACCESS.encode()))
+            print("   ✅ Uploaded .htaccess (immutable caching for hashed headshots)")
+            return True
+        except Exception as e:
+            print(f"   ⚠️  Could not upload .htaccess: {e}")
+            return False
+
     def ensure_directory(self, remote_dir):
         """Create directory if it doesn't exist."""
         try:
@@ -219,6 +243,7 @@ class DeploymentManager:
 
         # Ensure headshots directory exists
         self.ensure_directory(REMOTE_HEADSHOTS_PATH)
+        self.upload_headshot_cache_rules()
 
         # Check for existing files if skip_existing is enabled
         files_to_upload = image_files
@@ -232,6 +257,12 @@ class DeploymentManager:
             else:
                 print("   No existing files found (or unable to check)")
 
+        # Hashed files never change under the same name, so skipping existing ones is
+        # safe; the manifest changes whenever headshots do, so always upload it
+        manifest_file = headshots_dir / 'headshots-manifest.json'
+        if manifest_file.exists():
+            files_to_upload = files_to_upload + [manifest_file]
+
         if not files_to_upload:
             print("   ✅ All files already uploaded!")
             return True
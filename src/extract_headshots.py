@@ -2,107 +2,247 @@
 """
 Download headshots from index.html embedded URLs and save as PNG files.
 This is a one-time script to populate the headshot_cache folder.
+The HTML is scanned in chunks: ORIGINAL_DATA is decoded one player at a time
+with json.JSONDecoder.raw_decode, so memory doesn't grow with the page (or the
+images embedded in it). Each distinct URL is downloaded once, on a pool of
+fetch workers, and written for every player that uses it (e.g. shared team logos).
+
+Usage:
+  python3 src/extract_headshots.py
+  python3 src/extract_headshots.py --html index.html --output headshot_cache --workers 8
 """
 
+import argparse
 import json
-import re
 import os
-import requests
 from pathlib import Path
 from PIL import Image
 from io import BytesIO
 
-def download_headshots_from_html(html_file, output_dir):
-    """Download all headshots from URLs in HTML and save as PNG files."""
+from headshot_manifest import clean_player_name
+from http_fetch import DEFAULT_RATE, DEFAULT_WORKERS, Fetcher
+
+DATA_MARKER = 'const ORIGINAL_DATA = '
+CHUNK_SIZE = 1 << 20
+
+class JSONStream:
+    """
+    Incremental JSON reader over a text file: values are decoded with raw_decode
+    from a buffer that is refilled as needed and trimmed behind the read position.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None) -> bool:
+        """Append the next chunk, dropping what has been consumed; False at end of file"""
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def seek_marker(self, marker) -> bool:
+        """Move to just past marker; False if the file doesn't contain it"""
+        while True:
+            index = self.buf.find(marker, self.pos)
+            if index >= 0:
+                self.pos = index + len(marker)
+                return True
+            # Keep a marker-length tail in case it straddles two chunks
+            self.pos = max(self.pos, len(self.buf) - len(marker) + 1)
+            if not self.fill():
+                return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character (consumes the whitespace); '' at end of file"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r}, found {found[:1]!r}")
+        self.pos += 1
+
+    def decode(self):
+        """Decode the next value, reading more of the file (in growing chunks) while it's incomplete"""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill(size):
+                    raise
+                size *= 2
+                continue
+            # A number can end at the buffer edge while the file continues
+            if end < len(self.buf) or self.eof or not isinstance(value, (int, float)):
+                self.pos = end
+                return value
+            self.fill(size)
 
-    print(f"Reading {html_file}...")
+    def iter_array(self):
+        """Yield the elements of the array at the read position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            self.expect(',')
+
+    def iter_object(self):
+        """Yield (key, stream) for each member of the object at the read position"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.decode()
+            self.expect(':')
+            yield key, self
+            if self.peek() == '}':
+                self.pos += 1
+                return
+            self.expect(',')
+
+    def skip(self):
+        """Skip the value at the read position (arrays element by element)"""
+        if self.peek() == '[':
+            for _ in self.iter_array():
+                pass
+        else:
+            self.decode()
+
+def iter_original_players(html_file, chunk_size=CHUNK_SIZE):
+    """
+    Yield the players of ORIGINAL_DATA["ALL"] from an HTML file without reading it whole.
+    Raises LookupError if the file has no ORIGINAL_DATA, ValueError if its JSON is malformed.
+    """
     with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+        stream = JSONStream(f, chunk_size)
+        if not stream.seek_marker(DATA_MARKER):
+            raise LookupError(f"ORIGINAL_DATA not found in {html_file}")
+        for key, value in stream.iter_object():
+            if key == 'ALL':
+                yield from value.iter_array()
+            else:
+                value.skip()
 
-    # Find the ORIGINAL_DATA JSON
-    # Look for: const ORIGINAL_DATA = {"ALL": [...]}
-    pattern = r'const ORIGINAL_DATA = (\{.*?\});'
-    match = re.search(pattern, content, re.DOTALL)
+def save_headshot_copies(http, url, filepaths):
+    """Download one URL and save it as PNG at every path (runs on a fetch worker thread)"""
+    response = http.get(url)
+    response.raise_for_status()
+    img = Image.open(BytesIO(response.content))
 
-    if not match:
-        print("ERROR: Could not find ORIGINAL_DATA in HTML file")
-        return
+    # PNGs are written as downloaded; anything else is decoded and re-encoded once
+    if img.format == 'PNG':
+        data = response.content
+    else:
+        buffer = BytesIO()
+        img.save(buffer, 'PNG')
+        data = buffer.getvalue()
+    for filepath in filepaths:
+        filepath.write_bytes(data)
 
-    print("Found ORIGINAL_DATA, parsing JSON...")
-    data_json = match.group(1)
+def download_headshots_from_html(html_file, output_dir, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE):
+    """Download all headshots from URLs in HTML and save as PNG files."""
+
+    # Create output directory
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
 
+    # Find the ORIGINAL_DATA JSON and collect each URL's players as they're decoded
+    # Look for: const ORIGINAL_DATA = {"ALL": [...]}
+    print(f"Scanning {html_file}...")
+    targets = {}  # URL -> (player names, filepaths)
+    players = 0
+    skipped = 0
     try:
-        data = json.loads(data_json)
-    except json.JSONDecodeError as e:
+        for player in iter_original_players(html_file):
+            players += 1
+            player_name = player.get('player_name', 'Unknown')
+            headshot_url = player.get('headshot_url', '')
+
+            # Check if it's a valid URL
+            if not (headshot_url and (headshot_url.startswith('http://') or headshot_url.startswith('https://'))):
+                skipped += 1
+                continue
+
+            names, filepaths = targets.setdefault(headshot_url, ([], []))
+            names.append(player_name)
+            filepaths.append(output_path / f"{clean_player_name(player_name)}.png")
+    except LookupError:
+        print("ERROR: Could not find ORIGINAL_DATA in HTML file")
+        return
+    except ValueError as e:
         print(f"ERROR: Failed to parse JSON: {e}")
         return
 
-    # Create output directory
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
     print(f"Output directory: {output_path.absolute()}")
-
-    # Download headshots
-    all_players = data.get('ALL', [])
-    print(f"Found {len(all_players)} players in data")
+    print(f"Found {players} players in data, {len(targets)} distinct headshot URLs")
     print("Downloading headshots...\n")
 
     downloaded = 0
-    skipped = 0
     failed = 0
 
-    for player in all_players:
-        player_name = player.get('player_name', 'Unknown')
-        headshot_url = player.get('headshot_url', '')
-
-        # Clean player name for filename
-        clean_name = player_name.replace("'", "").replace(".", "")
-        clean_name = re.sub(r'[^a-zA-Z0-9\s]', '', clean_name)
-        clean_name = clean_name.replace(' ', '_')
-
-        filename = f"{clean_name}.png"
-        filepath = output_path / filename
-
-        # Check if it's a valid URL
-        if headshot_url and (headshot_url.startswith('http://') or headshot_url.startswith('https://')):
+    with Fetcher(rate=rate, workers=workers) as fetcher:
+        def download(url):
             try:
-                # Download image
-                response = requests.get(headshot_url, timeout=10)
-                response.raise_for_status()
-
-                # Open image and save as PNG
-                img = Image.open(BytesIO(response.content))
-                img.save(filepath, 'PNG')
-
-                downloaded += 1
-                if downloaded % 10 == 0:
-                    print(f"  Downloaded {downloaded}/{len(all_players)} headshots...")
-
-            except requests.exceptions.RequestException as e:
-                print(f"  ❌ Failed to download {player_name}: {e}")
-                failed += 1
+                save_headshot_copies(fetcher, url, targets[url][1])
+                return None
             except Exception as e:
-                print(f"  ❌ Error processing {player_name}: {e}")
-                failed += 1
-        else:
-            # Not a valid URL, skip
-            skipped += 1
+                return e
+
+        for url, error in fetcher.map(download, targets):
+            names = targets[url][0]
+            if error is None:
+                previous = downloaded
+                downloaded += len(names)
+                if downloaded // 10 > previous // 10:
+                    print(f"  Downloaded {downloaded}/{players} headshots...")
+            else:
+                for player_name in names:
+                    print(f"  ❌ Failed to download {player_name}: {error}")
+                failed += len(names)
+        requests_sent = fetcher.requests
 
     print(f"\n✅ Download complete!")
-    print(f"   Downloaded: {downloaded} headshots")
+    print(f"   Downloaded: {downloaded} headshots ({requests_sent} requests)")
     print(f"   Failed: {failed} downloads")
     print(f"   Skipped: {skipped} players (no URL)")
     print(f"   Location: {output_path.absolute()}")
     print(f"\nNext step: Upload these files to GoDaddy at /nfl-dfs/headshots/")
 
 if __name__ == '__main__':
-    # Configuration
-    html_file = 'index.html'
-    output_dir = 'headshot_cache'
+    parser = argparse.ArgumentParser(description='Download the headshots embedded in index.html')
+    parser.add_argument('--html', default='index.html', help='HTML file with ORIGINAL_DATA')
+    parser.add_argument('--output', default='headshot_cache', help='Headshot directory')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Headshots downloaded at once')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help='Requests per second across all workers (0: unlimited)')
+    args = parser.parse_args()
 
     # Check if HTML file exists
-    if not os.path.exists(html_file):
-        print(f"ERROR: {html_file} not found in current directory")
+    if not os.path.exists(args.html):
+        print(f"ERROR: {args.html} not found in current directory")
         print(f"Current directory: {os.getcwd()}")
         exit(1)
 
@@ -116,4 +256,4 @@ if __name__ == '__main__':
         exit(1)
 
     # Run download
-    download_headshots_from_html(html_file, output_dir)
+    download_headshots_from_html(args.html, args.output, args.workers, args.rate)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Headshot variant manifest shared by compress_headshots (writer), the
+visualizer and the web frontend (readers).
+compress_headshots writes each headshot at several sizes; headshots-manifest.json
+maps a cleaned player name to those files so a page can pick the smallest
+variant that still covers the size it draws the image at.
+
+Format:
+  {"sizes": [48, 96, 400], "players": {"Brock_Purdy": {"48": "...", "96": "...", "400": "..."}}}
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+WEB_MANIFEST_NAME = 'headshots-manifest.json'
+
+# Where deploy.py uploads the headshots
+DEFAULT_BASE_URL = '/nfl-dfs/headshots'
+
+
+def clean_player_name(name):
+    """
+    Clean player name for filename and manifest key. Removes special characters
+    and replaces spaces with underscores; the frontend's cleanPlayerName
+    (playerUtils.ts) mirrors it.
+    """
+    clean = name.replace("'", "").replace(".", "")
+    clean = re.sub(r'[^a-zA-Z0-9\s]', '', clean)
+    clean = clean.replace(' ', '_')
+    return clean
+
+
+def pick_size(sizes, min_pixels: int) -> int:
+    """Smallest size at least min_pixels (else the largest)"""
+    sizes = sorted(int(size) for size in sizes)
+    return next((size for size in sizes if size >= min_pixels), sizes[-1])
+
+
+def pick_variant(variants: dict, min_pixels: int) -> Optional[str]:
+    """Filename of the smallest variant at least min_pixels wide (else the largest)"""
+    if not variants:
+        return None
+    return variants[str(pick_size(variants, min_pixels))]
+
+
+def write_web_manifest(output_path, players: dict, sizes) -> Path:
+    """Write headshots-manifest.json; players maps clean name -> {size: filename}"""
+    path = Path(output_path) / WEB_MANIFEST_NAME
+    manifest = {
+        'sizes': sorted(sizes),
+        'players': {
+            name: {str(size): filename for size, filename in sorted(variants.items(), key=lambda v: int(v[0]))}
+            for name, variants in sorted(players.items())
+        },
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    return path
+
+
+class HeadshotManifest:
+    """Resolves player names to headshot variant URLs"""
+
+    def __init__(self, players: dict, base_url: str = DEFAULT_BASE_URL):
+        self.players = players
+        self.base_url = base_url.rstrip('/')
+
+    @classmethod
+    def load(cls, path, base_url: str = DEFAULT_BASE_URL) -> 'HeadshotManifest':
+        """Load a headshots-manifest.json (or the directory holding one)"""
+        path = Path(path)
+        if path.is_dir():
+            path = path / WEB_MANIFEST_NAME
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f).get('players', {}), base_url)
+
+    def __len__(self):
+        return len(self.players)
+
+    def url(self, player_name: str, min_pixels: int) -> Optional[str]:
+        """URL of the smallest variant covering min_pixels, or None if the player has no headshot"""
+        filename = pick_variant(self.players.get(clean_player_name(player_name)), min_pixels)
+        if filename is None:
+            return None
+        return f"{self.base_url}/{filename}"
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Polite concurrent HTTP for the headshot scripts.
+One pooled requests.Session is shared by a bounded set of worker threads, and
+every request takes a token from a single bucket, so the request rate is
+limited globally rather than by sleeping after each player.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_RATE = 4.0       # requests per second across all workers
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 10
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, up to burst at once"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available (immediately if rate <= 0)"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Fetcher:
+    """Rate-limited, connection-pooled GETs shared by worker threads"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, workers: int = DEFAULT_WORKERS,
+                 timeout: float = DEFAULT_TIMEOUT, burst: int = None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst or max(1, int(rate)))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Requests sent, for reporting
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, url: str, **kwargs):
+        """requests.get through the shared session, after waiting for a token"""
+        self.bucket.acquire()
+        with self._count_lock:
+            self.requests += 1
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def map(self, func, items):
+        """Run func(item) on the worker threads; yields (item, result) as each finishes"""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(func, item): item for item in items}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Background job runner for the GUI.
+Runs visualizer work in a separate worker process so pandas and HTML generation
+never stall the Tk event loop. Progress streams back over a queue and the
+current job can be cancelled.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+
+from profiling import PipelineProfiler
+
+
+class JobCancelled(Exception):
+    """Raised inside the worker when the running job has been cancelled"""
+
+
+class VisualizerSession:
+    """Keeps one warm NFLDFSVisualizer across jobs while the CSV is unchanged"""
+
+    def __init__(self):
+        self.key = None
+        self.visualizer = None
+        self.roster_index = None
+        self.aggregates = None
+
+    def get(self, csv_path, name_mappings, on_event=None, profiler=None):
+        """
+        Return a visualizer for csv_path. The CSV is only re-read when its path
+        or mtime changed; the roster index (once one loaded) and team/game
+        aggregates are reused across CSVs, and mapping changes are applied incrementally.
+        """
+        from nfl_dfs_visualizer import NFLDFSVisualizer
+
+        key = (os.path.abspath(csv_path), os.path.getmtime(csv_path))
+
+        if self.visualizer is not None and key == self.key:
+            self.visualizer.on_event = on_event
+            if profiler is not None:
+                self.visualizer.profiler = profiler
+            self.visualizer.update_name_mappings(name_mappings)
+            return self.visualizer
+
+        self.visualizer = NFLDFSVisualizer(csv_path, name_mappings, profiler=profiler,
+                                           on_event=on_event, roster_index=self.roster_index,
+                                           aggregates=self.aggregates)
+        self.roster_index = self.visualizer.roster_index
+        # Created on first use; later CSV refreshes only recompute changed groups
+        self.aggregates = self.visualizer.update_aggregates()
+        self.key = key
+        return self.visualizer
+
+
+class _JobContext:
+    """Worker-side view of one job: event forwarding, cancel checks, progress totals"""
+
+    # Minimum seconds between progress messages sent to the GUI
+    PROGRESS_INTERVAL = 0.05
+
+    def __init__(self, job_id, events, cancelled_job):
+        self.job_id = job_id
+        self.events = events
+        self.cancelled_job = cancelled_job
+        self.total = 0
+        self.stage_done = {}
+        self._last_progress = 0.0
+
+    def send(self, kind, payload=None):
+        self.events.put((self.job_id, kind, payload))
+
+    def check_cancelled(self):
+        if self.cancelled_job.value == self.job_id:
+            raise JobCancelled()
+
+    def plan(self, visualizer):
+        """Total player rows still to prepare, so progress is determinate"""
+        self.total = visualizer.pending_player_count()
+        self.stage_done = {}
+        self.send('progress', (0, self.total))
+
+    def on_event(self, event, data):
+        """Visualizer callback: forward what the GUI shows, bail out if cancelled"""
+        self.check_cancelled()
+
+        if event == 'log':
+            self.send('log', data['message'])
+        elif event == 'match' and data['method'] == 'none':
+            self.send('log', f"No headshot found for: {data['player']} ({data['team']})")
+        elif event == 'progress':
+            self.stage_done[data['stage']] = data['done']
+            now = time.monotonic()
+            if data['done'] == data['total'] or now - self._last_progress >= self.PROGRESS_INTERVAL:
+                self._last_progress = now
+                self.send('progress', (sum(self.stage_done.values()), self.total))
+        elif event == 'summary':
+            counts = ', '.join(f"{method}: {n}" for method, n in sorted(data['counts'].items()))
+            self.send('log', f"Headshot matches - {counts or 'none'}")
+
+
+def _run_check(session, ctx, csv_path, name_mappings):
+    visualizer = session.get(csv_path, name_mappings, on_event=ctx.on_event)
+    ctx.plan(visualizer)
+    visualizer.prepare_all_positions()
+
+    unmatched = list(visualizer.unmatched_names)
+    suggestions = {
+        f"{player['name']}|{player['team']}": visualizer.find_potential_matches(
+            player['name'], player['team'], limit=20)
+        for player in unmatched
+    }
+    return {'unmatched': unmatched, 'suggestions': suggestions}
+
+
+def _run_generate(session, ctx, csv_path, name_mappings, position, output_path, profile_memory=False):
+    # tracemalloc slows every stage, so peak memory is only traced on request
+    profiler = PipelineProfiler(trace_memory=profile_memory)
+    profiler.start()
+    try:
+        visualizer = session.get(csv_path, name_mappings, on_event=ctx.on_event, profiler=profiler)
+        ctx.plan(visualizer)
+        visualizer.create_visualization(position, output_path)
+    finally:
+        profiler.stop()
+
+    return {
+        'output': output_path,
+        'unmatched': len(visualizer.unmatched_names),
+        'profile': profiler.report_lines(),
+    }
+
+
+def _run_mappings(session, ctx, name_mappings):
+    if session.visualizer is not None:
+        session.visualizer.on_event = ctx.on_event
+        session.visualizer.update_name_mappings(name_mappings)
+    return {}
+
+
+_ACTIONS = {
+    'check': _run_check,
+    'generate': _run_generate,
+    'mappings': _run_mappings,
+}
+
+
+def _worker_main(requests, events, cancelled_job):
+    """Worker process loop: run jobs one at a time against a warm session"""
+    session = VisualizerSession()
+
+    # Load the data stack before the first job arrives
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        pass
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+
+        job_id, action, params = request
+        ctx = _JobContext(job_id, events, cancelled_job)
+        try:
+            ctx.check_cancelled()
+            ctx.send('result', _ACTIONS[action](session, ctx, **params))
+        except JobCancelled:
+            ctx.send('cancelled')
+        except Exception as e:
+            # The GUI log gets the worker's traceback; the error dialog just the message
+            ctx.send('log', traceback.format_exc().rstrip())
+            ctx.send('error', str(e))
+
+
+class JobRunner:
+    """GUI-side handle to the worker process"""
+
+    def __init__(self):
+        # spawn everywhere: forking a process that has Tk running is unsafe
+        self._mp = multiprocessing.get_context('spawn')
+        self.process = None
+        self.requests = None
+        self.events = None
+        self.cancelled_job = None
+        self.current_job = None
+        self._next_job_id = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.current_job is not None
+
+    def start(self):
+        """Start the worker process if it isn't running"""
+        if self.process is not None and self.process.is_alive():
+            return
+
+        self.requests = self._mp.Queue()
+        self.events = self._mp.Queue()
+        self.cancelled_job = self._mp.Value('i', 0)
+        self.process = self._mp.Process(
+            target=_worker_main,
+            args=(self.requests, self.events, self.cancelled_job),
+            daemon=True
+        )
+        self.process.start()
+
+    def submit(self, action, **params) -> int:
+        """Queue a job ('check', 'generate' or 'mappings') and return its id"""
+        self.start()
+        self._next_job_id += 1
+        job_id = self._next_job_id
+        if action != 'mappings':
+            self.current_job = job_id
+        self.requests.put((job_id, action, params))
+        return job_id
+
+    def cancel(self):
+        """Ask the worker to stop the current job at its next checkpoint"""
+        if self.current_job is not None:
+            self.cancelled_job.value = self.current_job
+
+    def terminate(self):
+        """Kill the worker outright (loses the warm session)"""
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join(timeout=5)
+        self.process = None
+        self.current_job = None
+
+    def poll(self) -> list:
+        """Drain pending (job_id, kind, payload) events without blocking"""
+        received = []
+        if self.events is None:
+            return received
+
+        try:
+            while True:
+                job_id, kind, payload = self.events.get_nowait()
+                if kind in ('result', 'error', 'cancelled') and job_id == self.current_job:
+                    self.current_job = None
+                received.append((job_id, kind, payload))
+        except queue.Empty:
+            pass
+
+        if self.current_job is not None and not self.process.is_alive():
+            received.append((self.current_job, 'error', 'Worker process exited unexpectedly'))
+            self.current_job = None
+            self.process = None
+
+        return received
+
+    def shutdown(self):
+        """Stop the worker, giving it a moment to exit cleanly"""
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout=2)
+        self.terminate()
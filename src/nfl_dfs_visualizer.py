@@ -4,79 +4,440 @@ Stokastic NFL Boom/Bust Visualization - React/Recharts version
 Generates standalone HTML using React + Recharts (same as NBA implementation)
 """
 
-import pandas as pd
-import numpy as np
+# Heavy dependencies (pandas, requests, PIL, nfl_data_py) are imported where
+# they are used so the CLI and GUI start without paying for them up front.
 import argparse
-from typing import Optional
-import requests
-from PIL import Image
-from io import BytesIO
-import base64
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from typing import Callable, Optional
 import os
 from pathlib import Path
 import json
 
+from profiling import PipelineProfiler
+from slate_loader import load_slate
+
+# Largest size the chart and table draw a headshot at (48px), doubled for
+# high-DPI screens; picks the headshot variant when a manifest is used
+HEADSHOT_PIXELS = 96
+
+
+class ConsoleProgress:
+    """Renders visualizer events on the console with throttled progress lines"""
+
+    def __init__(self, min_interval: float = 0.5, verbose: bool = False, stream=None):
+        self.min_interval = min_interval
+        self.verbose = verbose
+        self.stream = stream or sys.stdout
+        self._last_progress = 0.0
+        self._progress_open = False
+
+    def __call__(self, event: str, data: dict):
+        if event == 'progress':
+            self._progress(data)
+            return
+
+        self._end_progress()
+        if event == 'log':
+            print(data['message'], file=self.stream)
+        elif event == 'match' and self.verbose:
+            if data['method'] == 'none':
+                print(f"No headshot found for: {data['player']} ({data['team']})", file=self.stream)
+            elif data.get('matched_name'):
+                print(f"Matched ({data['method']}): {data['player']} -> {data['matched_name']}", file=self.stream)
+        elif event == 'summary':
+            counts = ', '.join(f"{method}: {n}" for method, n in sorted(data['counts'].items()))
+            print(f"Headshot matches - {counts or 'none'}", file=self.stream)
+
+    def _progress(self, data: dict):
+        now = time.monotonic()
+        finished = data['done'] == data['total']
+        if data['done'] == 1:
+            self._last_progress = now
+        if not finished and now - self._last_progress < self.min_interval:
+            return
+        self._last_progress = now
+
+        line = f"    {data['stage']}: {data['done']}/{data['total']} players"
+        if self.stream.isatty():
+            self.stream.write('\r' + line)
+            self._progress_open = not finished
+            if finished:
+                self.stream.write('\n')
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def _end_progress(self):
+        if self._progress_open:
+            self.stream.write('\n')
+            self._progress_open = False
+
+
+class RosterIndex:
+    """Name/team lookups over the roster frame, built once and shared across runs"""
+
+    def __init__(self, roster):
+        self.frame = roster
+        self.by_name = {}
+        self.by_name_team = {}
+        self.rows = []
+        self.rows_by_team = defaultdict(list)
+
+        if roster is None or roster.empty or 'player_name' not in roster.columns:
+            return
+
+        names = roster['player_name'].tolist()
+        teams = roster['team'].tolist() if 'team' in roster.columns else [None] * len(names)
+        urls = roster['headshot_url'].tolist() if 'headshot_url' in roster.columns else [None] * len(names)
+
+        for name, team, url in zip(names, teams, urls):
+            if not isinstance(url, str):
+                url = None
+
+            # First roster row wins, same as taking iloc[0] of a filtered frame
+            self.by_name.setdefault(name, url)
+            self.by_name_team.setdefault((name, team), url)
+
+            if isinstance(name, str):
+                self.rows.append((name, url))
+                self.rows_by_team[team].append((name, url))
+
+    @property
+    def empty(self) -> bool:
+        return self.frame is None or self.frame.empty
+
+    def search(self, text: str, team: str = None) -> Optional[tuple]:
+        """First (name, url) whose name contains text (case-insensitive regex, like str.contains)"""
+        try:
+            pattern = re.compile(text, re.IGNORECASE)
+        except re.error:
+            pattern = re.compile(re.escape(text), re.IGNORECASE)
+
+        rows = self.rows if team is None else self.rows_by_team.get(team, ())
+        for row in rows:
+            if pattern.search(row[0]):
+                return row
+        return None
+
+    def match(self, player_name: str, team: str, name_mappings: Optional[dict] = None,
+              profiler: Optional[PipelineProfiler] = None, fuzzy: bool = True) -> tuple:
+        """
+        Match a slate player to a roster headshot URL, trying a custom name mapping,
+        the exact name and team, the last name within the team and finally (unless
+        fuzzy is False) the full name on any team.
+        Returns (method, matched name, url), or (None, None, None) without a match.
+        """
+        stage = profiler.stage if profiler is not None else (lambda name: nullcontext())
+
+        # Check custom name mappings first
+        mapping_key = f"{player_name}|{team}"
+        if name_mappings and mapping_key in name_mappings:
+            with stage('match: mapping'):
+                mapped_name = name_mappings[mapping_key]
+                url = self.by_name.get(mapped_name)
+            if url:
+                return 'mapping', mapped_name, url
+
+        # Exact match
+        with stage('match: exact'):
+            url = self.by_name_team.get((player_name, team))
+
+        if url:
+            return 'exact', player_name, url
+
+        # Fuzzy match by last name
+        name_parts = player_name.split()
+        if len(name_parts) >= 2:
+            last_name = name_parts[-1]
+
+            with stage('match: last name'):
+                row = self.search(last_name, team)
+
+            if row and row[1]:
+                return 'last name', row[0], row[1]
+
+        # Fuzzy match without team filter
+        if fuzzy:
+            with stage('match: fuzzy'):
+                row = self.search(player_name)
+
+            if row and row[1]:
+                return 'fuzzy', row[0], row[1]
+
+        return None, None, None
+
 
 class NFLDFSVisualizer:
     """Generates React/Recharts visualization (matches NBA implementation)"""
 
-    def __init__(self, csv_path: str, name_mappings: Optional[dict] = None):
+    # Cached roster downloads are reused for this long before nfl_data_py is hit again
+    ROSTER_CACHE_MAX_AGE = 24 * 60 * 60
+    ROSTER_COLUMNS = ['player_name', 'team', 'position', 'headshot_url']
+
+    def __init__(self, csv_path: str, name_mappings: Optional[dict] = None,
+                 profiler: Optional[PipelineProfiler] = None,
+                 on_event: Optional[Callable[[str, dict], None]] = None,
+                 refresh_roster: bool = False,
+                 roster_index: Optional[RosterIndex] = None,
+                 sims: int = 100_000,
+                 optimal_sims: int = 0,
+                 stack_sims: int = 10_000,
+                 aggregates=None,
+                 headshots=None):
         self.csv_path = csv_path
+        self.refresh_roster = refresh_roster
+        # Simulations used to fill missing Boom%/Bust%/Ceiling (0 leaves them empty)
+        self.sims = sims
+        # Simulated lineups solved to fill a missing Optimal% (0, the default, leaves it
+        # empty: a fill is ~1000 MILP solves, serial in the GUI's daemonic worker)
+        self.optimal_sims = optimal_sims
+        # Correlated per-game sims behind the stack boom rates in Game Environments (0 skips them)
+        self.stack_sims = stack_sims
+        self.stacks = None
         self.df = None
         self.roster_cache = None
+        self.roster_index = roster_index
         self.name_mappings = name_mappings or {}
         self.unmatched_names = []
+        self.profiler = profiler or PipelineProfiler()
+
+        # Event callback: on_event(event, data) with event one of
+        # 'log', 'match', 'progress' or 'summary'. Without a callback
+        # only 'log' messages are printed.
+        self.on_event = on_event
+
+        # Resolved headshot URLs and the method that matched them,
+        # both keyed by (name, team, position)
+        self._headshot_cache = {}
+        self._match_methods = {}
+
+        # Prepared PlayerTables keyed by position (views of ALL), reused until invalidated
+        self._prepared = {}
+
+        # Delta against an earlier export of the slate (see compare_with)
+        self.slate_delta = None
+
+        # Team/game aggregates; pass the previous run's SlateAggregates to only
+        # recompute the groups a refreshed CSV changed
+        self.aggregates = aggregates
+
+        # Self-hosted headshots (a headshot_manifest.HeadshotManifest); players
+        # found in it get the smallest adequate variant instead of the roster's URL
+        self.headshots = headshots
 
         # Create cache directory for headshots
         self.cache_dir = Path('headshot_cache')
         self.cache_dir.mkdir(exist_ok=True)
 
-        self._load_data()
-        self._load_roster_data()
+        with self.profiler.stage('load csv'):
+            self._load_data()
+        with self.profiler.stage('load roster'):
+            # An empty index is a failed load (offline, nfl_data_py missing): try again
+            if self.roster_index is not None and not self.roster_index.empty:
+                self.roster_cache = self.roster_index.frame
+                self._log(f"Reusing loaded roster data: {len(self.roster_cache)} players")
+            else:
+                self._load_roster_data()
+                self.roster_index = RosterIndex(self.roster_cache)
+
+    @property
+    def simulated_columns(self) -> list:
+        """Stat columns filled by simulation rather than read from the CSV"""
+        from simulation import simulated_columns
+
+        return simulated_columns(self.df)
+
+    @property
+    def match_counts(self) -> Counter:
+        """Number of resolved players per match method"""
+        return Counter(self._match_methods.values())
+
+    def _emit(self, event: str, **data):
+        """Aggregate an event and hand it to the registered callback"""
+        if event == 'match':
+            self._match_methods[(data['player'], data['team'], data['position'])] = data['method']
+            self.profiler.count(f"matched: {data['method']}")
+
+        if self.on_event is not None:
+            self.on_event(event, data)
+        elif event == 'log':
+            print(data['message'])
+
+    def _log(self, message: str):
+        """Emit a human-readable progress message"""
+        self._emit('log', message=message)
 
     def _load_data(self):
         """Load CSV data"""
-        print(f"Loading data from {self.csv_path}...")
-        self.df = pd.read_csv(self.csv_path)
-        self.df.columns = self.df.columns.str.strip()
-
-        if 'Salary' in self.df.columns:
-            self.df['Salary'] = self.df['Salary'].str.replace('$', '').str.replace(',', '').astype(float)
+        self._log(f"Loading data from {self.csv_path}...")
+        self.df = load_slate(self.csv_path)
+        self._log(f"Loaded {len(self.df)} players")
+
+        if self.sims:
+            from simulation import fill_simulated_stats
+
+            with self.profiler.stage('simulate'):
+                filled = fill_simulated_stats(self.df, sims=self.sims)
+            if filled:
+                self._log(f"Simulated {', '.join(filled)} from Projection/Std Dev ({self.sims:,} sims; "
+                          f"not in the CSV)")
+
+        if self.optimal_sims:
+            from optimizer import fill_optimal_pct
+
+            with self.profiler.stage('optimize lineups'):
+                filled = fill_optimal_pct(self.df, sims=self.optimal_sims, workers=os.cpu_count() or 1)
+            if filled:
+                self._log(f"Computed Optimal% from {self.optimal_sims:,} simulated optimal lineups (not in the CSV)")
+
+    def save_to_history(self, store, week: int, season: int = None, slate: str = 'main') -> bool:
+        """
+        Append the loaded slate to a SlateStore; False if this CSV was already stored.
+        Simulated columns (see simulated_columns) are left out of the history.
+        """
+        from slate_store import file_hash
+
+        season = season or self.current_season()
+        with self.profiler.stage('save history'):
+            slate_id, added = store.ingest(self.df, season, week, slate,
+                                           content_hash=file_hash(self.csv_path), source_path=self.csv_path)
+
+        if added:
+            self._log(f"Saved slate to history: {season} week {week} ({slate})")
+            return True
+
+        stored = store.slate_key(slate_id)
+        message = f"Slate already in history: {stored['season']} week {stored['week']} ({stored['slate']})"
+        if (stored['season'], stored['week'], stored['slate']) != (season, week, slate):
+            message += f"; not saved again as {season} week {week} ({slate})"
+        self._log(message)
+        return False
+
+    def compare_with(self, previous_csv_path: str):
+        """Diff the loaded slate against an earlier export; shown as arrows in the table"""
+        from slate_delta import compute_delta
+
+        self._log(f"Comparing against {previous_csv_path}...")
+        with self.profiler.stage('slate delta'):
+            self.slate_delta = compute_delta(load_slate(previous_csv_path), self.df)
+
+        counts = self.slate_delta['status'].value_counts()
+        self._log(f"Matched {counts.get('matched', 0)} players, {counts.get('added', 0)} added, "
+                  f"{counts.get('removed', 0)} removed")
+        return self.slate_delta
+
+    def update_aggregates(self):
+        """Bring the team/game aggregates up to date with the loaded slate"""
+        if self.aggregates is None:
+            from aggregates import SlateAggregates
+            self.aggregates = SlateAggregates()
+
+        with self.profiler.stage('aggregate'):
+            recomputed = self.aggregates.update(self.df)
+        self.profiler.count('aggregate groups recomputed', sum(recomputed.values()))
+        return self.aggregates
+
+    def update_stacks(self):
+        """QB + same-team WR/TE stack boom rates from the per-game correlated simulation (once per slate)"""
+        if self.stacks is not None or not self.stack_sims:
+            return self.stacks
+        if self.df['Projection'].isna().all() or self.df['Std Dev'].isna().all():
+            return None
 
-        numeric_cols = ['Projection', 'Std Dev', 'Ceiling', 'Bust%', 'Boom%', 'Own%', 'Optimal%', 'Leverage']
-        for col in numeric_cols:
-            if col in self.df.columns:
-                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+        from simulation import simulate_stacks
+
+        with self.profiler.stage('simulate stacks'):
+            self.stacks = simulate_stacks(self.df, sims=self.stack_sims)
+        self._log(f"Simulated {len(self.stacks)} QB stacks ({self.stack_sims:,} correlated sims)")
+        return self.stacks
+
+    def export_players(self, output_path: str):
+        """
+        Write the prepared player table (resolved headshots included) as Parquet
+        or Arrow IPC, so notebooks can skip the CSV parse and name matching
+        """
+        from slate_loader import pyarrow_available
+
+        if not pyarrow_available():
+            self._log("Warning: Player table export needs pyarrow (pip install pyarrow); skipped")
+            return
+
+        self.prepare_all_positions()
+        with self.profiler.stage('export players'):
+            self._prepared['ALL'].write(output_path, metadata={'source_csv': os.path.abspath(self.csv_path)})
+        self._log(f"Player table written to: {output_path}")
+
+    def export_aggregates(self, output_path: str):
+        """Write team and game aggregates to .csv or .parquet"""
+        self.update_aggregates().export(output_path)
+        self._log(f"Aggregates written to: {output_path}")
+
+    @staticmethod
+    def current_season() -> int:
+        """NFL season year for today's date"""
+        import datetime
+
+        # NFL season starts in September and ends in February
+        # If we're in Jan-Aug, use previous year's season
+        current_date = datetime.datetime.now()
+        if current_date.month < 9:
+            return current_date.year - 1
+        return current_date.year
+
+    @classmethod
+    def load_roster(cls, season: int, cache_dir=Path('headshot_cache'), refresh: bool = False,
+                    log: Callable[[str], None] = print) -> tuple:
+        """
+        Season roster as (frame, from_cache): cache_dir/roster_{season}.csv while it is
+        younger than ROSTER_CACHE_MAX_AGE, otherwise downloaded with nfl_data_py and cached.
+        """
+        import pandas as pd
+
+        roster_file = Path(cache_dir) / f"roster_{season}.csv"
+
+        if not refresh and roster_file.exists():
+            age = time.time() - roster_file.stat().st_mtime
+            if age < cls.ROSTER_CACHE_MAX_AGE:
+                roster = pd.read_csv(roster_file)
+                log(f"Roster data loaded from cache: {len(roster)} players")
+                return roster, True
+
+        import nfl_data_py as nfl
+
+        log(f"Loading {season} season roster data...")
+        roster = nfl.import_seasonal_rosters([season])
+        log(f"Roster data loaded: {len(roster)} players")
 
-        print(f"Loaded {len(self.df)} players")
+        try:
+            columns = [c for c in cls.ROSTER_COLUMNS if c in roster.columns]
+            roster[columns].to_csv(roster_file, index=False)
+        except Exception as e:
+            log(f"Warning: Could not cache roster data: {e}")
+        return roster, False
 
     def _load_roster_data(self):
-        """Load NFL roster data for current season"""
-        try:
-            print("Loading NFL roster data...")
-            import nfl_data_py as nfl
-            import datetime
-
-            # Determine current NFL season year
-            # NFL season starts in September and ends in February
-            # If we're in Jan-Aug, use previous year's season
-            current_date = datetime.datetime.now()
-            current_year = current_date.year
-
-            if current_date.month < 9:
-                season_year = current_year - 1
-            else:
-                season_year = current_year
+        """Load NFL roster data for current season (from the local cache when fresh)"""
+        import pandas as pd
 
-            print(f"Loading {season_year} season roster data...")
-            self.roster_cache = nfl.import_seasonal_rosters([season_year])
-            print(f"Roster data loaded: {len(self.roster_cache)} players")
+        try:
+            self._log("Loading NFL roster data...")
+            self.roster_cache, cached = self.load_roster(self.current_season(), self.cache_dir,
+                                                         self.refresh_roster, self._log)
+            self.profiler.count('roster cache hit' if cached else 'roster cache miss')
         except Exception as e:
-            print(f"Warning: Could not load roster data: {e}")
+            self._log(f"Warning: Could not load roster data: {e}")
             self.roster_cache = pd.DataFrame()
 
     def _get_base64_from_cache(self, filename: str, max_size: int = 300) -> Optional[str]:
         """Load cached image, compress/resize, and convert to base64 data URL"""
+        import base64
+        from io import BytesIO
+        from PIL import Image
+
         local_path = self.cache_dir / filename
 
         if not local_path.exists():
@@ -101,11 +462,13 @@ class NFLDFSVisualizer:
             img_base64 = base64.b64encode(img_data).decode()
             return f"data:image/jpeg;base64,{img_base64}"
         except Exception as e:
-            print(f"Failed to load cached image {filename}: {e}")
+            self._log(f"Failed to load cached image {filename}: {e}")
             return None
 
     def _download_and_cache_image(self, url: str, filename: str) -> Optional[str]:
         """Download image, save to cache, and return base64 data URL"""
+        import requests
+
         local_path = self.cache_dir / filename
 
         if local_path.exists():
@@ -116,10 +479,10 @@ class NFLDFSVisualizer:
             if response.status_code == 200:
                 with open(local_path, 'wb') as f:
                     f.write(response.content)
-                print(f"Cached: {filename}")
+                self._log(f"Cached: {filename}")
                 return self._get_base64_from_cache(filename)
         except Exception as e:
-            print(f"Failed to cache {filename}: {e}")
+            self._log(f"Failed to cache {filename}: {e}")
 
         return None
 
@@ -129,71 +492,99 @@ class NFLDFSVisualizer:
         return url
 
     def _get_headshot_url(self, player_name: str, team: str, position: str = None) -> Optional[str]:
-        """Get NFL headshot URL or team logo URL"""
+        """Get NFL headshot URL or team logo URL (memoized per name/team/position)"""
+        cache_key = (player_name, team, position)
+        if cache_key in self._headshot_cache:
+            self.profiler.count('headshot cache hit')
+            return self._headshot_cache[cache_key]
+
+        self.profiler.count('headshot cache miss')
+        url = self._resolve_headshot_url(player_name, team, position)
+        self._headshot_cache[cache_key] = url
+        return url
+
+    def _resolve_headshot_url(self, player_name: str, team: str, position: str = None) -> Optional[str]:
+        """Resolve a headshot URL against the roster, trying each match method in turn"""
+        matched = {'player': player_name, 'team': team, 'position': position}
 
         if position == 'DST':
+            self._emit('match', method='dst logo', **matched)
             return self._get_team_logo_url(team)
 
-        if self.roster_cache is None or self.roster_cache.empty:
-            return None
-
-        # Check custom name mappings first
-        mapping_key = f"{player_name}|{team}"
-        if mapping_key in self.name_mappings:
-            mapped_name = self.name_mappings[mapping_key]
-            print(f"Using custom mapping: {player_name} -> {mapped_name}")
-            match = self.roster_cache[self.roster_cache['player_name'] == mapped_name]
-            if not match.empty and 'headshot_url' in match.columns:
-                url = match.iloc[0]['headshot_url']
-                if pd.notna(url):
-                    return url
-
-        # Exact match
-        match = self.roster_cache[
-            (self.roster_cache['player_name'] == player_name) &
-            (self.roster_cache['team'] == team)
-        ]
-
-        if not match.empty and 'headshot_url' in match.columns:
-            url = match.iloc[0]['headshot_url']
-            if pd.notna(url):
+        if self.headshots is not None:
+            mapped_name = self.name_mappings.get(f"{player_name}|{team}", player_name)
+            url = self.headshots.url(mapped_name, HEADSHOT_PIXELS)
+            if url:
+                self._emit('match', method='manifest', matched_name=mapped_name, **matched)
                 return url
 
-        # Fuzzy match by last name
-        name_parts = player_name.split()
-        if len(name_parts) >= 2:
-            last_name = name_parts[-1]
-
-            match = self.roster_cache[
-                (self.roster_cache['player_name'].str.contains(last_name, case=False, na=False)) &
-                (self.roster_cache['team'] == team)
-            ]
-
-            if not match.empty and 'headshot_url' in match.columns:
-                url = match.iloc[0]['headshot_url']
-                if pd.notna(url):
-                    print(f"Fuzzy matched: {player_name} -> {match.iloc[0]['player_name']}")
-                    return url
-
-        # Fuzzy match without team filter
-        match = self.roster_cache[
-            self.roster_cache['player_name'].str.contains(player_name, case=False, na=False)
-        ]
+        if self.roster_index is None or self.roster_index.empty:
+            return None
 
-        if not match.empty and 'headshot_url' in match.columns:
-            url = match.iloc[0]['headshot_url']
-            if pd.notna(url):
-                print(f"Fuzzy matched (no team): {player_name} -> {match.iloc[0]['player_name']}")
-                return url
+        method, matched_name, url = self.roster_index.match(player_name, team, self.name_mappings, self.profiler)
+        if url:
+            self._emit('match', method=method, matched_name=matched_name, **matched)
+            return url
 
         # Track unmatched names
         unmatched_info = {'name': player_name, 'team': team, 'position': position}
         if unmatched_info not in self.unmatched_names:
             self.unmatched_names.append(unmatched_info)
 
-        print(f"No headshot found for: {player_name} ({team})")
+        self._emit('match', method='none', **matched)
         return None
 
+    def _forget_headshots(self, affected):
+        """Drop cached headshot resolutions for the given (name, team) pairs"""
+        for cache_key in [k for k in self._headshot_cache if k[:2] in affected]:
+            del self._headshot_cache[cache_key]
+            self._match_methods.pop(cache_key, None)
+
+    def update_name_mappings(self, name_mappings: dict) -> set:
+        """
+        Swap in a new set of name mappings, re-resolving only affected players.
+        Returns the mapping keys ("Name|TEAM") whose value changed.
+        """
+        old_mappings = self.name_mappings
+        changed = {
+            key for key in set(old_mappings) | set(name_mappings)
+            if old_mappings.get(key) != name_mappings.get(key)
+        }
+        self.name_mappings = dict(name_mappings)
+        if not changed:
+            return changed
+
+        affected = {tuple(key.split('|', 1)) for key in changed}
+        self._forget_headshots(affected)
+        old_unmatched = self.unmatched_names
+        self.unmatched_names = [
+            info for info in self.unmatched_names if (info['name'], info['team']) not in affected
+        ]
+
+        # Patch already-prepared players in place instead of re-preparing everything;
+        # position views share the ALL table's storage. URLs are resolved before any
+        # row is written: if that's interrupted (e.g. a cancelled job), the old
+        # mappings are restored so the next call sees, and patches, the same changes.
+        players = self._prepared.get('ALL')
+        if players is not None:
+            patches = []
+            try:
+                for name, team in affected:
+                    rows = players.where('player_name', name).where('team_abbr', team)
+                    for i in range(len(rows)):
+                        headshot_url = self._get_headshot_url(name, team, rows.value('position', i))
+                        patches.append((rows, i, headshot_url or self._get_team_logo_url(team)))
+            except BaseException:
+                self.name_mappings = old_mappings
+                self.unmatched_names = old_unmatched
+                self._forget_headshots(affected)
+                raise
+            for rows, i, headshot_url in patches:
+                rows.set_value('headshot_url', i, headshot_url)
+
+        self._log(f"Applied {len(changed)} name mapping change(s)")
+        return changed
+
     def find_potential_matches(self, player_name: str, team: str = None, limit: int = 10) -> list:
         """Find potential roster matches for a player name"""
         if self.roster_cache is None or self.roster_cache.empty:
@@ -225,77 +616,114 @@ class NFLDFSVisualizer:
 
         return potential_matches
 
-    def prepare_data_for_position(self, position_filter: str = 'ALL'):
+    def prepare_data_for_position(self, position_filter: str = 'ALL') -> 'PlayerTable':
         """Prepare data for a single position"""
+        from player_table import PlayerTable
+        from simulation import CURVE_PERCENTILES, percentile_curves
 
         if position_filter != 'ALL':
-            df_filtered = self.df[self.df['Position'] == position_filter].copy()
+            df_filtered = self.df[self.df['Position'] == position_filter]
         else:
-            df_filtered = self.df.copy()
+            df_filtered = self.df
 
-        print(f"  {len(df_filtered)} {position_filter} players")
+        self._log(f"  {len(df_filtered)} {position_filter} players")
 
-        # Prepare player data with headshots
-        players_data = []
-        for idx, row in df_filtered.iterrows():
-            headshot_url = self._get_headshot_url(row['Name'], row['Team'], row['Position'])
+        # Resolve headshots; the stats go into the table as column arrays
+        headshot_urls = []
+        total = len(df_filtered)
+        rows = zip(df_filtered['Name'].tolist(), df_filtered['Team'].tolist(), df_filtered['Position'].tolist())
+        for done, (name, team, position) in enumerate(rows, 1):
+            headshot_url = self._get_headshot_url(name, team, position)
 
             # Use team logo as fallback if no player headshot found
             if not headshot_url:
-                headshot_url = self._get_team_logo_url(row['Team'])
-
-            players_data.append({
-                'player_name': row['Name'],
-                'player_id': f"{row['Name'].replace(' ', '_')}_{idx}",
-                'position': row['Position'],
-                'team_abbr': row['Team'],
-                'salary': float(row['Salary']),
-                'dk_projection': float(row['Projection']) if pd.notna(row['Projection']) else 0,
-                'std_dev': float(row['Std Dev']) if pd.notna(row['Std Dev']) else 0,
-                'ceiling': float(row['Ceiling']) if pd.notna(row['Ceiling']) else 0,
-                'bust_pct': float(row['Bust%']) if pd.notna(row['Bust%']) else 0,
-                'boom_pct': float(row['Boom%']) if pd.notna(row['Boom%']) else 0,
-                'ownership_pct': float(row['Own%']) if pd.notna(row['Own%']) else 0,
-                'optimal_pct': float(row['Optimal%']) if pd.notna(row['Optimal%']) else 0,
-                'leverage': float(row['Leverage']) if pd.notna(row['Leverage']) else 0,
-                'headshot_url': headshot_url
-            })
+                headshot_url = self._get_team_logo_url(team)
+
+            headshot_urls.append(headshot_url)
+            self._emit('progress', stage=position_filter, done=done, total=total)
+
+        # Outcome curves (p5..p95) for the tooltip sparklines
+        curves = percentile_curves(df_filtered['Projection'].to_numpy(), df_filtered['Std Dev'].to_numpy())
 
-        return players_data
+        return PlayerTable.from_frame(df_filtered, headshot_urls, curves, CURVE_PERCENTILES)
+
+    def _positions(self) -> list:
+        """ALL followed by every position in the slate"""
+        return ['ALL'] + sorted(self.df['Position'].unique().tolist())
+
+    def pending_player_count(self) -> int:
+        """Player rows prepare_all_positions() still has to resolve"""
+        return 0 if 'ALL' in self._prepared else len(self.df)
+
+    def prepare_all_positions(self) -> dict:
+        """PlayerTables for ALL plus each position, reusing earlier results"""
+        positions = self._positions()
+
+        if 'ALL' not in self._prepared:
+            self._log("  Processing ALL...")
+            with self.profiler.stage('prepare players'):
+                self._prepared['ALL'] = self.prepare_data_for_position('ALL')
+
+        # Per-position tables are views of ALL, no second pass over the rows
+        players = self._prepared['ALL']
+        for pos in positions[1:]:
+            if pos not in self._prepared:
+                self._prepared[pos] = players.where('position', pos)
+
+        return {pos: self._prepared[pos] for pos in positions}
 
     def create_visualization(self, position_filter: str = 'ALL', output_path: str = 'boom_bust.html'):
         """Create multi-position visualization with dropdown selector using React/Recharts"""
 
-        positions = ['ALL'] + sorted(self.df['Position'].unique().tolist())
-        print(f"Generating visualizations for positions: {', '.join(positions)}")
+        positions = self._positions()
+        self._log(f"Generating visualizations for positions: {', '.join(positions)}")
 
         # Prepare data for all positions
-        all_data = {}
-        for pos in positions:
-            print(f"  Processing {pos}...")
-            all_data[pos] = self.prepare_data_for_position(pos)
+        self.prepare_all_positions()
+        self.update_aggregates()
+        self.update_stacks()
 
         # Default position
         default_position = 'QB' if 'QB' in positions else positions[0]
 
-        print(f"\nSaving visualization to {output_path}...")
+        self._log(f"\nSaving visualization to {output_path}...")
 
         # Generate HTML with React/Recharts
-        html_content = self._generate_react_html(all_data, positions, default_position)
+        with self.profiler.stage('serialize html'):
+            payload = self._prepared['ALL'].to_payload(group_by='position')
+            html_content = self._generate_react_html(payload, positions, default_position)
 
-        with open(output_path, 'w') as f:
-            f.write(html_content)
+        with self.profiler.stage('write html'):
+            with open(output_path, 'w') as f:
+                f.write(html_content)
 
-        print(f"✓ Visualization saved to: {output_path}")
+        self._emit('summary', counts=dict(self.match_counts), unmatched=len(self.unmatched_names))
+        self._log(f"✓ Visualization saved to: {output_path}")
         file_size_mb = Path(output_path).stat().st_size / (1024 * 1024)
-        print(f"File size: {file_size_mb:.1f} MB")
-        print(f"Open {output_path} in your browser to view")
-        print(f"Default position: {default_position}")
+        self._log(f"File size: {file_size_mb:.1f} MB")
+        self._log(f"Open {output_path} in your browser to view")
+        self._log(f"Default position: {default_position}")
 
-    def _generate_react_html(self, all_data: dict, positions: list, default_position: str) -> str:
+    def _generate_react_html(self, payload: dict, positions: list, default_position: str) -> str:
         """Generate standalone HTML with React/Recharts"""
 
-        data_json = json.dumps(all_data)
+        data_json = json.dumps(payload, separators=(',', ':'))
+        curves = payload.get('curves')
+        curve_json = json.dumps({'scale': curves['scale'], 'bits': curves['bits']} if curves else None)
+
+        aggregates_json = json.dumps(self.aggregates.to_payload() if self.aggregates else None,
+                                     separators=(',', ':'))
+
+        stacks_json = 'null'
+        if self.stacks is not None and len(self.stacks):
+            stacks = self.stacks.round(1)
+            stacks_json = json.dumps(stacks.astype(object).where(stacks.notna(), None).to_dict('records'),
+                                     separators=(',', ':'))
+
+        delta_json = 'null'
+        if self.slate_delta is not None:
+            from slate_delta import delta_payload
+            delta_json = json.dumps(delta_payload(self.slate_delta), separators=(',', ':'))
 
         return f"""<!DOCTYPE html>
 <html lang="en">
@@ -1122,6 +1550,52 @@ class NFLDFSVisualizer:
             text-transform: uppercase;
         }}
 
+        .aggregate-levels {{
+            display: flex;
+            gap: 4px;
+            margin-bottom: 12px;
+        }}
+
+        .player-tooltip {{
+            background: #ffffff;
+            border: 1px solid #d1d5db;
+            border-radius: 6px;
+            padding: 8px 10px;
+            font-size: 13px;
+            color: #1f2937;
+            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.12);
+        }}
+
+        .player-tooltip-name {{
+            font-weight: 700;
+            margin-bottom: 4px;
+        }}
+
+        .outcome-sparkline {{
+            margin-top: 6px;
+        }}
+
+        .outcome-sparkline-range {{
+            display: flex;
+            justify-content: space-between;
+            font-size: 11px;
+            color: #6b7280;
+        }}
+
+        .data-table .delta-arrow {{
+            margin-left: 4px;
+            font-size: 0.7em;
+            cursor: help;
+        }}
+
+        .data-table .delta-up {{
+            color: #16a34a;
+        }}
+
+        .data-table .delta-down {{
+            color: #dc2626;
+        }}
+
         .data-table .player-headshot {{
             width: 32px;
             height: 32px;
@@ -1256,8 +1730,97 @@ class NFLDFSVisualizer:
         const {{ useState, useEffect }} = React;
         const {{ ScatterChart, Scatter, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, ReferenceLine, ReferenceArea }} = Recharts;
 
-        // All data embedded
-        const allData = {data_json};
+        // All data embedded as a compact columnar payload (see PlayerTable.to_payload),
+        // expanded once into player objects shared by ALL and the position lists
+        const decodePlayers = (payload) => {{
+            const players = new Array(payload.count);
+
+            // Quantized outcome curves: one row of codes per player, plotted as-is
+            const curves = payload.curves;
+            let curveCodes = null;
+            if (curves) {{
+                const bytes = Uint8Array.from(atob(curves.data), c => c.charCodeAt(0));
+                curveCodes = curves.bits === 16 ? new Uint16Array(bytes.buffer) : bytes;
+            }}
+            for (let i = 0; i < payload.count; i++) {{
+                const player = {{}};
+                for (const field in payload.codes) {{
+                    const code = payload.codes[field][i];
+                    player[field] = code < 0 ? null : payload.strings[field][code];
+                }}
+                for (const field in payload.stats) {{
+                    player[field] = payload.stats[field][i];
+                }}
+                player.player_id = `${{player.player_name.replace(/ /g, '_')}}_${{payload.ids[i]}}`;
+                if (curveCodes) {{
+                    const width = curves.percentiles.length;
+                    player.curve = curveCodes.subarray(i * width, (i + 1) * width);
+                }}
+                players[i] = player;
+            }}
+
+            const data = {{ ALL: players }};
+            for (const group in payload.groups) {{
+                data[group] = payload.groups[group].map(i => players[i]);
+            }}
+            return data;
+        }};
+
+        const allData = decodePlayers({data_json});
+        const curveInfo = {curve_json};
+
+        // p5..p95 outcome sparkline; codes are plotted directly against the shared code range
+        const OutcomeSparkline = ({{ curve }}) => {{
+            const width = 140, height = 36;
+            const top = curveInfo.bits === 16 ? 65535 : 255;
+            const step = width / (curve.length - 1);
+            const points = Array.from(curve, (code, i) => `${{(i * step).toFixed(1)}},${{(height - code / top * height).toFixed(1)}}`).join(' ');
+            const median = curve[Math.floor(curve.length / 2)];
+            return (
+                <div className="outcome-sparkline">
+                    <svg width={{width}} height={{height}}>
+                        <polyline points={{points}} fill="none" stroke="#2563eb" strokeWidth="2" />
+                    </svg>
+                    <div className="outcome-sparkline-range">
+                        <span>p5 {{(curve[0] * curveInfo.scale).toFixed(1)}}</span>
+                        <span>p50 {{(median * curveInfo.scale).toFixed(1)}}</span>
+                        <span>p95 {{(curve[curve.length - 1] * curveInfo.scale).toFixed(1)}}</span>
+                    </div>
+                </div>
+            );
+        }};
+
+        // Team and game totals (see aggregates.SlateAggregates); null if not computed
+        const slateAggregates = {aggregates_json};
+
+        // QB + same-team WR/TE stacks from the per-game correlated simulation; null if not simulated
+        const slateStacks = {stacks_json};
+
+        // Changes since an earlier export (--compare), keyed by "name|team"; null otherwise
+        const slateDelta = {delta_json};
+        const playerDeltas = {{}};
+        if (slateDelta) {{
+            slateDelta.keys.forEach((key, i) => {{
+                const deltas = {{}};
+                for (const field in slateDelta.deltas) {{
+                    deltas[field] = slateDelta.deltas[field][i];
+                }}
+                playerDeltas[key] = deltas;
+            }});
+        }}
+
+        const DeltaArrow = ({{ player, field }}) => {{
+            const deltas = playerDeltas[`${{player.player_name}}|${{player.team_abbr}}`];
+            const value = deltas ? deltas[field] : null;
+            if (value === null || value === undefined || Math.abs(value) < 0.05) return null;
+            const up = value > 0;
+            return (
+                <span className={{`delta-arrow ${{up ? 'delta-up' : 'delta-down'}}`}}
+                      title={{`${{up ? '+' : ''}}${{value.toFixed(1)}} since previous export`}}>
+                    {{up ? '▲' : '▼'}}
+                </span>
+            );
+        }};
         const positions = {json.dumps(positions)};
         const defaultPosition = '{default_position}';
 
@@ -1630,7 +2193,12 @@ class NFLDFSVisualizer:
                                                     <span className={{`position-badge position-${{player.position}}`}}>
                                                         {{player.position}}
                                                     </span>
-                                                ) : col.format ? col.format(player[col.key]) : player[col.key]}}
+                                                ) : (
+                                                    <>
+                                                        {{col.format ? col.format(player[col.key]) : player[col.key]}}
+                                                        <DeltaArrow player={{player}} field={{col.key}} />
+                                                    </>
+                                                )}}
                                             </td>
                                         ))}}
                                     </tr>
@@ -1665,6 +2233,103 @@ class NFLDFSVisualizer:
             );
         }}
 
+        // Game Environments: team and game totals from the aggregation stage
+        function GameEnvironments() {{
+            const [level, setLevel] = useState('teams');
+            const [sortKey, setSortKey] = useState('Projection');
+
+            const columns = [
+                {{ key: 'Players', label: 'Players', format: (val) => val }},
+                {{ key: 'Projection', label: 'Proj', format: (val) => val.toFixed(1) }},
+                {{ key: 'Ceiling', label: 'Ceiling', format: (val) => val.toFixed(1) }},
+                {{ key: 'Salary', label: 'Salary', format: (val) => `$${{val.toLocaleString()}}` }},
+                {{ key: 'Own%', label: 'Own%', format: (val) => `${{val.toFixed(1)}}%` }},
+                {{ key: 'Top Own%', label: 'Top Own%', format: (val) => `${{val.toFixed(1)}}%` }},
+                {{ key: 'Own HHI', label: 'Own Conc.', format: (val) => val.toFixed(2) }},
+                {{ key: 'Leverage', label: 'Lev ($-wtd)', format: (val) => val.toFixed(2) }}
+            ];
+
+            // Stacks: how often QB and partner both boom, vs. what independent outcomes would give
+            const stackColumns = [
+                {{ key: 'QB Boom%', label: 'QB Boom%', format: (val) => `${{val.toFixed(1)}}%` }},
+                {{ key: 'Partner Boom%', label: 'Partner Boom%', format: (val) => `${{val.toFixed(1)}}%` }},
+                {{ key: 'Stack Boom%', label: 'Stack Boom%', format: (val) => `${{val.toFixed(1)}}%` }},
+                {{ key: 'Independent%', label: 'If Independent', format: (val) => `${{val.toFixed(1)}}%` }}
+            ];
+
+            const stacksShown = level === 'stacks';
+            const shownColumns = stacksShown ? stackColumns : columns;
+            const selectLevel = (next) => {{
+                setLevel(next);
+                setSortKey(next === 'stacks' ? 'Stack Boom%' : 'Projection');
+            }};
+
+            const source = stacksShown ? slateStacks : slateAggregates[level];
+            const rows = [...source].sort((a, b) => (b[sortKey] ?? -Infinity) - (a[sortKey] ?? -Infinity));
+
+            return (
+                <div className="data-table-container">
+                    <div className="aggregate-levels">
+                        <button className={{`tab-button ${{level === 'teams' ? 'active' : ''}}`}} onClick={{() => selectLevel('teams')}}>
+                            Teams
+                        </button>
+                        <button className={{`tab-button ${{level === 'games' ? 'active' : ''}}`}} onClick={{() => selectLevel('games')}}>
+                            Games
+                        </button>
+                        {{slateStacks && (
+                            <button className={{`tab-button ${{stacksShown ? 'active' : ''}}`}} onClick={{() => selectLevel('stacks')}}>
+                                Stacks
+                            </button>
+                        )}}
+                    </div>
+                    <div className="data-table-wrapper">
+                        <table className="data-table">
+                            <thead>
+                                <tr>
+                                    {{stacksShown ? (
+                                        <>
+                                            <th>Team</th>
+                                            <th>QB</th>
+                                            <th>Partner</th>
+                                        </>
+                                    ) : (
+                                        <th>{{level === 'teams' ? 'Team' : 'Game'}}</th>
+                                    )}}
+                                    {{level === 'teams' && <th>Game</th>}}
+                                    {{shownColumns.map(col => (
+                                        <th key={{col.key}}
+                                            className={{`sortable ${{sortKey === col.key ? 'sort-desc' : ''}}`}}
+                                            onClick={{() => setSortKey(col.key)}}>
+                                            {{col.label}}<span className="sort-indicator"></span>
+                                        </th>
+                                    ))}}
+                                </tr>
+                            </thead>
+                            <tbody>
+                                {{rows.map(row => (
+                                    <tr key={{stacksShown ? `${{row.QB}}|${{row.Partner}}` : row.group}}>
+                                        {{stacksShown ? (
+                                            <>
+                                                <td>{{row.Team}}</td>
+                                                <td>{{row.QB}}</td>
+                                                <td>{{row.Partner}} ({{row['Partner Pos']}})</td>
+                                            </>
+                                        ) : (
+                                            <td>{{row.group}}</td>
+                                        )}}
+                                        {{level === 'teams' && <td>{{row.Game}}</td>}}
+                                        {{shownColumns.map(col => (
+                                            <td key={{col.key}}>{{row[col.key] === null ? '-' : col.format(row[col.key])}}</td>
+                                        ))}}
+                                    </tr>
+                                ))}}
+                            </tbody>
+                        </table>
+                    </div>
+                </div>
+            );
+        }}
+
         function NFLDFSChart() {{
             // Tab state
             const [activeTab, setActiveTab] = useState('chart');
@@ -1871,6 +2536,20 @@ class NFLDFSVisualizer:
                 }};
             }});
 
+            // Tooltip: the two plotted values plus the player's outcome curve
+            const renderTooltip = ({{ active, payload }}) => {{
+                if (!active || !payload || !payload.length) return null;
+                const p = payload[0].payload;
+                return (
+                    <div className="player-tooltip">
+                        <div className="player-tooltip-name">{{p.player_name}} ({{p.team_abbr}} {{p.position}})</div>
+                        <div>{{xAxisLabel}}: {{p.x}}</div>
+                        <div>{{yAxisLabel}}: {{p.y}}</div>
+                        {{p.curve && curveInfo && <OutcomeSparkline curve={{p.curve}} />}}
+                    </div>
+                );
+            }};
+
             // Custom shape for player headshots
             const PlayerHeadshot = (props) => {{
                 const {{ cx, cy, payload, index }} = props;
@@ -2045,6 +2724,14 @@ class NFLDFSVisualizer:
                         >
                             Data Table
                         </button>
+                        {{slateAggregates && (
+                            <button
+                                className={{`tab-button ${{activeTab === 'games' ? 'active' : ''}}`}}
+                                onClick={{() => setActiveTab('games')}}
+                            >
+                                Game Environments
+                            </button>
+                        )}}
                     </div>
 
                     {{/* Chart Tab Content */}}
@@ -2280,7 +2967,7 @@ class NFLDFSVisualizer:
                                 allowDataOverflow={{true}}
                                 domain={{[bottom !== null ? bottom : defaultBottom, top !== null ? top : defaultTop]}}
                             />
-                            <Tooltip cursor={{{{ strokeDasharray: '3 3' }}}} />
+                            <Tooltip cursor={{{{ strokeDasharray: '3 3' }}}} content={{renderTooltip}} />
 
                             {{/* Quadrant backgrounds */}}
                             <ReferenceArea
@@ -2345,6 +3032,13 @@ class NFLDFSVisualizer:
                     <div className={{`tab-content ${{activeTab === 'table' ? 'active' : ''}}`}}>
                         <DataTable />
                     </div>
+
+                    {{/* Game Environments Tab Content */}}
+                    {{slateAggregates && (
+                        <div className={{`tab-content ${{activeTab === 'games' ? 'active' : ''}}`}}>
+                            <GameEnvironments />
+                        </div>
+                    )}}
                 </div>
             );
         }}
@@ -2362,11 +3056,78 @@ def main():
     parser.add_argument('--csv', required=True, help='Path to CSV file')
     parser.add_argument('--position', default='ALL', help='Position filter (QB, RB, WR, TE, DST, or ALL)')
     parser.add_argument('--output', default='boom_bust.html', help='Output filename')
+    parser.add_argument('--refresh-roster', action='store_true', help='Ignore the cached roster and download it again')
+    parser.add_argument('--verbose', action='store_true', help='Print every headshot match and miss')
+    parser.add_argument('--sims', type=int, default=100_000,
+                        help='Simulations used when the CSV lacks Boom%%/Bust%%/Ceiling (0 to skip)')
+    parser.add_argument('--optimal-sims', type=int, default=0,
+                        help='Lineups solved to fill Optimal%% when the CSV lacks it (e.g. 1000; default: leave it empty)')
+    parser.add_argument('--stack-sims', type=int, default=10_000,
+                        help='Correlated sims for the QB stack boom rates in Game Environments (0 to skip)')
+    parser.add_argument('--players-output',
+                        help='Also write the prepared player table to .parquet or .arrow (Arrow IPC, memory-mappable)')
+    parser.add_argument('--aggregates-output', help='Also write team/game aggregates to a .csv or .parquet file')
+    parser.add_argument('--compare', help='Earlier export of the same slate; marks stat changes with arrows')
+    parser.add_argument('--week', type=int, help='Week number; saves the slate to the local history when given')
+    parser.add_argument('--season', type=int, help='Season for --week (default: current season)')
+    parser.add_argument('--slate', default='main', help='Slate name for --week (main, showdown, ...)')
+    parser.add_argument('--history-db', default='slate_history/slates.db', help='Slate history database')
+    parser.add_argument('--headshot-manifest',
+                        help='headshots-manifest.json from compress_headshots; use those headshots where available')
+    parser.add_argument('--headshot-base-url', default='/nfl-dfs/headshots',
+                        help='URL the --headshot-manifest files are served from')
+    parser.add_argument('--profile', action='store_true', help='Print a per-stage timing table when done')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Also report peak traced memory (tracemalloc slows every stage down)')
+    parser.add_argument('--profile-output', help='Write profile data to a .json file, or a cProfile dump for any other extension')
 
     args = parser.parse_args()
 
-    visualizer = NFLDFSVisualizer(args.csv)
+    profiler = PipelineProfiler(trace_memory=args.profile_memory)
+    profiler.start()
+
+    cprofile = None
+    if args.profile_output and not args.profile_output.endswith('.json'):
+        import cProfile
+        cprofile = cProfile.Profile()
+        cprofile.enable()
+
+    headshots = None
+    if args.headshot_manifest:
+        from headshot_manifest import HeadshotManifest
+        headshots = HeadshotManifest.load(args.headshot_manifest, args.headshot_base_url)
+
+    visualizer = NFLDFSVisualizer(args.csv, profiler=profiler, on_event=ConsoleProgress(verbose=args.verbose),
+                                  refresh_roster=args.refresh_roster, sims=args.sims, stack_sims=args.stack_sims,
+                                  optimal_sims=args.optimal_sims, headshots=headshots)
+    if args.compare:
+        visualizer.compare_with(args.compare)
+    if args.week is not None:
+        from slate_store import SlateStore
+
+        with SlateStore(args.history_db) as store:
+            visualizer.save_to_history(store, args.week, args.season, args.slate)
     visualizer.create_visualization(args.position, args.output)
+    if args.players_output:
+        visualizer.export_players(args.players_output)
+    if args.aggregates_output:
+        visualizer.export_aggregates(args.aggregates_output)
+
+    if cprofile is not None:
+        cprofile.disable()
+        cprofile.dump_stats(args.profile_output)
+        print(f"cProfile stats written to: {args.profile_output}")
+
+    profiler.stop()
+
+    if args.profile or args.profile_memory:
+        print()
+        for line in profiler.report_lines():
+            print(line)
+
+    if args.profile_output and args.profile_output.endswith('.json'):
+        profiler.write_json(args.profile_output)
+        print(f"Profile written to: {args.profile_output}")
 
 
 if __name__ == '__main__':
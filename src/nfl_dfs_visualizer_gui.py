@@ -10,20 +10,23 @@ from tkinter import filedialog, messagebox, ttk
 import sys
 import os
 from pathlib import Path
-import threading
+import multiprocessing
+import queue
 import json
 
-# Import the visualizer
-from nfl_dfs_visualizer import NFLDFSVisualizer
+# Visualizer work runs in a separate worker process
+from job_runner import JobRunner
 
 
 class NameMatchingDialog:
     """Dialog for managing player name mappings"""
 
-    def __init__(self, parent, visualizer, unmatched_names, mappings_file):
-        self.visualizer = visualizer
+    def __init__(self, parent, unmatched_names, suggestions, mappings_file, on_change=None):
         self.unmatched_names = unmatched_names
+        # Roster suggestions per "Name|TEAM", computed by the worker
+        self.suggestions = suggestions
         self.mappings_file = mappings_file
+        self.on_change = on_change
         self.mappings = {}
 
         # Load existing mappings
@@ -203,7 +206,7 @@ class NameMatchingDialog:
         self.current_name = name
         self.current_team = team
 
-        potential_matches = self.visualizer.find_potential_matches(name, team, limit=20)
+        potential_matches = self.suggestions.get(f"{name}|{team}", [])
 
         # Populate suggestions
         suggestions = []
@@ -220,6 +223,11 @@ class NameMatchingDialog:
         self.manual_entry.delete(0, tk.END)
         self.manual_entry.insert(0, current_mapping)
 
+    def apply_mappings(self):
+        """Push edited mappings to the warm session so only those players re-resolve"""
+        if self.on_change is not None:
+            self.on_change(dict(self.mappings))
+
     def use_suggestion(self):
         """Use the selected suggestion"""
         selection = self.suggestions_combo.get()
@@ -233,6 +241,7 @@ class NameMatchingDialog:
         mapping_key = f"{self.current_name}|{self.current_team}"
         self.mappings[mapping_key] = nfl_name
 
+        self.apply_mappings()
         self.populate_tree()
         messagebox.showinfo("Success", f"Mapped '{self.current_name}' to '{nfl_name}'")
 
@@ -246,6 +255,7 @@ class NameMatchingDialog:
         mapping_key = f"{self.current_name}|{self.current_team}"
         self.mappings[mapping_key] = nfl_name
 
+        self.apply_mappings()
         self.populate_tree()
         messagebox.showinfo("Success", f"Mapped '{self.current_name}' to '{nfl_name}'")
 
@@ -258,6 +268,7 @@ class NameMatchingDialog:
         mapping_key = f"{self.current_name}|{self.current_team}"
         if mapping_key in self.mappings:
             del self.mappings[mapping_key]
+            self.apply_mappings()
             self.populate_tree()
             messagebox.showinfo("Cleared", f"Cleared mapping for '{self.current_name}'")
         else:
@@ -270,6 +281,14 @@ class NameMatchingDialog:
 
 
 class NFLDFSVisualizerGUI:
+    # How often queued log lines and worker events are applied to the widgets
+    LOG_DRAIN_MS = 100
+    JOB_POLL_MS = 50
+    # Delay before starting the worker process, so the window draws first
+    PREWARM_DELAY_MS = 200
+    # How long a cancelled job gets to stop before the worker is killed
+    CANCEL_GRACE_MS = 3000
+
     def __init__(self, root):
         self.root = root
         self.root.title("NFL DFS Boom/Bust Visualizer")
@@ -284,6 +303,13 @@ class NFLDFSVisualizerGUI:
         self.mappings_file = Path('name_mappings.json')
         self.name_mappings = {}
 
+        # Worker process holding a warm visualizer session across actions
+        self.jobs = JobRunner()
+        self.job_handlers = {}
+
+        # Log lines are queued and written to the Text widget in batches
+        self.ui_queue = queue.Queue()
+
         # Load existing mappings
         self.load_mappings()
 
@@ -292,6 +318,12 @@ class NFLDFSVisualizerGUI:
         style.theme_use('default')
 
         self.setup_ui()
+        self.root.after(self.LOG_DRAIN_MS, self._drain_ui_queue)
+        self.root.after(self.JOB_POLL_MS, self._poll_jobs)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Start the worker (which loads the data stack) once the window is up
+        self.root.after(self.PREWARM_DELAY_MS, self.jobs.start)
 
     def load_mappings(self):
         """Load name mappings from file"""
@@ -304,6 +336,11 @@ class NFLDFSVisualizerGUI:
                 print(f"Error loading mappings: {e}")
                 self.name_mappings = {}
 
+    def on_close(self):
+        """Stop the worker process and close the window"""
+        self.jobs.shutdown()
+        self.root.destroy()
+
     def setup_ui(self):
         """Create the GUI layout"""
         # Main container with padding
@@ -366,30 +403,41 @@ class NFLDFSVisualizerGUI:
         position_combo.grid(row=4, column=1, sticky=tk.W, pady=5, padx=5)
 
         # Name Matching Button
-        name_match_button = ttk.Button(
+        self.name_match_button = ttk.Button(
             main_frame,
             text="Check Name Matches",
             command=self.check_name_matches,
             style='Accent.TButton'
         )
-        name_match_button.grid(row=5, column=0, columnspan=3, pady=10)
+        self.name_match_button.grid(row=5, column=0, columnspan=3, pady=10)
 
         # Generate Button
-        generate_button = ttk.Button(
+        self.generate_button = ttk.Button(
             main_frame,
             text="Generate Visualization",
             command=self.generate_visualization,
             style='Accent.TButton'
         )
-        generate_button.grid(row=6, column=0, columnspan=3, pady=10)
+        self.generate_button.grid(row=6, column=0, columnspan=3, pady=10)
+
+        # Progress Bar (determinate, by player count) with Cancel
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=7, column=0, columnspan=3, pady=10)
 
-        # Progress Bar
         self.progress = ttk.Progressbar(
-            main_frame,
-            mode='indeterminate',
+            progress_frame,
+            mode='determinate',
             length=400
         )
-        self.progress.grid(row=7, column=0, columnspan=3, pady=10)
+        self.progress.pack(side=tk.LEFT)
+
+        self.cancel_button = ttk.Button(
+            progress_frame,
+            text="Cancel",
+            command=self.cancel_job,
+            state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.LEFT, padx=(10, 0))
 
         # Status Label
         status_label = ttk.Label(
@@ -446,10 +494,84 @@ class NFLDFSVisualizerGUI:
             self.log(f"Output will be saved to: {filename}")
 
     def log(self, message):
-        """Add message to log area"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        """Queue a message for the log area"""
+        self.ui_queue.put(message)
+
+    def _drain_ui_queue(self):
+        """Write all queued log lines to the Text widget in one batch"""
+        lines = []
+        try:
+            while True:
+                lines.append(self.ui_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if lines:
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            self.log_text.see(tk.END)
+
+        self.root.after(self.LOG_DRAIN_MS, self._drain_ui_queue)
+
+    def _set_job_running(self, running):
+        """Toggle buttons and reset the progress bar around a job"""
+        action_state = tk.DISABLED if running else tk.NORMAL
+        self.name_match_button.config(state=action_state)
+        self.generate_button.config(state=action_state)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        if running:
+            self.progress['value'] = 0
+
+    def _submit_job(self, action, on_result, on_error, **params):
+        """Send a job to the worker and remember how to handle its outcome"""
+        job_id = self.jobs.submit(action, **params)
+        self.job_handlers[job_id] = (on_result, on_error)
+        self._set_job_running(True)
+
+    def _poll_jobs(self):
+        """Apply progress, log lines and results streamed back from the worker"""
+        # Schedule first: result handlers may open modal dialogs
+        self.root.after(self.JOB_POLL_MS, self._poll_jobs)
+
+        for job_id, kind, payload in self.jobs.poll():
+            if kind == 'log':
+                self.log(payload)
+            elif kind == 'progress':
+                done, total = payload
+                self.progress['maximum'] = max(total, 1)
+                self.progress['value'] = done
+                if total:
+                    self.status_text.set(f"Processing players: {done}/{total}")
+            elif job_id in self.job_handlers:
+                on_result, on_error = self.job_handlers.pop(job_id)
+                self._set_job_running(False)
+                if kind == 'result':
+                    on_result(payload)
+                elif kind == 'error':
+                    on_error(payload)
+                elif kind == 'cancelled':
+                    self.status_text.set("Cancelled")
+                    self.log("Job cancelled.")
+
+    def cancel_job(self):
+        """Cancel the running job, killing the worker if it doesn't stop in time"""
+        job_id = self.jobs.current_job
+        if job_id is None:
+            return
+
+        self.status_text.set("Cancelling...")
+        self.jobs.cancel()
+        self.root.after(self.CANCEL_GRACE_MS, lambda: self._force_cancel(job_id))
+
+    def _force_cancel(self, job_id):
+        """Terminate the worker if the cancelled job is still running"""
+        if self.jobs.current_job != job_id:
+            return
+
+        self.jobs.terminate()
+        self.job_handlers.pop(job_id, None)
+        self._set_job_running(False)
+        self.status_text.set("Cancelled")
+        self.log("Job cancelled (worker restarted; the next run reloads the CSV).")
 
     def check_name_matches(self):
         """Check for unmatched player names"""
@@ -463,64 +585,54 @@ class NFLDFSVisualizerGUI:
             messagebox.showerror("Error", f"CSV file not found: {csv}")
             return
 
-        # Run in thread
-        thread = threading.Thread(target=self._check_name_matches_thread, args=(csv,))
-        thread.daemon = True
-        thread.start()
+        self.status_text.set("Analyzing player names...")
+        self.log("\n" + "="*50)
+        self.log("Checking player name matches...")
+        self.log("="*50 + "\n")
 
-    def _check_name_matches_thread(self, csv):
-        """Thread worker for checking name matches"""
-        try:
-            self.progress.start(10)
-            self.status_text.set("Analyzing player names...")
-            self.log("\n" + "="*50)
-            self.log("Checking player name matches...")
-            self.log("="*50 + "\n")
-
-            # Reload mappings
-            self.load_mappings()
-
-            # Create visualizer to check names
-            visualizer = NFLDFSVisualizer(csv, self.name_mappings)
-
-            # Process data to find unmatched names
-            positions = ['ALL'] + sorted(visualizer.df['Position'].unique().tolist())
-            for pos in positions:
-                visualizer.prepare_data_for_position(pos)
-
-            unmatched = visualizer.unmatched_names
-
-            self.log(f"Found {len(unmatched)} unmatched player names")
-
-            if unmatched:
-                # Open name matching dialog
-                self.root.after(0, lambda: self._open_name_matching_dialog(visualizer, unmatched))
-            else:
-                self.status_text.set("All player names matched successfully!")
-                self.log("✓ All player names matched successfully!")
-                self.root.after(0, lambda: messagebox.showinfo(
-                    "Success",
-                    "All player names from your CSV were successfully matched to NFL roster data!"
-                ))
+        # Reload mappings
+        self.load_mappings()
 
-        except Exception as e:
-            self.status_text.set("Error checking names")
-            self.log(f"\n❌ ERROR: {str(e)}")
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to check names:\n\n{str(e)}"))
-        finally:
-            self.progress.stop()
+        self._submit_job('check', self._on_check_result, self._on_check_error,
+                         csv_path=csv, name_mappings=self.name_mappings)
+
+    def _on_check_result(self, result):
+        """Report unmatched names and open the matching dialog if needed"""
+        unmatched = result['unmatched']
+        self.log(f"Found {len(unmatched)} unmatched player names")
 
-    def _open_name_matching_dialog(self, visualizer, unmatched_names):
+        if unmatched:
+            self.status_text.set(f"{len(unmatched)} unmatched player names")
+            self._open_name_matching_dialog(unmatched, result['suggestions'])
+        else:
+            self.status_text.set("All player names matched successfully!")
+            self.log("✓ All player names matched successfully!")
+            messagebox.showinfo(
+                "Success",
+                "All player names from your CSV were successfully matched to NFL roster data!"
+            )
+
+    def _on_check_error(self, error):
+        self.status_text.set("Error checking names")
+        self.log(f"\n❌ ERROR: {error}")
+        messagebox.showerror("Error", f"Failed to check names:\n\n{error}")
+
+    def _open_name_matching_dialog(self, unmatched_names, suggestions):
         """Open the name matching dialog"""
-        dialog = NameMatchingDialog(self.root, visualizer, unmatched_names, self.mappings_file)
+        dialog = NameMatchingDialog(self.root, unmatched_names, suggestions, self.mappings_file,
+                                    on_change=self._apply_mappings)
         self.root.wait_window(dialog.dialog)
 
         # Reload mappings after dialog closes
         self.load_mappings()
         self.log(f"Name mappings updated. Total mappings: {len(self.name_mappings)}")
 
+    def _apply_mappings(self, mappings):
+        """Let the worker re-resolve just the players whose mapping changed"""
+        self.jobs.submit('mappings', name_mappings=mappings)
+
     def generate_visualization(self):
-        """Generate the visualization (run in thread to prevent UI freezing)"""
+        """Generate the visualization in the worker process"""
         csv = self.csv_path.get()
         output = self.output_path.get()
         pos = self.position.get()
@@ -538,71 +650,49 @@ class NFLDFSVisualizerGUI:
             messagebox.showerror("Error", "Please specify an output file")
             return
 
-        # Run in thread to prevent UI freezing
-        thread = threading.Thread(target=self._generate_visualization_thread, args=(csv, output, pos))
-        thread.daemon = True
-        thread.start()
+        # Reload mappings before generating
+        self.load_mappings()
 
-    def _generate_visualization_thread(self, csv, output, pos):
-        """Thread worker for generating visualization"""
-        try:
-            # Update UI
-            self.progress.start(10)
-            self.status_text.set("Generating visualization...")
-            self.log("\n" + "="*50)
-            self.log("Starting visualization generation...")
-            self.log(f"CSV: {csv}")
-            self.log(f"Output: {output}")
-            self.log(f"Position: {pos}")
-            self.log(f"Using {len(self.name_mappings)} custom name mappings")
-            self.log("="*50 + "\n")
-
-            # Redirect print statements to log
-            original_print = print
-
-            def gui_print(*args, **kwargs):
-                message = ' '.join(str(arg) for arg in args)
-                self.log(message)
-
-            # Temporarily replace print
-            import builtins
-            builtins.print = gui_print
+        self.status_text.set("Generating visualization...")
+        self.log("\n" + "="*50)
+        self.log("Starting visualization generation...")
+        self.log(f"CSV: {csv}")
+        self.log(f"Output: {output}")
+        self.log(f"Position: {pos}")
+        self.log(f"Using {len(self.name_mappings)} custom name mappings")
+        self.log("="*50 + "\n")
 
-            try:
-                # Reload mappings before generating
-                self.load_mappings()
+        self._submit_job('generate', self._on_generate_result, self._on_generate_error,
+                         csv_path=csv, name_mappings=self.name_mappings,
+                         position=pos, output_path=output)
 
-                # Generate visualization with mappings
-                visualizer = NFLDFSVisualizer(csv, self.name_mappings)
-                visualizer.create_visualization(pos, output)
+    def _on_generate_result(self, result):
+        """Report a finished generation job"""
+        output = result['output']
 
-                # Success
-                self.status_text.set("✓ Visualization generated successfully!")
-                self.log("\n" + "="*50)
-                self.log("SUCCESS! Visualization generated.")
-                self.log(f"File saved to: {output}")
+        self.status_text.set("✓ Visualization generated successfully!")
+        self.log("\n" + "="*50)
+        self.log("SUCCESS! Visualization generated.")
+        self.log(f"File saved to: {output}")
 
-                # Report any unmatched names
-                if visualizer.unmatched_names:
-                    self.log(f"\nNote: {len(visualizer.unmatched_names)} players still unmatched (using team logos)")
-                    self.log("Use 'Check Name Matches' to map these players")
+        # Report any unmatched names
+        if result['unmatched']:
+            self.log(f"\nNote: {result['unmatched']} players still unmatched (using team logos)")
+            self.log("Use 'Check Name Matches' to map these players")
 
-                self.log("="*50)
+        self.log("\nTiming breakdown:")
+        for line in result['profile']:
+            self.log(line)
 
-                # Ask if user wants to open the file
-                self.root.after(0, lambda: self._ask_open_file(output))
+        self.log("="*50)
 
-            finally:
-                # Restore original print
-                builtins.print = original_print
+        # Ask if user wants to open the file
+        self._ask_open_file(output)
 
-        except Exception as e:
-            self.status_text.set("Error generating visualization")
-            self.log(f"\n❌ ERROR: {str(e)}")
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to generate visualization:\n\n{str(e)}"))
-
-        finally:
-            self.progress.stop()
+    def _on_generate_error(self, error):
+        self.status_text.set("Error generating visualization")
+        self.log(f"\n❌ ERROR: {error}")
+        messagebox.showerror("Error", f"Failed to generate visualization:\n\n{error}")
 
     def _ask_open_file(self, output):
         """Ask user if they want to open the generated file"""
@@ -630,6 +720,9 @@ class NFLDFSVisualizerGUI:
 
 def main():
     """Main entry point"""
+    # Needed for the worker process in PyInstaller builds
+    multiprocessing.freeze_support()
+
     root = tk.Tk()
     app = NFLDFSVisualizerGUI(root)
     root.mainloop()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+DraftKings classic lineup optimizer.
+Solves the salary-capped roster as a mixed-integer program with
+scipy.optimize.milp, and estimates Optimal% by re-solving over simulated
+outcomes and counting how often each player makes the optimal lineup.
+
+Usage:
+  python3 src/optimizer.py --csv slate.csv
+  python3 src/optimizer.py --csv slate.csv --sims 1000 --workers 8
+"""
+
+import argparse
+import multiprocessing
+import os
+
+from simulation import DEFAULT_SEED
+
+SALARY_CAP = 50_000
+
+# DraftKings classic: QB, 2 RB, 3 WR, TE, FLEX (RB/WR/TE), DST -> (min, max) per position
+ROSTER_LIMITS = {
+    'QB': (1, 1),
+    'RB': (2, 3),
+    'WR': (3, 4),
+    'TE': (1, 2),
+    'DST': (1, 1),
+}
+ROSTER_SIZE = 9
+
+DEFAULT_OPTIMAL_SIMS = 1000
+
+
+class LineupModel:
+    """Constraint matrix for one slate, built once and reused for every solve"""
+
+    def __init__(self, positions, salaries, salary_cap: int = SALARY_CAP):
+        import numpy as np
+
+        positions = np.asarray(positions).astype(str)
+        salaries = np.asarray(salaries, dtype=np.float64)
+        # Players without a salary can't be rostered
+        self.eligible = ~np.isnan(salaries) & np.isin(positions, list(ROSTER_LIMITS))
+        n = len(positions)
+
+        rows = [np.nan_to_num(salaries), np.ones(n)]
+        lower, upper = [0, ROSTER_SIZE], [salary_cap, ROSTER_SIZE]
+        for position, (low, high) in ROSTER_LIMITS.items():
+            rows.append((positions == position).astype(np.float64))
+            lower.append(low)
+            upper.append(high)
+
+        self.n = n
+        self.matrix = np.vstack(rows)
+        self.lower, self.upper = np.array(lower), np.array(upper)
+        self.salaries = np.nan_to_num(salaries, nan=np.inf)
+        # Eligible rows per position, with the most that position can fill
+        self.groups = [
+            (np.flatnonzero(self.eligible & (positions == position)), high)
+            for position, (_, high) in ROSTER_LIMITS.items()
+        ]
+
+    def candidates(self, points):
+        """
+        Rows that can appear in an optimal lineup. A player beaten on points by at
+        least as many same-position players (none pricier) as the position has
+        roster spots can always be swapped for one of them, so they're dropped.
+        """
+        import numpy as np
+
+        keep = []
+        for rows, spots in self.groups:
+            p, s = points[rows], self.salaries[rows]
+            dominated = ((p[None, :] > p[:, None]) & (s[None, :] <= s[:, None])).sum(axis=1)
+            keep.append(rows[dominated < spots])
+        return np.concatenate(keep)
+
+    def solve(self, points):
+        """Row indices of the highest-scoring valid lineup for these points (None if infeasible)"""
+        import numpy as np
+        from scipy.optimize import LinearConstraint, milp
+
+        points = np.nan_to_num(np.asarray(points, dtype=np.float64))
+        rows = self.candidates(points)
+        result = milp(-points[rows], integrality=np.ones(len(rows)), bounds=(0, 1),
+                      constraints=LinearConstraint(self.matrix[:, rows], self.lower, self.upper))
+        if result.x is None:
+            return None
+        return rows[result.x > 0.5]
+
+
+# Per-process model so pool workers build the constraint matrix once
+_worker_model = None
+
+
+def _init_worker(positions, salaries, salary_cap):
+    global _worker_model
+    _worker_model = LineupModel(positions, salaries, salary_cap)
+
+
+def _solve_batch(outcomes):
+    """Optimal-lineup counts per player over a (players x sims) batch"""
+    import numpy as np
+
+    counts = np.zeros(_worker_model.n, dtype=np.int64)
+    solved = 0
+    for sim in range(outcomes.shape[1]):
+        lineup = _worker_model.solve(outcomes[:, sim])
+        if lineup is not None:
+            counts[lineup] += 1
+            solved += 1
+    return counts, solved
+
+
+def optimal_rates(positions, salaries, outcomes, workers: int = 1, salary_cap: int = SALARY_CAP,
+                  batch_size: int = 50):
+    """
+    Percent of simulated outcomes (players x sims matrix) in which each player
+    is in the optimal lineup. Batches of sims are spread over a process pool.
+    """
+    import numpy as np
+
+    batches = [outcomes[:, start:start + batch_size] for start in range(0, outcomes.shape[1], batch_size)]
+
+    # Daemonic processes (the GUI's job worker) can't start a pool of their own
+    if workers > 1 and not multiprocessing.current_process().daemon and len(batches) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(positions, salaries, salary_cap)) as pool:
+            results = list(pool.map(_solve_batch, batches))
+    else:
+        _init_worker(positions, salaries, salary_cap)
+        results = [_solve_batch(batch) for batch in batches]
+
+    counts = sum(r[0] for r in results)
+    solved = sum(r[1] for r in results)
+    if not solved:
+        return np.full(len(counts), np.nan, dtype=np.float32)
+    return (counts / solved * 100).astype(np.float32)
+
+
+def simulate_optimal(df, sims: int = DEFAULT_OPTIMAL_SIMS, workers: int = 1, seed=None, correlated: bool = True):
+    """Optimal% for a loaded slate from simulated outcomes (per-game correlated by default)"""
+    import numpy as np
+
+    from simulation import GameModel, draw_outcomes, game_keys
+
+    mean = np.nan_to_num(df['Projection'].to_numpy(dtype=np.float32))
+    spread = np.nan_to_num(df['Std Dev'].to_numpy(dtype=np.float32))
+    rng = np.random.default_rng(seed)
+    positions = df['Position'].astype(str).to_numpy()
+
+    if correlated:
+        model = GameModel(positions, df['Team'].astype(str).to_numpy(), game_keys(df).to_numpy())
+        outcomes = model.draw(mean, spread, sims, rng)
+    else:
+        outcomes = draw_outcomes(mean, spread, sims, rng)
+
+    return optimal_rates(positions, df['Salary'].to_numpy(), outcomes, workers=workers)
+
+
+def fill_optimal_pct(df, sims: int = DEFAULT_OPTIMAL_SIMS, workers: int = 1, seed=DEFAULT_SEED) -> bool:
+    """
+    Fill an entirely missing Optimal% column of a loaded slate; True if filled.
+    The fixed default seed makes the same slate give the same values; the column
+    is recorded as simulated in df.attrs.
+    """
+    from simulation import mark_simulated
+
+    if not df['Optimal%'].isna().all() or df['Projection'].isna().all() or df['Std Dev'].isna().all():
+        return False
+    df['Optimal%'] = simulate_optimal(df, sims=sims, workers=workers, seed=seed)
+    mark_simulated(df, ['Optimal%'])
+    return True
+
+
+def main():
+    import time
+
+    from slate_loader import load_slate
+
+    parser = argparse.ArgumentParser(description='DraftKings classic lineup optimizer')
+    parser.add_argument('--csv', required=True, help='Slate CSV with Position, Salary and Projection')
+    parser.add_argument('--sims', type=int, default=0,
+                        help='Simulated outcomes to solve for Optimal%% (0: one lineup from projections)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Solver processes')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible results')
+    parser.add_argument('--salary-cap', type=int, default=SALARY_CAP, help='Salary cap')
+    args = parser.parse_args()
+
+    df = load_slate(args.csv)
+
+    if not args.sims:
+        lineup = LineupModel(df['Position'], df['Salary'], args.salary_cap).solve(df['Projection'])
+        if lineup is None:
+            print("No valid lineup for this slate")
+            return
+        players = df.iloc[lineup]
+        for _, row in players.iterrows():
+            print(f"{row['Position']:<4} {row['Name']:<28} {row['Team']:<4} ${row['Salary']:>6,.0f} {row['Projection']:>6.1f}")
+        print(f"Total: ${players['Salary'].sum():,.0f}, {players['Projection'].sum():.1f} points")
+        return
+
+    start = time.perf_counter()
+    rates = simulate_optimal(df, sims=args.sims, workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.sims:,} lineups solved in {elapsed:.1f}s ({args.sims / elapsed:.0f}/s, {args.workers} workers)\n")
+
+    print(f"{'Player':<28} {'Pos':<4} {'Optimal%':>9} {'CSV':>7}")
+    for i in rates.argsort()[::-1][:20]:
+        row = df.iloc[i]
+        print(f"{row['Name']:<28} {row['Position']:<4} {rates[i]:>9.1f} {row['Optimal%']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
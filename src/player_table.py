@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Array-backed player table.
+Holds prepared players as column arrays (float32 stats, integer codes into
+interned string pools) instead of one dict per player, so a whole season of
+slates fits comfortably in memory. PlayerRow views stand in for the old dicts.
+"""
+
+import base64
+
+import numpy as np
+
+
+class StringPool:
+    """Interns strings to integer codes (first seen gets the lowest code)"""
+
+    def __init__(self, values=()):
+        self.values = []
+        self._codes = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value) -> int:
+        """Code for value, adding it to the pool if new"""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def find(self, value, default: int = -1) -> int:
+        """Code for value without adding it"""
+        return self._codes.get(value, default)
+
+    def lookup(self, code):
+        return None if code < 0 else self.values[code]
+
+    def encode(self, values) -> np.ndarray:
+        return np.fromiter((self.code(v) for v in values), dtype=np.int32, count=len(values))
+
+
+class PlayerRow:
+    """Read-only view of one table row that behaves like the old player dict"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._table.value(key, self._index)
+
+    def __getattr__(self, key):
+        try:
+            return self._table.value(key, self._index)
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return PlayerTable.FIELDS
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in PlayerTable.FIELDS}
+
+    def __repr__(self):
+        return f"PlayerRow({self['player_name']!r}, {self['team_abbr']!r}, {self['position']!r})"
+
+
+def quantize_curves(curves: np.ndarray, dtype=np.uint8) -> tuple:
+    """
+    (codes, scale) for float outcome curves: one scale for the whole table so
+    the client can plot codes directly; value = code * scale.
+    """
+    top = float(np.nanmax(curves)) if curves.size else 0.0
+    scale = top / np.iinfo(dtype).max if top > 0 else 1.0
+    codes = np.rint(np.nan_to_num(curves) / scale).astype(dtype)
+    return codes, scale
+
+
+def _clean_stats(values: np.ndarray, missing) -> np.ndarray:
+    """float32 stats as float64 with float32 noise trimmed (18.299999 -> 18.3)"""
+    cleaned = values.astype(np.float64).round(4)
+    if missing is not None:
+        cleaned[np.isnan(cleaned)] = missing
+    return cleaned
+
+
+class PlayerTable:
+    """Column store for prepared players; views share the underlying arrays"""
+
+    STAT_FIELDS = ('salary', 'dk_projection', 'std_dev', 'ceiling', 'bust_pct', 'boom_pct',
+                   'ownership_pct', 'optimal_pct', 'leverage')
+    CODED_FIELDS = ('player_name', 'position', 'team_abbr', 'headshot_url')
+    # Same key order as the dicts prepare_data_for_position used to build
+    FIELDS = ('player_name', 'player_id', 'position', 'team_abbr') + STAT_FIELDS + ('headshot_url',)
+
+    # CSV column for each stat field
+    SOURCE_COLUMNS = {
+        'salary': 'Salary', 'dk_projection': 'Projection', 'std_dev': 'Std Dev',
+        'ceiling': 'Ceiling', 'bust_pct': 'Bust%', 'boom_pct': 'Boom%',
+        'ownership_pct': 'Own%', 'optimal_pct': 'Optimal%', 'leverage': 'Leverage',
+    }
+
+    # Value used for a missing stat (salary stays NaN, as before)
+    MISSING = {field: 0 for field in STAT_FIELDS}
+    MISSING['salary'] = None
+
+    def __init__(self, stats: dict, codes: dict, pools: dict, source_index: np.ndarray, rows=None,
+                 curves=None):
+        self.stats = stats
+        self.codes = codes
+        self.pools = pools
+        self.source_index = source_index
+        # Positions in the base arrays that this table (or view) covers
+        self.is_view = rows is not None
+        self.rows = np.arange(len(source_index)) if rows is None else rows
+        # Optional outcome curves: (percentiles, quantized players x percentiles codes, scale)
+        self.curves = curves
+
+    @classmethod
+    def from_frame(cls, df, headshot_urls, curves=None, curve_percentiles=None):
+        """
+        Build a table from a loaded slate frame plus one headshot URL per row,
+        and optionally a players x percentiles array of outcome curves.
+        float32 stat columns and categorical codes are used without copying.
+        """
+        import pandas as pd
+
+        stats = {}
+        for field, column in cls.SOURCE_COLUMNS.items():
+            stats[field] = df[column].to_numpy(dtype=np.float32, copy=False)
+
+        codes, pools = {}, {}
+        for field, column in (('player_name', 'Name'), ('position', 'Position'), ('team_abbr', 'Team')):
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes[field] = series.cat.codes.to_numpy()
+                pools[field] = StringPool(series.cat.categories.tolist())
+            else:
+                field_codes, uniques = pd.factorize(series)
+                codes[field] = field_codes.astype(np.int32, copy=False)
+                pools[field] = StringPool(uniques.tolist())
+
+        pools['headshot_url'] = StringPool()
+        codes['headshot_url'] = pools['headshot_url'].encode(list(headshot_urls))
+
+        if curves is not None:
+            curves = (tuple(curve_percentiles), *quantize_curves(curves))
+
+        return cls(stats, codes, pools, df.index.to_numpy(), curves=curves)
+
+    @classmethod
+    def concat(cls, tables):
+        """Stack tables (e.g. a season of slates) into one, re-interning string codes"""
+        pools = {field: StringPool() for field in cls.CODED_FIELDS}
+        codes = {field: [] for field in cls.CODED_FIELDS}
+        stats = {field: [] for field in cls.STAT_FIELDS}
+        source_index = []
+        curve_parts = []
+
+        tables = list(tables)
+        for table in tables:
+            for field in cls.CODED_FIELDS:
+                # Map the table's pool onto the merged pool; the extra slot keeps -1 as -1
+                remap = np.array([pools[field].code(v) for v in table.pools[field].values] + [-1],
+                                 dtype=np.int32)
+                codes[field].append(remap[table.codes[field][table.rows]])
+            for field in cls.STAT_FIELDS:
+                stats[field].append(table.stats[field][table.rows])
+            source_index.append(table.source_index[table.rows])
+            if table.curves is not None:
+                _, curve_codes, scale = table.curves
+                curve_parts.append(curve_codes[table.rows] * np.float32(scale))
+
+        # Curves survive only if every table has them at the same percentiles;
+        # they are re-quantized against the combined range
+        curves = None
+        if tables and len(curve_parts) == len(tables) and len({t.curves[0] for t in tables}) == 1:
+            curves = (tables[0].curves[0], *quantize_curves(np.concatenate(curve_parts)))
+
+        return cls(
+            {field: np.concatenate(parts) for field, parts in stats.items()},
+            {field: np.concatenate(parts) for field, parts in codes.items()},
+            pools,
+            np.concatenate(source_index),
+            curves=curves,
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        for i in range(len(self.rows)):
+            yield PlayerRow(self, i)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.rows)
+        if not 0 <= i < len(self.rows):
+            raise IndexError(i)
+        return PlayerRow(self, i)
+
+    def value(self, field, i):
+        """Value of field for the i-th row of this table"""
+        row = self.rows[i]
+        if field in self.stats:
+            return _clean_stats(self.stats[field][row:row + 1], self.MISSING[field])[0].item()
+        if field in self.codes:
+            return self.pools[field].lookup(self.codes[field][row])
+        if field == 'player_id':
+            return f"{self.value('player_name', i).replace(' ', '_')}_{self.source_index[row]}"
+        if field == 'curve' and self.curves is not None:
+            _, curve_codes, scale = self.curves
+            return (curve_codes[row] * scale).round(2).tolist()
+        raise KeyError(field)
+
+    def select(self, positions) -> 'PlayerTable':
+        """View of the given row positions (within this table), sharing storage"""
+        return PlayerTable(self.stats, self.codes, self.pools, self.source_index, self.rows[positions],
+                           curves=self.curves)
+
+    def where(self, field, value) -> 'PlayerTable':
+        """View of the rows whose coded field equals value"""
+        # -2 never matches, not even the -1 used for missing values
+        code = self.pools[field].find(value, -2)
+        return self.select(np.flatnonzero(self.codes[field][self.rows] == code))
+
+    def set_value(self, field, i, value):
+        """Update a coded field in place; visible through every view"""
+        self.codes[field][self.rows[i]] = self.pools[field].code(value)
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint: arrays plus the interned strings"""
+        import sys
+
+        total = sum(a.nbytes for a in self.stats.values())
+        total += sum(a.nbytes for a in self.codes.values())
+        total += self.source_index.nbytes + self.rows.nbytes
+        if self.curves is not None:
+            total += self.curves[1].nbytes
+        for pool in self.pools.values():
+            total += sum(sys.getsizeof(v) for v in pool.values)
+        return total
+
+    # Coded fields written as Arrow dictionary columns (few distinct values)
+    DICTIONARY_FIELDS = ('position', 'team_abbr', 'headshot_url')
+
+    def to_arrow(self, metadata: dict = None):
+        """
+        pyarrow Table with a fixed schema: string names/ids, dictionary-encoded
+        position/team/headshot, float32 stats (missing as null) and, when present,
+        the outcome curve as a fixed-size float32 list. A full (non-view) table
+        hands its column arrays to Arrow as they are, without a gather.
+        """
+        import pyarrow as pa
+
+        def take(values):
+            return values[self.rows] if self.is_view else values
+
+        columns = {}
+        for field in self.FIELDS:
+            if field == 'player_id':
+                names = self.pools['player_name'].values
+                columns[field] = pa.array([
+                    f"{names[code].replace(' ', '_')}_{index}"
+                    for code, index in zip(take(self.codes['player_name']), take(self.source_index))
+                ], type=pa.string())
+            elif field in self.stats:
+                columns[field] = pa.array(take(self.stats[field]), type=pa.float32(), from_pandas=True)
+            elif field in self.DICTIONARY_FIELDS:
+                codes = take(self.codes[field])
+                columns[field] = pa.DictionaryArray.from_arrays(
+                    pa.array(codes, type=pa.int32(), mask=codes < 0),
+                    pa.array(self.pools[field].values, type=pa.string())
+                )
+            else:
+                columns[field] = pa.array([self.pools[field].lookup(c) for c in take(self.codes[field])],
+                                          type=pa.string())
+
+        columns['source_row'] = pa.array(take(self.source_index), type=pa.int64())
+
+        metadata = dict(metadata or {})
+        if self.curves is not None:
+            percentiles, curve_codes, scale = self.curves
+            width = len(percentiles)
+            flat = (take(curve_codes) * np.float32(scale)).astype(np.float32).ravel()
+            columns['curve'] = pa.FixedSizeListArray.from_arrays(pa.array(flat, type=pa.float32()), width)
+            metadata['curve_percentiles'] = ','.join(str(p) for p in percentiles)
+
+        table = pa.table(columns)
+        return table.replace_schema_metadata({k: str(v) for k, v in metadata.items()})
+
+    def write(self, path, metadata: dict = None):
+        """
+        Write the table as Parquet (.parquet) or as an uncompressed Arrow IPC file
+        (.arrow/.feather/anything else), which readers can memory-map without copies.
+        """
+        table = self.to_arrow(metadata)
+        if str(path).endswith('.parquet'):
+            import pyarrow.parquet as pq
+            pq.write_table(table, path, use_dictionary=list(self.DICTIONARY_FIELDS))
+        else:
+            import pyarrow as pa
+            with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def to_payload(self, group_by: str = None) -> dict:
+        """
+        Compact columnar payload for the HTML: string columns as codes into
+        pools, stats as arrays, optional row-index lists per group value.
+        Outcome curves go in as base64 of the quantized row-major bytes.
+        """
+        payload = {
+            'count': len(self.rows),
+            'strings': {field: self.pools[field].values for field in self.CODED_FIELDS},
+            'codes': {field: self.codes[field][self.rows].tolist() for field in self.CODED_FIELDS},
+            'stats': {
+                field: _clean_stats(self.stats[field][self.rows], self.MISSING[field]).tolist()
+                for field in self.STAT_FIELDS
+            },
+            'ids': self.source_index[self.rows].tolist(),
+        }
+
+        if self.curves is not None:
+            percentiles, curve_codes, scale = self.curves
+            payload['curves'] = {
+                'percentiles': list(percentiles),
+                'scale': round(scale, 6),
+                'bits': curve_codes.dtype.itemsize * 8,
+                'data': base64.b64encode(np.ascontiguousarray(curve_codes[self.rows]).tobytes()).decode('ascii'),
+            }
+
+        if group_by is not None:
+            group_codes = self.codes[group_by][self.rows]
+            payload['groups'] = {
+                value: np.flatnonzero(group_codes == code).tolist()
+                for code, value in enumerate(self.pools[group_by].values)
+                if (group_codes == code).any()
+            }
+
+        return payload
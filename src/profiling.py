@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Stage-level timing and counters for the visualizer pipeline.
+Used by the CLI (--profile) and the GUI log to show where a run spends its time.
+"""
+
+import json
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+class PipelineProfiler:
+    """Collects wall-clock time per named stage plus simple event counters"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.timings = defaultdict(float)
+        self.calls = Counter()
+        self.counters = Counter()
+        self.peak_memory = None
+        self._order = []
+        self._started_tracing = False
+
+    def start(self):
+        """Begin memory tracing (no-op unless trace_memory is set)"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Record peak traced memory and stop tracing if we started it"""
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak_memory = max(self.peak_memory or 0, peak)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block and add it to the named stage"""
+        if name not in self.timings:
+            self._order.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def count(self, name: str, n: int = 1):
+        """Increment a named counter (cache hits, match methods, ...)"""
+        self.counters[name] += n
+
+    def to_dict(self) -> dict:
+        """Plain-dict snapshot suitable for JSON output"""
+        return {
+            'stages': [
+                {'stage': name, 'seconds': round(self.timings[name], 6), 'calls': self.calls[name]}
+                for name in self._order
+            ],
+            'counters': dict(sorted(self.counters.items())),
+            'peak_memory_bytes': self.peak_memory,
+        }
+
+    def report_lines(self) -> list:
+        """Render the collected data as a fixed-width table"""
+        lines = [f"{'Stage':<32} {'Seconds':>10} {'Calls':>8}", '-' * 52]
+        for name in self._order:
+            lines.append(f"{name:<32} {self.timings[name]:>10.4f} {self.calls[name]:>8}")
+
+        if self.counters:
+            lines.append('')
+            lines.append(f"{'Counter':<32} {'Count':>10}")
+            lines.append('-' * 43)
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<32} {value:>10}")
+
+        if self.peak_memory is not None:
+            lines.append('')
+            lines.append(f"Peak traced memory: {self.peak_memory / (1024 * 1024):.1f} MB")
+
+        return lines
+
+    def write_json(self, path: str):
+        """Write the profile snapshot to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Remove busy backgrounds from headshots before they're compressed, so players
+sit cleanly inside the chart's circular clips.
+Runs rembg over batches of images on a process pool; each worker creates the
+ONNX session once (seconds) and reuses it for every image it's given. Results
+are cached by source hash in a manifest, so re-runs only process new or
+changed headshots. Output PNGs keep the source names with a transparent
+background; compress_headshots.py reads them with --input.
+
+Usage:
+  python3 src/remove_backgrounds.py
+  python3 src/remove_backgrounds.py --workers 4 --batch-size 8
+  python3 src/remove_backgrounds.py --input headshot_cache --output headshot_cache_nobg --model u2net
+  python3 src/compress_headshots.py --input headshot_cache_nobg
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+
+MANIFEST_NAME = 'background-manifest.json'
+MANIFEST_VERSION = 1
+
+# rembg's human segmentation model; players are all that should be kept
+DEFAULT_MODEL = 'u2net_human_seg'
+DEFAULT_BATCH_SIZE = 8
+
+
+# Per-process session so pool workers load the model once
+_worker_session = None
+
+
+def _init_worker(model, threads=None):
+    global _worker_session
+    # rembg sizes onnxruntime's thread pools from OMP_NUM_THREADS; split the
+    # cores between the workers instead of every session claiming all of them
+    if threads:
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+    from rembg import new_session
+
+    _worker_session = new_session(model)
+
+
+def _remove_batch(batch):
+    """
+    Remove the background of each (source, destination) in batch with this
+    process's session. Returns (source hash, error) per image; runs in pool
+    workers, so failures come back as (None, error message) instead of raising.
+    """
+    from PIL import Image
+    from rembg import remove
+
+    results = []
+    for source, destination in batch:
+        try:
+            raw = source.read_bytes()
+            with Image.open(BytesIO(raw)) as img:
+                cutout = remove(img.convert('RGB'), session=_worker_session)
+            cutout.save(destination, 'PNG')
+            results.append((hashlib.sha256(raw).hexdigest(), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def load_manifest(output_path, model) -> dict:
+    """Source filename -> {hash, output} ({} when missing, unreadable, or from another version or model)"""
+    try:
+        with open(Path(output_path) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != MANIFEST_VERSION or data.get('model') != model:
+        return {}
+    return data.get('images', {})
+
+
+def save_manifest(output_path, model, images: dict):
+    """Write the manifest atomically, so an interrupted run leaves the previous one intact"""
+    path = Path(output_path) / MANIFEST_NAME
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'model': model, 'images': dict(sorted(images.items()))}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def remove_backgrounds(input_dir, output_dir, model=DEFAULT_MODEL, workers=1,
+                       batch_size=DEFAULT_BATCH_SIZE, force=False):
+    """
+    Remove the background of every PNG headshot in input_dir into output_dir.
+    Images whose source hash matches the manifest are skipped, and outputs of
+    sources that no longer exist are removed.
+
+    Args:
+        input_dir: Directory containing original headshots
+        output_dir: Directory to save transparent-background PNGs
+        model: rembg model name (default u2net_human_seg)
+        workers: Processes to run the model in (default 1: in this process)
+        batch_size: Images handed to a worker at a time
+        force: Reprocess every image, ignoring the manifest
+
+    Returns:
+        Counts of processed, skipped, removed and failed images and images/s
+        (None if no PNGs were found)
+    """
+    input_path = Path(input_dir)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    png_files = sorted(input_path.glob('*.png'))
+    if not png_files:
+        print(f"ERROR: No PNG files found in {input_dir}")
+        return
+
+    manifest = load_manifest(output_path, model)
+
+    # Outputs whose source was deleted
+    sources = {img_file.name for img_file in png_files}
+    removed = 0
+    for name in [name for name in manifest if name not in sources]:
+        (output_path / manifest.pop(name)['output']).unlink(missing_ok=True)
+        removed += 1
+
+    pending = []
+    for img_file in png_files:
+        entry = manifest.get(img_file.name)
+        if (force or not entry or not (output_path / entry['output']).exists()
+                or entry['hash'] != hashlib.sha256(img_file.read_bytes()).hexdigest()):
+            pending.append((img_file, output_path / img_file.name))
+    skipped = len(png_files) - len(pending)
+
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+    workers = max(1, min(workers, len(batches)))
+
+    print(f"Found {len(png_files)} images, {len(pending)} to process ({skipped} cached, {removed} removed)")
+    print(f"Settings: model={model}, workers={workers}, batch size={batch_size}")
+    print(f"Output: {output_path.absolute()}\n")
+
+    processed = 0
+    failed = 0
+    start = time.perf_counter()
+
+    # Daemonic processes (the GUI's job worker) can't start a pool of their own
+    if workers > 1 and not multiprocessing.current_process().daemon:
+        from concurrent.futures import ProcessPoolExecutor
+
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model, threads))
+        results = pool.map(_remove_batch, batches)
+    else:
+        pool = None
+        if batches:
+            _init_worker(model)
+        results = map(_remove_batch, batches)
+
+    try:
+        for batch, batch_results in zip(batches, results):
+            for (source, destination), (source_hash, error) in zip(batch, batch_results):
+                if error is not None:
+                    print(f"  ❌ Failed to process {source.name}: {error}")
+                    failed += 1
+                    continue
+                manifest[source.name] = {'hash': source_hash, 'output': destination.name}
+                processed += 1
+            print(f"  Processed {processed + failed}/{len(pending)}...")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        save_manifest(output_path, model, manifest)
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if processed and elapsed else 0.0
+
+    # Summary
+    print(f"\n✅ Background removal complete!")
+    print(f"   Processed: {processed} images in {elapsed:.1f}s ({rate:.2f} images/s, {workers} workers)")
+    print(f"   Skipped: {skipped} cached")
+    print(f"   Removed: {removed} deleted sources")
+    print(f"   Failed: {failed} images")
+    print(f"\nImages saved to: {output_path.absolute()}")
+    return {'processed': processed, 'skipped': skipped, 'removed': removed, 'failed': failed,
+            'images_per_second': rate}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Remove headshot backgrounds with rembg')
+    parser.add_argument('--input', default='headshot_cache', help='Directory of original PNG headshots')
+    parser.add_argument('--output', default='headshot_cache_nobg', help='Directory for transparent-background PNGs')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='rembg model (u2net_human_seg, u2net, isnet-general-use, ...)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Model processes')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Images per worker task')
+    parser.add_argument('--force', action='store_true', help='Reprocess every image, ignoring the cache')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Headshot Background Removal")
+    print("=" * 60)
+    print()
+
+    # Check if input directory exists
+    if not os.path.exists(args.input):
+        print(f"ERROR: {args.input} not found")
+        print(f"Current directory: {os.getcwd()}")
+        exit(1)
+
+    # Check required packages
+    try:
+        import rembg
+        from PIL import Image
+    except ImportError as e:
+        print(f"ERROR: Missing required package: {e}")
+        print("Install with: pip install rembg pillow")
+        exit(1)
+
+    remove_backgrounds(args.input, args.output, args.model, args.workers, args.batch_size, args.force)
+
+    print(f"\nNext step: python3 src/compress_headshots.py --input {args.output}")
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo outcome simulation for slate players.
+Draws fantasy-point outcomes from each player's Projection and Std Dev as one
+matrix per chunk of players (players x sims) and derives Boom%, Bust% and
+Ceiling for projection sources that only provide a mean and a standard deviation.
+Each player's draws are seeded from their own inputs, so the same slate always
+gets the same stats, and an unchanged player keeps theirs when others change.
+
+Usage:
+  python3 src/simulation.py --csv slate.csv --sims 100000 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+
+# Salary-based value targets in fantasy points per $1,000 of salary
+BOOM_VALUE = 4.0
+BUST_VALUE = 2.0
+
+# Ceiling is this percentile of the simulated outcomes
+CEILING_PERCENTILE = 90
+
+DEFAULT_SIMS = 100_000
+# Outcomes held in memory at once (players x sims float32, ~20 MB)
+DEFAULT_CHUNK_SIZE = 5_000_000
+# Seed used when filling a slate, so reloading a CSV reproduces its stats
+DEFAULT_SEED = 0
+
+# Columns simulate_stats() can produce
+SIMULATED_COLUMNS = ['Boom%', 'Bust%', 'Ceiling']
+
+# Percentiles of the outcome curves embedded for tooltips (p5, p10, ..., p95)
+CURVE_PERCENTILES = tuple(range(5, 100, 5))
+
+
+def draw_outcomes(mean, std_dev, sims: int, rng):
+    """players x sims float32 matrix of outcomes, floored at 0 points"""
+    import numpy as np
+
+    # One row per player keeps each player's sims contiguous for the percentile
+    outcomes = rng.standard_normal((len(mean), sims), dtype=np.float32)
+    outcomes *= std_dev[:, None]
+    outcomes += mean[:, None]
+    np.maximum(outcomes, 0, out=outcomes)
+    return outcomes
+
+
+def percentile_curves(mean, std_dev, percentiles=CURVE_PERCENTILES):
+    """
+    players x percentiles outcome curves from the same normal model the sims
+    use (floored at 0), in closed form from the shared z-scores.
+    Players without a projection or std dev get a flat curve at 0.
+    """
+    import numpy as np
+    # ndtri is the standard normal ppf behind scipy.stats.norm.ppf, without
+    # the ~0.5 s scipy.stats import
+    from scipy.special import ndtri
+
+    z = ndtri(np.asarray(percentiles, dtype=np.float64) / 100)
+    mean = np.nan_to_num(np.asarray(mean, dtype=np.float32))
+    spread = np.nan_to_num(np.asarray(std_dev, dtype=np.float32))
+    curves = mean[:, None] + spread[:, None] * z[None, :].astype(np.float32)
+    return np.maximum(curves, 0)
+
+
+def player_seeds(mean, std_dev, salary, seed=DEFAULT_SEED) -> list:
+    """
+    One SeedSequence per player from seed and the player's own float32 inputs,
+    so a player's draws don't depend on the rest of the slate, the chunking or
+    the number of workers. seed=None picks a random base seed.
+    """
+    import numpy as np
+
+    base = np.random.SeedSequence(seed).entropy
+    keys = np.stack([mean, std_dev, salary], axis=1).astype(np.float32).view(np.uint32)
+    return [np.random.SeedSequence([base, *row]) for row in keys.tolist()]
+
+
+def _simulate_chunk(mean, std_dev, boom_line, bust_line, sims, seeds):
+    """Boom/bust hit counts and ceiling percentile for a chunk of players, all sims each"""
+    import numpy as np
+
+    outcomes = np.empty((len(mean), sims), dtype=np.float32)
+    for row, seed in enumerate(seeds):
+        np.random.default_rng(seed).standard_normal(dtype=np.float32, out=outcomes[row])
+    outcomes *= std_dev[:, None]
+    outcomes += mean[:, None]
+    np.maximum(outcomes, 0, out=outcomes)
+
+    booms = (outcomes >= boom_line[:, None]).sum(axis=1)
+    busts = (outcomes < bust_line[:, None]).sum(axis=1)
+    ceiling = np.percentile(outcomes, CEILING_PERCENTILE, axis=1)
+    return booms, busts, ceiling
+
+
+def simulate_stats(projection, std_dev, salary, sims: int = DEFAULT_SIMS,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1, seed=DEFAULT_SEED) -> dict:
+    """
+    Simulated Boom% / Bust% (percent of sims above / below the salary-based
+    value lines) and Ceiling per player. Inputs are per-player arrays; players
+    without a projection, std dev or salary get NaN.
+
+    Players are simulated in chunks of about chunk_size outcomes to bound
+    memory. Every chunk holds all sims of its players, so the ceiling is the
+    exact percentile of each player's outcomes.
+    """
+    import numpy as np
+
+    mean = np.nan_to_num(np.asarray(projection, dtype=np.float32))
+    spread = np.nan_to_num(np.asarray(std_dev, dtype=np.float32))
+    salary = np.asarray(salary, dtype=np.float32)
+    boom_line = salary / 1000 * BOOM_VALUE
+    bust_line = salary / 1000 * BUST_VALUE
+
+    seeds = player_seeds(mean, spread, salary, seed)
+    rows = max(1, chunk_size // max(sims, 1))
+    args = [
+        (mean[start:start + rows], spread[start:start + rows], boom_line[start:start + rows],
+         bust_line[start:start + rows], sims, seeds[start:start + rows])
+        for start in range(0, len(mean), rows)
+    ]
+
+    # Daemonic processes (the GUI's job worker) can't start a pool of their own
+    if workers > 1 and not multiprocessing.current_process().daemon and len(args) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        results = [_simulate_chunk(*a) for a in args]
+
+    empty = np.zeros(0)
+    booms = np.concatenate([r[0] for r in results]) if results else empty
+    busts = np.concatenate([r[1] for r in results]) if results else empty
+    ceiling = np.concatenate([r[2] for r in results]) if results else empty
+
+    missing = np.isnan(np.asarray(projection, dtype=np.float32)) | np.isnan(
+        np.asarray(std_dev, dtype=np.float32))
+    stats = {
+        'Boom%': np.where(np.isnan(salary), np.nan, booms / sims * 100),
+        'Bust%': np.where(np.isnan(salary), np.nan, busts / sims * 100),
+        'Ceiling': ceiling,
+    }
+    return {column: np.where(missing, np.nan, values).astype(np.float32) for column, values in stats.items()}
+
+
+def fill_simulated_stats(df, sims: int = DEFAULT_SIMS, workers: int = 1, seed=DEFAULT_SEED) -> list:
+    """
+    Fill Boom%/Bust%/Ceiling columns that are entirely missing from a loaded
+    slate (see slate_loader.load_slate). Returns the columns that were filled;
+    they are also recorded in df.attrs['simulated_columns'].
+    """
+    missing = [column for column in SIMULATED_COLUMNS if df[column].isna().all()]
+    if not missing or df['Projection'].isna().all() or df['Std Dev'].isna().all():
+        return []
+
+    stats = simulate_stats(df['Projection'].to_numpy(), df['Std Dev'].to_numpy(), df['Salary'].to_numpy(),
+                           sims=sims, workers=workers, seed=seed)
+    for column in missing:
+        df[column] = stats[column]
+    mark_simulated(df, missing)
+    return missing
+
+
+def mark_simulated(df, columns):
+    """Record in df.attrs that columns were simulated rather than read from the CSV"""
+    simulated = df.attrs.setdefault('simulated_columns', [])
+    simulated.extend(column for column in columns if column not in simulated)
+
+
+def simulated_columns(df) -> list:
+    """Columns of a loaded slate that were filled by simulation"""
+    return list(df.attrs.get('simulated_columns', []))
+
+
+# Outcome correlations by position pair: (position, position, same team) -> rho.
+# Pairs not listed are uncorrelated. Opposing pairs use same team = False.
+POSITION_CORRELATIONS = {
+    ('QB', 'WR', True): 0.45,
+    ('QB', 'TE', True): 0.35,
+    ('QB', 'RB', True): 0.10,
+    ('RB', 'DST', True): 0.15,
+    ('WR', 'WR', True): 0.05,
+    ('RB', 'RB', True): -0.15,
+    ('QB', 'QB', False): 0.20,
+    ('QB', 'WR', False): 0.15,
+    ('WR', 'WR', False): 0.10,
+    ('QB', 'DST', False): -0.40,
+    ('RB', 'DST', False): -0.20,
+    ('WR', 'DST', False): -0.20,
+    ('TE', 'DST', False): -0.15,
+}
+
+# Same-team pass catchers paired with the QB for stack reports
+STACK_POSITIONS = ('WR', 'TE')
+
+
+def game_keys(df):
+    """
+    Game label per player: "AWAY@HOME"-style pair from an Opponent column or
+    DraftKings' "Game Info", otherwise the team on its own.
+    """
+    if 'Opponent' in df.columns:
+        teams = df['Team'].astype(str)
+        opponents = df['Opponent'].astype(str).str.lstrip('@')
+        return teams.where(teams < opponents, opponents) + '@' + opponents.where(teams < opponents, teams)
+    if 'Game Info' in df.columns:
+        return df['Game Info'].astype(str).str.split(' ').str[0]
+    return df['Team'].astype(str)
+
+
+def _correlation_lookup(correlations) -> tuple:
+    """(position codes, [pos, pos, same team] rho table) for vectorized lookups"""
+    import numpy as np
+
+    positions = sorted({p for a, b, _ in correlations for p in (a, b)})
+    codes = {position: i for i, position in enumerate(positions)}
+    # One extra slot for positions without any listed correlation
+    table = np.zeros((len(positions) + 1, len(positions) + 1, 2), dtype=np.float64)
+    for (a, b, same_team), rho in correlations.items():
+        table[codes[a], codes[b], int(same_team)] = rho
+        table[codes[b], codes[a], int(same_team)] = rho
+    return codes, table
+
+
+def _nearest_correlation(matrices):
+    """Clip negative eigenvalues so every matrix in the stack is positive definite"""
+    import numpy as np
+
+    values, vectors = np.linalg.eigh(matrices)
+    values = np.maximum(values, 1e-6)
+    fixed = (vectors * values[..., None, :]) @ np.swapaxes(vectors, -1, -2)
+    scale = 1 / np.sqrt(np.diagonal(fixed, axis1=-2, axis2=-1))
+    return fixed * scale[..., :, None] * scale[..., None, :]
+
+
+class GameModel:
+    """
+    Per-game correlation structure for a slate. Players are laid out as a
+    (games x slots) grid padded to the largest game so all games share one
+    batched Cholesky factor and one batched matrix product per chunk.
+    """
+
+    def __init__(self, positions, teams, games, correlations=POSITION_CORRELATIONS):
+        import numpy as np
+        import pandas as pd
+
+        game_codes, _ = pd.factorize(pd.Series(games).to_numpy())
+        team_codes, _ = pd.factorize(pd.Series(teams).to_numpy())
+        n = len(game_codes)
+
+        # Slot of each player within its game
+        order = np.argsort(game_codes, kind='stable')
+        sizes = np.bincount(game_codes)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        slots = np.empty(n, dtype=np.int64)
+        slots[order] = np.arange(n) - np.repeat(starts, sizes)
+
+        self.game_codes = game_codes
+        self.slots = slots
+        n_games, width = len(sizes), int(sizes.max()) if n else 0
+
+        codes, table = _correlation_lookup(correlations)
+        other = len(codes)
+        grid_pos = np.full((n_games, width), other)
+        grid_team = np.full((n_games, width), -1)
+        grid_pos[game_codes, slots] = [codes.get(p, other) for p in positions]
+        grid_team[game_codes, slots] = team_codes
+
+        same_team = (grid_team[:, :, None] == grid_team[:, None, :]).astype(np.int64)
+        matrices = table[grid_pos[:, :, None], grid_pos[:, None, :], same_team]
+        # Padding slots (team -1) stay independent
+        padding = grid_team < 0
+        matrices[padding[:, :, None] | padding[:, None, :]] = 0
+        matrices[:, np.arange(width), np.arange(width)] = 1
+
+        try:
+            self.cholesky = np.linalg.cholesky(matrices)
+        except np.linalg.LinAlgError:
+            self.cholesky = np.linalg.cholesky(_nearest_correlation(matrices))
+        self.cholesky = self.cholesky.astype(np.float32)
+
+    def draw(self, mean, std_dev, sims: int, rng):
+        """players x sims float32 outcomes, correlated within each game"""
+        import numpy as np
+
+        n_games, width, _ = self.cholesky.shape
+        z = rng.standard_normal((n_games, width, sims), dtype=np.float32)
+        correlated = self.cholesky @ z
+        outcomes = correlated[self.game_codes, self.slots]
+        outcomes *= std_dev[:, None]
+        outcomes += mean[:, None]
+        np.maximum(outcomes, 0, out=outcomes)
+        return outcomes
+
+
+def stack_pairs(df) -> tuple:
+    """(qb rows, partner rows): each QB with every same-team WR/TE"""
+    import numpy as np
+
+    positions = df['Position'].astype(str).to_numpy()
+    teams = df['Team'].astype(str).to_numpy()
+    qbs = np.flatnonzero(positions == 'QB')
+    partners = np.flatnonzero(np.isin(positions, STACK_POSITIONS))
+    qb_rows, partner_rows = np.nonzero(teams[qbs][:, None] == teams[partners][None, :])
+    return qbs[qb_rows], partners[partner_rows]
+
+
+def simulate_stacks(df, sims: int = DEFAULT_SIMS, chunk_size: int = DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED,
+                    correlations=POSITION_CORRELATIONS):
+    """
+    Correlated per-game simulation of a loaded slate. Returns one row per
+    QB + same-team WR/TE stack with both players' Boom%, the joint (stack)
+    Boom% and what independence would predict.
+    """
+    import numpy as np
+    import pandas as pd
+
+    mean = np.nan_to_num(df['Projection'].to_numpy(dtype=np.float32))
+    spread = np.nan_to_num(df['Std Dev'].to_numpy(dtype=np.float32))
+    boom_line = df['Salary'].to_numpy(dtype=np.float32) / 1000 * BOOM_VALUE
+
+    model = GameModel(df['Position'].astype(str).to_numpy(), df['Team'].astype(str).to_numpy(),
+                      game_keys(df).to_numpy(), correlations)
+    qbs, partners = stack_pairs(df)
+
+    booms = np.zeros(len(df), dtype=np.int64)
+    joint = np.zeros(len(qbs), dtype=np.int64)
+    # Games are drawn together, so chunks split the sims (about chunk_size outcomes each)
+    step = max(1, chunk_size // max(len(df), 1))
+    chunks = [min(step, sims - start) for start in range(0, sims, step)]
+    for n, chunk_seed in zip(chunks, np.random.SeedSequence(seed).spawn(len(chunks))):
+        hits = model.draw(mean, spread, n, np.random.default_rng(chunk_seed)) >= boom_line[:, None]
+        booms += hits.sum(axis=1)
+        joint += (hits[qbs] & hits[partners]).sum(axis=1)
+
+    boom_pct = booms / sims * 100
+    stacks = pd.DataFrame({
+        'Team': df['Team'].astype(str).to_numpy()[qbs],
+        'QB': df['Name'].to_numpy()[qbs],
+        'Partner': df['Name'].to_numpy()[partners],
+        'Partner Pos': df['Position'].astype(str).to_numpy()[partners],
+        'QB Boom%': boom_pct[qbs],
+        'Partner Boom%': boom_pct[partners],
+        'Stack Boom%': joint / sims * 100,
+    })
+    stacks['Independent%'] = stacks['QB Boom%'] * stacks['Partner Boom%'] / 100
+    return stacks.sort_values('Stack Boom%', ascending=False, ignore_index=True)
+
+
+def main():
+    import time
+
+    from slate_loader import load_slate
+
+    parser = argparse.ArgumentParser(description='Simulate Boom%/Bust%/Ceiling from Projection and Std Dev')
+    parser.add_argument('--csv', required=True, help='Slate CSV with Projection, Std Dev and Salary')
+    parser.add_argument('--sims', type=int, default=DEFAULT_SIMS, help='Simulations per player')
+    parser.add_argument('--workers', type=int, default=1, help=f'Processes (this machine has {os.cpu_count()})')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible results')
+    parser.add_argument('--stacks', action='store_true', help='Report QB + WR/TE stack boom rates instead')
+    args = parser.parse_args()
+
+    df = load_slate(args.csv)
+
+    if args.stacks:
+        start = time.perf_counter()
+        stacks = simulate_stacks(df, sims=args.sims, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{len(df)} players, {len(stacks)} stacks x {args.sims:,} correlated sims in {elapsed:.2f}s\n")
+        print(f"{'Team':<5} {'QB':<24} {'Partner':<24} {'QB':>6} {'Partner':>8} {'Stack':>6} {'Indep.':>7}")
+        for _, row in stacks.head(20).iterrows():
+            print(f"{row['Team']:<5} {row['QB']:<24} {row['Partner'] + ' (' + row['Partner Pos'] + ')':<24} "
+                  f"{row['QB Boom%']:>6.1f} {row['Partner Boom%']:>8.1f} {row['Stack Boom%']:>6.1f} "
+                  f"{row['Independent%']:>7.1f}")
+        return
+
+    start = time.perf_counter()
+    stats = simulate_stats(df['Projection'].to_numpy(), df['Std Dev'].to_numpy(), df['Salary'].to_numpy(),
+                           sims=args.sims, workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(df)} players x {args.sims:,} sims in {elapsed:.2f}s\n")
+    print(f"{'Player':<28} {'Proj':>6} {'Boom%':>7} {'Bust%':>7} {'Ceiling':>8}  (CSV Boom%/Bust%/Ceiling)")
+    for i in df['Projection'].to_numpy().argsort()[::-1][:15]:
+        row = df.iloc[i]
+        print(f"{row['Name']:<28} {row['Projection']:>6.1f} {stats['Boom%'][i]:>7.1f} {stats['Bust%'][i]:>7.1f} "
+              f"{stats['Ceiling'][i]:>8.1f}  ({row['Boom%']:.1f}/{row['Bust%']:.1f}/{row['Ceiling']:.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Slate-to-slate deltas.
+Aligns two loaded slates (e.g. a mid-week projection re-export against the
+original) by player, computes per-stat changes and ranks risers and fallers.
+
+Usage:
+  python3 src/slate_delta.py old.csv new.csv --stat Projection --top 10
+"""
+
+import argparse
+
+from slate_loader import STAT_COLUMNS, load_slate
+
+# A player is the same player across slates when name and team match
+KEY_COLUMNS = ['Name', 'Team']
+
+OLD_SUFFIX = ' (old)'
+DELTA_SUFFIX = ' delta'
+
+# Slate column -> field name used by the HTML player objects
+PAYLOAD_FIELDS = {
+    'Salary': 'salary', 'Projection': 'dk_projection', 'Std Dev': 'std_dev',
+    'Ceiling': 'ceiling', 'Bust%': 'bust_pct', 'Boom%': 'boom_pct',
+    'Own%': 'ownership_pct', 'Optimal%': 'optimal_pct', 'Leverage': 'leverage',
+}
+
+
+def _keyed(df):
+    """Key and stat columns with plain string keys, one row per player"""
+    columns = KEY_COLUMNS + ['Position'] + STAT_COLUMNS
+    frame = df[columns].copy()
+    for column in KEY_COLUMNS + ['Position']:
+        frame[column] = frame[column].astype(object)
+    return frame.drop_duplicates(KEY_COLUMNS, keep='first')
+
+
+def compute_delta(old_df, new_df):
+    """
+    Outer hash join of two slates on Name/Team.
+    Returns one row per player with the new stats, the old stats ("<stat> (old)"),
+    the change ("<stat> delta") and a status of added, removed or matched.
+    """
+    import numpy as np
+
+    merged = _keyed(new_df).merge(_keyed(old_df), on=KEY_COLUMNS, how='outer',
+                                  suffixes=('', OLD_SUFFIX), indicator=True)
+
+    merged['Position'] = merged['Position'].fillna(merged['Position' + OLD_SUFFIX])
+    merged = merged.drop(columns='Position' + OLD_SUFFIX)
+
+    for column in STAT_COLUMNS:
+        merged[column + DELTA_SUFFIX] = merged[column] - merged[column + OLD_SUFFIX]
+
+    merged['status'] = np.select(
+        [merged['_merge'] == 'left_only', merged['_merge'] == 'right_only'],
+        ['added', 'removed'], default='matched'
+    )
+    return merged.drop(columns='_merge')
+
+
+def top_movers(delta, stat: str = 'Projection', n: int = 10) -> tuple:
+    """(risers, fallers): matched players with the largest change in stat"""
+    column = stat + DELTA_SUFFIX
+    moved = delta[(delta['status'] == 'matched') & (delta[column] != 0)].dropna(subset=[column])
+    risers = moved[moved[column] > 0].nlargest(n, column)
+    fallers = moved[moved[column] < 0].nsmallest(n, column)
+    return risers, fallers
+
+
+def _player_keys(frame) -> list:
+    return (frame['Name'].astype(str) + '|' + frame['Team'].astype(str)).tolist()
+
+
+def _json_values(values) -> list:
+    """Rounded floats with NaN as None"""
+    rounded = values.astype('float64').round(4)
+    return rounded.astype(object).where(rounded.notna(), None).tolist()
+
+
+def delta_payload(delta, stat: str = 'Projection', n: int = 10) -> dict:
+    """
+    Compact delta summary for the HTML, keyed by "name|team":
+    per-field deltas for matched players, added/removed players and the top movers.
+    """
+    matched = delta[delta['status'] == 'matched']
+    risers, fallers = top_movers(delta, stat, n)
+
+    return {
+        'keys': _player_keys(matched),
+        'deltas': {
+            field: _json_values(matched[column + DELTA_SUFFIX])
+            for column, field in PAYLOAD_FIELDS.items()
+        },
+        'added': _player_keys(delta[delta['status'] == 'added']),
+        'removed': _player_keys(delta[delta['status'] == 'removed']),
+        'stat': PAYLOAD_FIELDS[stat],
+        'risers': _player_keys(risers),
+        'fallers': _player_keys(fallers),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show what moved between two slate exports')
+    parser.add_argument('old_csv', help='Earlier slate CSV')
+    parser.add_argument('new_csv', help='Later slate CSV')
+    parser.add_argument('--stat', default='Projection', choices=STAT_COLUMNS, help='Stat to rank movers by')
+    parser.add_argument('--top', type=int, default=10, help='Risers/fallers to list')
+    args = parser.parse_args()
+
+    delta = compute_delta(load_slate(args.old_csv), load_slate(args.new_csv))
+    counts = delta['status'].value_counts()
+    print(f"Matched: {counts.get('matched', 0)}  Added: {counts.get('added', 0)}  "
+          f"Removed: {counts.get('removed', 0)}")
+
+    risers, fallers = top_movers(delta, args.stat, args.top)
+    for title, movers in (('Risers', risers), ('Fallers', fallers)):
+        print(f"\n{title} ({args.stat})")
+        for _, row in movers.iterrows():
+            print(f"  {row['Name']:<28} {row['Team']:<4} {row[args.stat + OLD_SUFFIX]:>8.1f} -> "
+                  f"{row[args.stat]:>8.1f} ({row[args.stat + DELTA_SUFFIX]:+.1f})")
+
+    for title in ('added', 'removed'):
+        names = delta.loc[delta['status'] == title, 'Name'].tolist()
+        if names:
+            print(f"\n{title.capitalize()}: {', '.join(names)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Typed CSV loader for DFS slate exports.
+Maps header variations onto the canonical Stokastic column names, parses
+currency/percent columns in one vectorized pass and returns a compact frame
+(categorical Position/Team, float32 stats).
+"""
+
+import importlib.util
+
+# Canonical column -> accepted header variations (matched case-insensitively).
+# Same variations the web app's CSV upload accepts.
+COLUMN_ALIASES = {
+    'Name': ['Name', 'player_name', 'Player', 'PLAYER'],
+    'Position': ['Position', 'Pos', 'position'],
+    'Team': ['Team', 'team_abbr', 'TeamAbbrev', 'Tm', 'TM'],
+    'Opponent': ['Opponent', 'Opp', 'opp_abbr'],
+    'Salary': ['Salary'],
+    'Projection': ['Projection', 'DK Projection', 'dk_projection'],
+    'Std Dev': ['Std Dev', 'std_dev', 'StdDev'],
+    'Ceiling': ['Ceiling'],
+    'Bust%': ['Bust%', 'bust_pct', 'Bust'],
+    'Boom%': ['Boom%', 'boom_pct', 'Boom'],
+    'Own%': ['Own%', 'Ownership%', 'ownership_pct', 'Ownership', 'proj_ownership'],
+    'Optimal%': ['Optimal%', 'optimal_pct', 'Optimal'],
+    'Leverage': ['Leverage'],
+}
+
+CATEGORICAL_COLUMNS = ['Position', 'Team', 'Opponent']
+STAT_COLUMNS = ['Salary', 'Projection', 'Std Dev', 'Ceiling', 'Bust%', 'Boom%', 'Own%', 'Optimal%', 'Leverage']
+
+# Characters stripped from "$9,000" / "28.6%" / " 1.2 " before parsing
+_NUMBER_NOISE = str.maketrans('', '', '$,% \t')
+
+
+def detect_column_name(headers, possible_names):
+    """
+    Detect column name from list of possible variations.
+    Returns the actual column name found, or None.
+    """
+    headers_lower = [h.lower().strip() for h in headers]
+    for possible in possible_names:
+        if possible.lower() in headers_lower:
+            idx = headers_lower.index(possible.lower())
+            return headers[idx]
+    return None
+
+
+def canonical_columns(headers) -> dict:
+    """Map each detected header to its canonical name"""
+    renames = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        found = detect_column_name(headers, aliases)
+        if found is not None:
+            renames[found] = canonical
+    return renames
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def parse_numeric(series):
+    """Parse a column of numbers that may carry $ , % or whitespace into float32"""
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float32')
+
+    # One translate pass strips all the noise characters at once
+    cleaned = series.str.translate(_NUMBER_NOISE)
+    try:
+        return cleaned.astype('float32')
+    except ValueError:
+        # Stray text such as "N/A": slower parse that turns it into NaN
+        return pd.to_numeric(cleaned, errors='coerce').astype('float32')
+
+
+def load_slate(csv_path: str, engine: str = None):
+    """
+    Load a slate CSV into a typed frame with canonical column names.
+    Missing stat columns are added as NaN so downstream code sees one schema.
+    """
+    import pandas as pd
+
+    if engine is None:
+        engine = 'pyarrow' if pyarrow_available() else 'c'
+
+    try:
+        df = pd.read_csv(csv_path, engine=engine)
+    except (ValueError, ImportError):
+        if engine == 'c':
+            raise
+        # pyarrow can't handle every CSV quirk the C parser tolerates
+        df = pd.read_csv(csv_path, engine='c')
+
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns=canonical_columns(list(df.columns)))
+
+    for col in STAT_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_numeric(df[col])
+        else:
+            df[col] = pd.Series(float('nan'), index=df.index, dtype='float32')
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    return df
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Append-only history of loaded slates.
+Every slate NFLDFSVisualizer loads can be written to a local SQLite database,
+keyed by season/week/slate, so player trends can be queried across weeks.
+Ingestion is idempotent: a CSV whose content hash is already stored is skipped.
+Only stats read from the CSV are kept; simulated columns are stored as NULL.
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path('slate_history') / 'slates.db'
+
+# Slate frame column -> players table column
+STAT_COLUMNS = {
+    'Salary': 'salary', 'Projection': 'projection', 'Std Dev': 'std_dev',
+    'Ceiling': 'ceiling', 'Bust%': 'bust_pct', 'Boom%': 'boom_pct',
+    'Own%': 'ownership_pct', 'Optimal%': 'optimal_pct', 'Leverage': 'leverage',
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS slates (
+    id INTEGER PRIMARY KEY,
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    slate TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    source_path TEXT,
+    player_count INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS slates_by_key ON slates (season, week, slate, id);
+
+CREATE TABLE IF NOT EXISTS players (
+    slate_id INTEGER NOT NULL REFERENCES slates (id),
+    name TEXT NOT NULL,
+    position TEXT,
+    team TEXT,
+    {', '.join(f'{column} REAL' for column in STAT_COLUMNS.values())}
+);
+CREATE INDEX IF NOT EXISTS players_by_name ON players (name, slate_id);
+CREATE INDEX IF NOT EXISTS players_by_slate ON players (slate_id);
+"""
+
+# Latest ingest of each (season, week, slate); re-exports are kept but superseded
+_CURRENT_SLATES = """
+    SELECT id, season, week, slate FROM slates s
+    WHERE id = (SELECT MAX(id) FROM slates s2
+                WHERE s2.season = s.season AND s2.week = s.week AND s2.slate = s.slate)
+"""
+
+
+def file_hash(path) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SlateStore:
+    """SQLite-backed slate history"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def find_hash(self, content_hash: str):
+        """Slate id already stored for this content hash, or None"""
+        row = self.conn.execute('SELECT id FROM slates WHERE content_hash = ?', (content_hash,)).fetchone()
+        return row['id'] if row else None
+
+    def slate_key(self, slate_id: int) -> dict:
+        """season, week and slate a stored slate id was ingested under"""
+        row = self.conn.execute('SELECT season, week, slate FROM slates WHERE id = ?', (slate_id,)).fetchone()
+        return dict(row) if row else None
+
+    def ingest(self, df, season: int, week: int, slate: str = 'main',
+               content_hash: str = None, source_path: str = None) -> tuple:
+        """
+        Store a loaded slate frame (see slate_loader.load_slate). Simulated columns
+        (simulation.simulated_columns) are stored as NULL, so history only holds CSV data.
+        Returns (slate_id, added); added is False when the content was already stored
+        (under the key slate_key(slate_id), which may differ from the one given).
+        """
+        if content_hash is None:
+            content_hash = file_hash(source_path)
+
+        existing = self.find_hash(content_hash)
+        if existing is not None:
+            return existing, False
+
+        from simulation import simulated_columns
+
+        # Column-wise conversion: float32 noise trimmed, NaN stored as NULL
+        simulated = set(simulated_columns(df))
+        stats = []
+        for column in STAT_COLUMNS:
+            if column in simulated:
+                stats.append([None] * len(df))
+                continue
+            values = df[column].astype('float64').round(4)
+            stats.append(values.astype(object).where(values.notna(), None).tolist())
+        names = df['Name'].astype(object).tolist()
+        positions = df['Position'].astype(object).tolist()
+        teams = df['Team'].astype(object).tolist()
+
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO slates (season, week, slate, content_hash, source_path, player_count, ingested_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (season, week, slate, content_hash, str(source_path) if source_path else None, len(df), time.time())
+            )
+            slate_id = cursor.lastrowid
+            placeholders = ', '.join('?' * (4 + len(STAT_COLUMNS)))
+            self.conn.executemany(
+                f"INSERT INTO players (slate_id, name, position, team, {', '.join(STAT_COLUMNS.values())}) "
+                f"VALUES ({placeholders})",
+                zip([slate_id] * len(df), names, positions, teams, *stats)
+            )
+
+        return slate_id, True
+
+    def slates(self, season: int = None) -> list:
+        """Current slates (latest ingest per key), newest week first"""
+        query = f"SELECT * FROM ({_CURRENT_SLATES})"
+        params = ()
+        if season is not None:
+            query += ' WHERE season = ?'
+            params = (season,)
+        query += ' ORDER BY season DESC, week DESC, slate'
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def player_history(self, name: str, team: str = None, weeks: int = None) -> list:
+        """
+        One dict per stored slate the player appears in, newest first.
+        weeks limits the result to the N most recent weeks in the store.
+        """
+        query = f"""
+            SELECT s.season, s.week, s.slate, p.*
+            FROM players p JOIN ({_CURRENT_SLATES}) s ON s.id = p.slate_id
+            WHERE p.name = ?
+        """
+        params = [name]
+        if team is not None:
+            query += ' AND p.team = ?'
+            params.append(team)
+        if weeks is not None:
+            cutoff = self.conn.execute(
+                'SELECT season, week FROM (SELECT DISTINCT season, week FROM slates '
+                'ORDER BY season DESC, week DESC LIMIT ?) ORDER BY season, week LIMIT 1',
+                (weeks,)
+            ).fetchone()
+            if cutoff is not None:
+                query += ' AND (s.season > ? OR (s.season = ? AND s.week >= ?))'
+                params += [cutoff['season'], cutoff['season'], cutoff['week']]
+        query += ' ORDER BY s.season DESC, s.week DESC, s.slate'
+
+        rows = []
+        for row in self.conn.execute(query, params):
+            row = dict(row)
+            del row['slate_id']
+            rows.append(row)
+        return rows
+
+    def load_frame(self, season: int, week: int, slate: str = 'main'):
+        """A stored slate as a frame with the slate_loader column names, or None"""
+        import pandas as pd
+
+        row = self.conn.execute(
+            'SELECT MAX(id) AS id FROM slates WHERE season = ? AND week = ? AND slate = ?',
+            (season, week, slate)
+        ).fetchone()
+        if row['id'] is None:
+            return None
+
+        df = pd.read_sql_query('SELECT * FROM players WHERE slate_id = ? ORDER BY rowid',
+                               self.conn, params=(row['id'],))
+        renames = {'name': 'Name', 'position': 'Position', 'team': 'Team'}
+        renames.update({column: canonical for canonical, column in STAT_COLUMNS.items()})
+        df = df.drop(columns='slate_id').rename(columns=renames)
+        for column in STAT_COLUMNS:
+            df[column] = df[column].astype('float32')
+        for column in ('Position', 'Team'):
+            df[column] = df[column].astype('category')
+        return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the local slate history')
+    parser.add_argument('--db', default=str(DEFAULT_DB_PATH), help='History database path')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('slates', help='List stored slates')
+
+    history_parser = subparsers.add_parser('player', help="A player's stats across stored slates")
+    history_parser.add_argument('name', help='Player name as it appears in the CSV')
+    history_parser.add_argument('--team', help='Team abbreviation')
+    history_parser.add_argument('--weeks', type=int, help='Only the N most recent weeks')
+
+    args = parser.parse_args()
+
+    with SlateStore(args.db) as store:
+        if args.command == 'slates':
+            for slate in store.slates():
+                print(f"{slate['season']} week {slate['week']:>2}  {slate['slate']}")
+            return
+
+        rows = store.player_history(args.name, args.team, args.weeks)
+        if not rows:
+            print(f"No history for {args.name}")
+            return
+        print(f"{'Season':<7} {'Wk':>3} {'Slate':<10} {'Team':<5} {'Salary':>7} {'Proj':>6} {'Own%':>6}")
+        for row in rows:
+            salary = f"{row['salary']:.0f}" if row['salary'] is not None else '-'
+            print(f"{row['season']:<7} {row['week']:>3} {row['slate']:<10} {row['team'] or '':<5} "
+                  f"{salary:>7} {row['projection'] or 0:>6.1f} {row['ownership_pct'] or 0:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
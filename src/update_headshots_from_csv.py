@@ -2,9 +2,32 @@
 """
 Download headshots for new players from CSV who don't already have images.
 Scrapes NFL.com player pages to fetch headshots automatically.
+Players are fetched concurrently over one pooled session, with a global
+request-rate limit (--rate) instead of a pause after every player.
+Headshot URLs come from the cached season roster where the visualizer's
+roster matcher finds the player (one image request instead of a page scrape
+plus the image); only the leftovers are scraped from NFL.com.
+Players NFL.com has no headshot for are remembered in a negative cache
+(headshot_misses.json) and not looked up again until the entry expires
+or --retry-failed is given.
+Each download's URL, ETag and Last-Modified go into headshot_sources.json;
+--refresh revalidates every recorded headshot with conditional GETs and only
+re-downloads the ones that changed (e.g. after a trade).
+Headshots are saved as <Clean_Name>.png in the originals directory
+(headshot_cache); compress_headshots.py turns them into the hashed variants
+and headshots-manifest.json that are deployed.
+
+Usage:
+  python3 src/update_headshots_from_csv.py weekly_dfs_data.csv
+  python3 src/update_headshots_from_csv.py weekly_dfs_data.csv --workers 8 --rate 4
+  python3 src/update_headshots_from_csv.py weekly_dfs_data.csv --retry-failed
+  python3 src/update_headshots_from_csv.py --refresh
+  python3 src/compress_headshots.py
 """
 
+import argparse
 import csv
+import hashlib
 import sys
 import os
 import re
@@ -15,6 +38,28 @@ from PIL import Image
 from io import BytesIO
 import time
 
+from headshot_manifest import clean_player_name
+from http_fetch import DEFAULT_RATE, DEFAULT_WORKERS, Fetcher
+from nfl_dfs_visualizer import NFLDFSVisualizer, RosterIndex
+from slate_loader import detect_column_name
+
+# Player page and headshot image URLs; overridable to test against a local server
+NFL_PLAYER_URL = 'https://www.nfl.com/players/{slug}/'
+NFL_IMAGE_URL = 'https://static.www.nfl.com/image/upload/f_auto,q_auto/league/{id}'
+
+MISSES_FILE = 'headshot_misses.json'
+SOURCES_FILE = 'headshot_sources.json'
+
+# How long a failed lookup is trusted, by reason: a missing page or a page
+# without a headshot rarely changes within the week, a timeout may be transient
+DAY = 24 * 60 * 60
+MISS_TTL = {
+    'not found': 7 * DAY,   # player page 404
+    'no match': 7 * DAY,    # page exists, no headshot on it
+    'timeout': 1 * DAY,
+    'error': 1 * DAY,       # any other HTTP or connection error
+}
+
 def load_name_mappings(mappings_file='name_mappings.json'):
     """
     Load name mappings from JSON file.
@@ -45,20 +90,86 @@ def apply_name_mapping(player_name, team_abbr, name_mappings):
 
     return player_name
 
-def clean_player_name(name):
+class NegativeCache:
+    """
+    Persistent record of failed headshot lookups, keyed by "Name|TEAM".
+    Each entry keeps the failure reason and when it expires (see MISS_TTL).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key, now=None):
+        """The unexpired entry for key, or None"""
+        entry = self.entries.get(key)
+        if entry is None or entry['expires_at'] <= (now or time.time()):
+            return None
+        return entry
+
+    def add(self, key, reason, now=None):
+        now = now or time.time()
+        self.entries[key] = {'reason': reason, 'checked_at': now, 'expires_at': now + MISS_TTL[reason]}
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def save(self):
+        """Write unexpired entries back"""
+        now = time.time()
+        entries = {key: entry for key, entry in sorted(self.entries.items()) if entry['expires_at'] > now}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=1)
+
+class SourceIndex:
     """
-    Clean player name for filename (same logic as extract_headshots.py and index.html).
-    Removes special characters and replaces spaces with underscores.
+    Sidecar record of where each saved headshot came from: filename -> URL, the
+    response's ETag / Last-Modified validators and a hash of the downloaded bytes.
     """
-    clean = name.replace("'", "").replace(".", "")
-    clean = re.sub(r'[^a-zA-Z0-9\s]', '', clean)
-    clean = clean.replace(' ', '_')
-    return clean
 
-def fetch_headshot_from_nfl(player_name, team_abbr=None):
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def record(self, filename, url, response):
+        self.entries[filename] = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': hashlib.sha256(response.content).hexdigest(),
+            'checked_at': time.time(),
+        }
+
+    def conditional_headers(self, filename) -> dict:
+        """If-None-Match / If-Modified-Since headers for revalidating filename"""
+        entry = self.entries.get(filename, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(self.entries.items())), f, indent=1)
+
+def lookup_headshot_from_nfl(player_name, team_abbr=None, http=requests,
+                             player_url=NFL_PLAYER_URL, image_url=NFL_IMAGE_URL):
     """
     Fetch player headshot from NFL.com by scraping player page.
-    Returns image URL if found, None otherwise.
+    http is anything with requests' get() (the module, or a shared Fetcher).
+    Returns (image URL, None) if found, otherwise (None, reason) with a MISS_TTL reason.
     """
     try:
         # Convert player name to NFL.com URL format
@@ -66,81 +177,196 @@ def fetch_headshot_from_nfl(player_name, team_abbr=None):
         url_name = player_name.lower().replace(' ', '-').replace("'", '').replace('.', '')
 
         # Fetch NFL.com player page
-        player_url = f"https://www.nfl.com/players/{url_name}/"
-        response = requests.get(player_url, timeout=10)
+        response = http.get(player_url.format(slug=url_name), timeout=10)
         response.raise_for_status()
 
         # Search for headshot URL in page content
         # Pattern: https://static.www.nfl.com/image/upload/t_headshot_desktop/league/{id}
-        import re
         pattern = r'https://static\.www\.nfl\.com/image/upload/t_headshot_desktop/league/([a-z0-9]+)'
         match = re.search(pattern, response.text)
 
         if match:
             headshot_id = match.group(1)
             # Construct URL with f_auto,q_auto (same format as existing headshots)
-            headshot_url = f"https://static.www.nfl.com/image/upload/f_auto,q_auto/league/{headshot_id}"
-            return headshot_url
+            return image_url.format(id=headshot_id), None
 
-        return None
+        return None, 'no match'
 
+    except requests.exceptions.Timeout:
+        return None, 'timeout'
+    except requests.exceptions.HTTPError as e:
+        return None, 'not found' if e.response is not None and e.response.status_code == 404 else 'error'
     except Exception as e:
-        return None
+        # Not an HTTP failure: say what went wrong before it's cached as a miss
+        print(f"    Lookup error for {player_name}: {type(e).__name__}: {e}")
+        return None, 'error'
 
-def compress_and_save(img_url, output_path, max_size=400, quality=85):
+def fetch_headshot_from_nfl(player_name, team_abbr=None, http=requests,
+                            player_url=NFL_PLAYER_URL, image_url=NFL_IMAGE_URL):
     """
-    Download image from URL, compress it, and save as PNG.
+    Fetch player headshot from NFL.com by scraping player page.
+    Returns image URL if found, None otherwise.
+    """
+    return lookup_headshot_from_nfl(player_name, team_abbr, http, player_url, image_url)[0]
+
+def save_headshot(content, output_path, max_size=400, quality=85):
+    """
+    Compress downloaded image bytes and save as PNG.
     Same compression logic as compress_headshots.py.
     """
+    # Open image
+    img = Image.open(BytesIO(content))
+
+    # Convert RGBA to RGB if necessary
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = background
+
+    # Resize if needed (maintain aspect ratio)
+    if img.width > max_size or img.height > max_size:
+        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+    # Save as optimized PNG
+    img.save(output_path, 'PNG', optimize=True)
+
+    # If still too large, convert to JPEG (but keep .png extension)
+    compressed_size = output_path.stat().st_size
+    if compressed_size > 200_000:  # If larger than 200KB
+        img.save(output_path, 'JPEG', quality=quality, optimize=True)
+
+def compress_and_save(img_url, output_path, max_size=400, quality=85, http=requests, sources=None):
+    """
+    Download image from URL, compress it, and save as PNG.
+    The URL and validators are recorded in sources (a SourceIndex) when given.
+    Returns None on success, otherwise the error message.
+    """
     try:
         # Download image
-        response = requests.get(img_url, timeout=10)
+        response = http.get(img_url, timeout=10)
         response.raise_for_status()
 
-        # Open image
-        img = Image.open(BytesIO(response.content))
+        save_headshot(response.content, output_path, max_size, quality)
+        if sources is not None:
+            sources.record(output_path.name, img_url, response)
+        return None
+
+    except Exception as e:
+        return str(e)
+
+def load_roster_index(roster_dir='headshot_cache'):
+    """RosterIndex over the cached season roster (same cache the visualizer uses); empty on failure"""
+    import pandas as pd
 
-        # Convert RGBA to RGB if necessary
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = background
+    try:
+        roster, _ = NFLDFSVisualizer.load_roster(NFLDFSVisualizer.current_season(), roster_dir)
+    except Exception as e:
+        print(f"Warning: Could not load roster data: {e}")
+        roster = pd.DataFrame()
+    return RosterIndex(roster)
+
+def download_player_headshot(http, mapped_name, team_abbr, filepath,
+                             player_url=NFL_PLAYER_URL, image_url=NFL_IMAGE_URL, roster_url=None, sources=None):
+    """
+    Resolve and download one player's headshot (runs on a fetch worker thread).
+    A roster URL is tried first; the NFL.com page is only scraped without one or if it fails.
+    Returns (headshot_url, save error); when no headshot was found it's (None, miss reason).
+    """
+    if roster_url and compress_and_save(roster_url, filepath, http=http, sources=sources) is None:
+        return roster_url, None
 
-        # Resize if needed (maintain aspect ratio)
-        if img.width > max_size or img.height > max_size:
-            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    headshot_url, reason = lookup_headshot_from_nfl(mapped_name, team_abbr, http, player_url, image_url)
+    if not headshot_url:
+        return None, reason
+    return headshot_url, compress_and_save(headshot_url, filepath, http=http, sources=sources)
 
-        # Save as optimized PNG
-        img.save(output_path, 'PNG', optimize=True)
+def revalidate_headshot(http, sources, filename, output_path):
+    """
+    Conditional GET for one recorded headshot (runs on a fetch worker thread).
+    Returns 'unchanged' (304, or the same bytes again), 'updated' or 'error: ...'.
+    """
+    entry = sources.entries[filename]
+    try:
+        response = http.get(entry['url'], headers=sources.conditional_headers(filename))
+        if response.status_code == 304:
+            entry['checked_at'] = time.time()
+            return 'unchanged'
+        response.raise_for_status()
 
-        # If still too large, convert to JPEG (but keep .png extension)
-        compressed_size = output_path.stat().st_size
-        if compressed_size > 200_000:  # If larger than 200KB
-            img.save(output_path, 'JPEG', quality=quality, optimize=True)
+        # Servers without validators answer 200 every time; only recompress new bytes
+        if hashlib.sha256(response.content).hexdigest() == entry.get('sha256'):
+            sources.record(filename, entry['url'], response)
+            return 'unchanged'
 
-        return True
+        save_headshot(response.content, output_path / filename)
+        sources.record(filename, entry['url'], response)
+        return 'updated'
 
     except Exception as e:
-        print(f"    Error saving image: {e}")
-        return False
+        return f"error: {e}"
 
-def detect_column_name(headers, possible_names):
+def refresh_headshots(output_dir='headshot_cache', workers=DEFAULT_WORKERS, rate=DEFAULT_RATE):
     """
-    Detect column name from list of possible variations.
-    Returns the actual column name found, or None.
+    Revalidate every headshot recorded in the sources index with conditional
+    GETs; only images the server reports as changed are downloaded again.
+    Returns counts by outcome (None if output_dir doesn't exist).
     """
-    headers_lower = [h.lower().strip() for h in headers]
-    for possible in possible_names:
-        if possible.lower() in headers_lower:
-            idx = headers_lower.index(possible.lower())
-            return headers[idx]
-    return None
-
-def update_headshots_from_csv(csv_file, output_dir='headshot_cache_compressed'):
+    output_path = Path(output_dir)
+    if not output_path.is_dir():
+        print(f"ERROR: Headshot directory not found: {output_dir}")
+        return None
+    sources = SourceIndex(output_path / SOURCES_FILE)
+    filenames = sorted(name for name in sources.entries if (output_path / name).exists())
+    untracked = sorted(
+        path.name for path in output_path.glob('*.png') if path.name not in sources.entries
+    )
+
+    print(f"Revalidating {len(filenames)} headshots in {output_path.absolute()}")
+    print()
+
+    counts = {'unchanged': 0, 'updated': 0, 'failed': 0}
+    start = time.perf_counter()
+    with Fetcher(rate=rate, workers=workers) as fetcher:
+        for filename, outcome in fetcher.map(
+                lambda name: revalidate_headshot(fetcher, sources, name, output_path), filenames):
+            if outcome == 'updated':
+                print(f"    ✅ Updated: {filename}")
+                counts['updated'] += 1
+            elif outcome == 'unchanged':
+                counts['unchanged'] += 1
+            else:
+                print(f"    ❌ {filename}: {outcome}")
+                counts['failed'] += 1
+        requests_sent = fetcher.requests
+    sources.save()
+    elapsed = time.perf_counter() - start
+
+    print()
+    print("=" * 60)
+    print("✅ Refresh Complete!")
+    print("=" * 60)
+    print(f"Updated:     {counts['updated']} changed headshots")
+    print(f"Unchanged:   {counts['unchanged']}")
+    print(f"Failed:      {counts['failed']}")
+    print(f"Requests:    {requests_sent} HTTP requests in {elapsed:.1f}s")
+    if untracked:
+        print(f"Untracked:   {len(untracked)} headshots with no recorded source (delete to re-download)")
+    print()
+    if counts['updated']:
+        print(f"Next step: python3 src/compress_headshots.py --input {output_dir}")
+        print()
+    return counts
+
+def update_headshots_from_csv(csv_file, output_dir='headshot_cache', workers=DEFAULT_WORKERS,
+                              rate=DEFAULT_RATE, player_url=NFL_PLAYER_URL, image_url=NFL_IMAGE_URL,
+                              retry_failed=False, roster_dir='headshot_cache'):
     """
     Download headshots for players in CSV who don't already have images.
+    Up to `workers` players are fetched at once, sharing `rate` requests per second.
+    URLs are resolved in bulk from the cached roster in roster_dir (None to always scrape).
+    Players in the negative cache are skipped unless retry_failed is set.
     """
     print("=" * 60)
     print("Automated Headshot Downloader for CSV Players")
@@ -190,8 +416,11 @@ def update_headshots_from_csv(csv_file, output_dir='headshot_cache_compressed'):
         total = len(players)
         downloaded = 0
         skipped = 0
+        known_misses = 0
         failed = 0
         failed_players = []
+        misses = NegativeCache(output_path / MISSES_FILE)
+        sources = SourceIndex(output_path / SOURCES_FILE)
 
         print(f"Found {total} players in CSV")
         print(f"Output directory: {output_path.absolute()}")
@@ -199,6 +428,10 @@ def update_headshots_from_csv(csv_file, output_dir='headshot_cache_compressed'):
         print("Processing players...")
         print()
 
+        # Players without a headshot yet: (row number, name, team, mapped name, filepath, roster URL)
+        pending = []
+        queued = set()
+        roster_index = None
         for i, row in enumerate(players, 1):
             player_name = row.get(name_col, '').strip()
             team_abbr = row.get(team_col, '').strip() if team_col else None
@@ -214,31 +447,61 @@ def update_headshots_from_csv(csv_file, output_dir='headshot_cache_compressed'):
             filename = f"{clean_name}.png"
             filepath = output_path / filename
 
-            # Check if already exists
-            if filepath.exists():
+            # Check if already exists (or is already queued, e.g. showdown CPT and FLEX rows)
+            if filepath.exists() or filepath in queued:
                 skipped += 1
                 continue
 
-            # Download from NFL.com (use mapped name for URL)
-            print(f"[{i}/{total}] {player_name} ({team_abbr or 'N/A'})...")
-            headshot_url = fetch_headshot_from_nfl(mapped_name, team_abbr)
+            # Resolve from the roster; loaded only once a player needs it
+            if roster_index is None:
+                roster_index = load_roster_index(roster_dir) if roster_dir else RosterIndex(None)
+            _, _, roster_url = roster_index.match(player_name, team_abbr, name_mappings, fuzzy=False)
+
+            # Looked up recently without finding a headshot
+            if not roster_url and not retry_failed and misses.get(f"{mapped_name}|{team_abbr}"):
+                known_misses += 1
+                continue
+
+            pending.append((i, player_name, team_abbr, mapped_name, filepath, roster_url))
+            queued.add(filepath)
+
+        from_roster = sum(1 for player in pending if player[-1])
+        if pending:
+            print(f"{from_roster} of {len(pending)} players resolved from the roster, "
+                  f"{len(pending) - from_roster} to look up on NFL.com")
+            print()
 
-            if headshot_url:
-                print(f"    Found: {headshot_url}")
-                if compress_and_save(headshot_url, filepath):
-                    print(f"    ✅ Saved: {filename}")
-                    downloaded += 1
+        # Download from NFL.com (use mapped name for URL); results are printed
+        # as players finish, the rate limit keeps it nice to NFL.com servers
+        with Fetcher(rate=rate, workers=workers) as fetcher:
+            def download(player):
+                _, _, team_abbr, mapped_name, filepath, roster_url = player
+                return download_player_headshot(fetcher, mapped_name, team_abbr, filepath, player_url, image_url,
+                                                roster_url, sources)
+
+            for player, (headshot_url, error) in fetcher.map(download, pending):
+                i, player_name, team_abbr, mapped_name, filepath, roster_url = player
+                print(f"[{i}/{total}] {player_name} ({team_abbr or 'N/A'})...")
+                miss_key = f"{mapped_name}|{team_abbr}"
+                if headshot_url:
+                    misses.discard(miss_key)
+                    print(f"    Found{' (roster)' if headshot_url == roster_url else ''}: {headshot_url}")
+                    if error is None:
+                        print(f"    ✅ Saved: {filepath.name}")
+                        downloaded += 1
+                    else:
+                        print(f"    Error saving image: {error}")
+                        print(f"    ❌ Failed to save")
+                        failed += 1
+                        failed_players.append(player_name)
                 else:
-                    print(f"    ❌ Failed to save")
+                    print(f"    ❌ No headshot found on NFL.com ({error})")
+                    misses.add(miss_key, error)
                     failed += 1
                     failed_players.append(player_name)
-            else:
-                print(f"    ❌ No headshot found on NFL.com")
-                failed += 1
-                failed_players.append(player_name)
-
-            # Be nice to NFL.com servers
-            time.sleep(0.5)
+            requests_sent = fetcher.requests
+        misses.save()
+        sources.save()
 
         # Summary
         print()
@@ -247,7 +510,9 @@ def update_headshots_from_csv(csv_file, output_dir='headshot_cache_compressed'):
         print("=" * 60)
         print(f"Downloaded:  {downloaded} new headshots")
         print(f"Skipped:     {skipped} (already exist)")
+        print(f"Known miss:  {known_misses} (no headshot last time; --retry-failed to look again)")
         print(f"Failed:      {failed} (not found or error)")
+        print(f"Requests:    {requests_sent} HTTP requests")
         print()
 
         if failed_players:
@@ -259,21 +524,33 @@ def update_headshots_from_csv(csv_file, output_dir='headshot_cache_compressed'):
         print(f"Headshots saved to: {output_path.absolute()}")
         print()
         print("Next steps:")
-        print("1. Upload new headshots to GoDaddy at /nfl-dfs/headshots/")
-        print("2. Headshots will load automatically on your website")
+        print(f"1. python3 src/compress_headshots.py --input {output_dir}")
+        print("2. Upload the compressed headshots and manifest to GoDaddy at /nfl-dfs/headshots/")
         print()
 
 if __name__ == '__main__':
-    # Check command line arguments
-    if len(sys.argv) < 2:
-        print("Usage: python3 update_headshots_from_csv.py <csv_file>")
-        print()
-        print("Example:")
-        print("  python3 update_headshots_from_csv.py weekly_dfs_data.csv")
-        print()
-        sys.exit(1)
-
-    csv_file = sys.argv[1]
+    parser = argparse.ArgumentParser(description='Download headshots for CSV players who lack one')
+    parser.add_argument('csv_file', nargs='?', help='Slate CSV (e.g. weekly_dfs_data.csv)')
+    parser.add_argument('--output', default='headshot_cache',
+                        help='Directory of original headshots (compress_headshots.py --input)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Players fetched at once')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help='Requests per second to NFL.com across all workers (0: unlimited)')
+    parser.add_argument('--player-url', default=NFL_PLAYER_URL,
+                        help='Player page URL template with {slug} (for testing against a local server)')
+    parser.add_argument('--image-url', default=NFL_IMAGE_URL,
+                        help='Headshot image URL template with {id} (for testing against a local server)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help=f'Look up players in the negative cache ({MISSES_FILE}) again')
+    parser.add_argument('--roster-dir', default='headshot_cache',
+                        help='Directory with the cached season roster (shared with the visualizer)')
+    parser.add_argument('--no-roster', action='store_true',
+                        help='Scrape every player page instead of resolving URLs from the roster')
+    parser.add_argument('--refresh', action='store_true',
+                        help=f'Revalidate downloaded headshots ({SOURCES_FILE}) and re-download changed ones')
+    args = parser.parse_args()
+    if not args.csv_file and not args.refresh:
+        parser.error('csv_file is required unless --refresh is given')
 
     # Check required packages
     try:
@@ -285,4 +562,8 @@ if __name__ == '__main__':
         sys.exit(1)
 
     # Run
-    update_headshots_from_csv(csv_file)
+    if args.refresh:
+        refresh_headshots(args.output, args.workers, args.rate)
+    if args.csv_file:
+        update_headshots_from_csv(args.csv_file, args.output, args.workers, args.rate, args.player_url, args.image_url,
+                                  args.retry_failed, None if args.no_roster else args.roster_dir)